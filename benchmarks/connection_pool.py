@@ -0,0 +1,72 @@
+"""
+Benchmark pooled keep alive connections against a local HTTP server.
+
+Sends the same number of concurrent requests to a local stand in server with
+a new connection for each request and with a session configured by
+cc_products.pooling, then prints the time taken and pool metrics.
+
+Usage:
+    python benchmarks/connection_pool.py
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from cc_products import pooling
+
+REQUESTS = 2000
+THREADS = 16
+BODY = json.dumps({"ID": "1", "Name": "Test Range", "Products": []}).encode()
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Return a small JSON document for every request."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+def run(get, url):
+    """Return the seconds taken to make REQUESTS concurrent requests."""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        for response in executor.map(lambda _: get(url), range(REQUESTS)):
+            response.raise_for_status()
+    return time.perf_counter() - start
+
+
+def main():
+    """Print timings with and without connection pooling."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = "http://127.0.0.1:{}/".format(server.server_address[1])
+    try:
+        unpooled = run(requests.get, url)
+        session = requests.Session()
+        adapter = pooling.configure_session(session, pool_size=THREADS)
+        pooled = run(session.get, url)
+    finally:
+        server.shutdown()
+    print("{} requests, {} threads".format(REQUESTS, THREADS))
+    print("New connection per request: {:.2f}s".format(unpooled))
+    print("Pooled connections:         {:.2f}s".format(pooled))
+    print(json.dumps(adapter.metrics(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
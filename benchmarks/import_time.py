@@ -0,0 +1,48 @@
+"""
+Benchmark the time taken to import cc_products in a new interpreter.
+
+Starts a new Python process for each import, as short lived scripts do, and
+prints the median time to import cc_products alone, to import it and use
+get_range, and to import every module as was done before imports were made
+lazy.
+
+Usage:
+    python benchmarks/import_time.py
+"""
+
+import statistics
+import subprocess
+import sys
+import time
+
+REPEAT = 20
+STATEMENTS = {
+    "import cc_products": "import cc_products",
+    "cc_products.get_range": "import cc_products; cc_products.get_range",
+    "import every module": (
+        "import ccapi, cc_products.functions, cc_products.refresh, cc_products.stock"
+    ),
+}
+
+
+def time_statement(statement):
+    """Return the median seconds taken to run statement in a new process."""
+    times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], check=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    """Print the median import time for each statement."""
+    baseline = time_statement("pass")
+    print("Interpreter start up: {:.1f}ms".format(baseline * 1000))
+    for name, statement in STATEMENTS.items():
+        seconds = time_statement(statement) - baseline
+        print("{}: {:.1f}ms".format(name, seconds * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark construction of cc_products.ProductRange objects.
+
+Times ProductRange(data) for Product Range payloads with 10, 100 and 1000
+products.
+
+Usage:
+    python benchmarks/range_construction.py
+"""
+
+import timeit
+
+from cc_products.productrange import ProductRange
+
+PRODUCT_COUNTS = (10, 100, 1000)
+REPEAT = 5
+
+
+def product_data(range_id, index):
+    """Return Cloud Commerce data for a product in a Product Range."""
+    return {
+        "ID": str(range_id * 10000 + index),
+        "FullName": "Test Product {}".format(index),
+        "ManufacturerSKU": "ABC-DEF-{:04d}".format(index),
+        "RangeID": str(range_id),
+        "ProductType": 0,
+        "defaultImageUrl": "",
+        "ExternalProductId": None,
+        "Name": "Test Product",
+        "Description": "Test Description",
+        "Barcode": "{:013d}".format(index),
+        "EndOfLine": False,
+        "StockLevel": index,
+        "LengthMM": 0,
+        "WidthMM": 0,
+        "HeightMM": 0,
+        "LargeLetterCompatible": False,
+        "WeightGM": 100,
+        "DeliveryLeadTimeDays": 1,
+        "BasePrice": 5.5,
+        "VatRateID": 5,
+        "HSCode": None,
+        "CountryOfOriginId": None,
+    }
+
+
+def range_data(product_count, range_id=1):
+    """Return Cloud Commerce data for a Product Range."""
+    return {
+        "ID": str(range_id),
+        "Name": "Test Range",
+        "ManufacturerSKU": "RNG_ABC_DEF_GHI",
+        "EndOfLine": False,
+        "ThumbNail": "",
+        "PreOrder": False,
+        "Grouped": False,
+        "Products": [product_data(range_id, i) for i in range(product_count)],
+    }
+
+
+def main():
+    """Print construction times for each payload size."""
+    for product_count in PRODUCT_COUNTS:
+        data = range_data(product_count)
+        number = max(1, 10000 // product_count)
+        best = min(
+            timeit.repeat(lambda: ProductRange(data), number=number, repeat=REPEAT)
+        )
+        print(
+            "{:>5} products: {:10.1f} us per range".format(
+                product_count, best / number * 1e6
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
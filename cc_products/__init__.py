@@ -2,9 +2,47 @@
 CC Products package.
 
 Provides tools for easiliy working with Cloud Commerce Products.
+
+Importing the package is cheap: the modules providing each name, and ccapi,
+are only imported when the name is first used.
 """
 
-from .functions import create_range, get_product, get_range
-from .variation import Variation
+import importlib
+
+_EXPORTS = {
+    "get_product": "functions",
+    "get_range": "functions",
+    "create_range": "functions",
+    "create_range_from_template": "functions",
+    "prefetch_sales_channels": "functions",
+    "prefetch_factory_links": "functions",
+    "reassign_supplier": "functions",
+    "rename_ranges": "functions",
+    "reconcile_stock": "stock",
+    "set_default_client": "client",
+    "enable_pooling": "client",
+    "start_refresher": "refresh",
+    "stop_refresher": "refresh",
+    "Variation": "variation",
+    "Catalogue": "query",
+    "Snapshot": "snapshot",
+    "write_snapshot": "snapshot",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    try:
+        module_name = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(
+            "module {!r} has no attribute {!r}".format(__name__, name)
+        ) from None
+    value = getattr(importlib.import_module("." + module_name, __name__), name)
+    globals()[name] = value
+    return value
+
 
-__all__ = ["get_product", "get_range", "create_range", "Variation"]
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
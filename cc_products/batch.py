@@ -0,0 +1,104 @@
+"""Tools for running Cloud Commerce API calls concurrently."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_WORKERS = 8
+
+
+class RateLimiter:
+    """
+    Limit the rate of calls made from any number of threads.
+
+    Args:
+        calls_per_second: The maximum number of calls to allow each second.
+            If None calls are not limited.
+    """
+
+    def __init__(self, calls_per_second=None):
+        """Set the interval between calls."""
+        self.interval = 1 / calls_per_second if calls_per_second else 0
+        self._next_call = 0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Block until the next call is allowed."""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_call - now
+            self._next_call = max(now, self._next_call) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+class Progress:
+    """
+    Report progress through a number of steps from any number of threads.
+
+    Args:
+        callback: Callable taking the number of completed steps and the total
+            number of steps, called each time a step completes. If None
+            progress is not reported.
+        total: The total number of steps.
+    """
+
+    def __init__(self, callback, total):
+        """Set the callback and number of steps."""
+        self.callback = callback
+        self.total = total
+        self.completed = 0
+        self._lock = threading.Lock()
+
+    def step(self):
+        """Record that a step has completed."""
+        with self._lock:
+            self.completed += 1
+            if self.callback is not None:
+                self.callback(self.completed, self.total)
+
+
+def run_concurrently(*calls, max_workers=MAX_WORKERS):
+    """
+    Call each of calls in a thread pool.
+
+    Args:
+        calls: Callables taking no arguments.
+
+    Kwargs:
+        max_workers: The maximum number of threads to use.
+
+    Returns:
+        list: The return values of calls, in the order calls were given.
+
+    Raises:
+        The first exception raised by any of calls, after all have finished.
+    """
+    return map_concurrently(lambda call: call(), calls, max_workers=max_workers)
+
+
+def map_concurrently(function, items, max_workers=MAX_WORKERS):
+    """
+    Return a list of function applied to each of items, using a thread pool.
+
+    Args:
+        function: A callable taking a single argument.
+        items: An iterable of arguments for function.
+
+    Kwargs:
+        max_workers: The maximum number of threads to use.
+
+    Returns:
+        list: The return values of function, in the order of items.
+
+    Raises:
+        The first exception raised by function, after all calls have finished.
+    """
+    items = list(items)
+    if len(items) < 2:
+        return [function(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        futures = [executor.submit(function, item) for item in items]
+    return [future.result() for future in futures]
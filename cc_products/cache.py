@@ -0,0 +1,167 @@
+"""
+Process wide caches for Cloud Commerce data.
+
+Each cache keeps separate values for every client, so requests made with
+different clients, or to different accounts, never share data.
+"""
+
+import threading
+import time
+import weakref
+
+
+class Cache:
+    """
+    Thread safe store of values retrieved from Cloud Commerce.
+
+    Expired values are removed when they are looked up, and every expired
+    value is removed when a value is set, at most once each ttl. The number
+    of lookups which found a value, and which did not, are kept as hits and
+    misses.
+
+    Kwargs:
+        ttl: The number of seconds for which values are kept. If None values
+            are kept until they are invalidated.
+        on_lookup: Callable called with True for each lookup which found a
+            value, and False for each which did not.
+    """
+
+    def __init__(self, ttl=None, on_lookup=None):
+        """Create an empty cache."""
+        self.ttl = ttl
+        self.on_lookup = on_lookup
+        self._data = {}
+        self._next_purge = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        with self._lock:
+            return self._lookup(key) is not None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def get(self, key, default=None):
+        """Return the value cached for key, or default if there is none."""
+        with self._lock:
+            entry = self._lookup(key)
+        if entry is None:
+            return default
+        return entry[0]
+
+    def set(self, key, value):
+        """Cache value for key."""
+        now = time.monotonic()
+        expires = None if self.ttl is None else now + self.ttl
+        with self._lock:
+            if expires is not None and now >= self._next_purge:
+                self._purge(now)
+                self._next_purge = expires
+            self._data[key] = (value, expires)
+
+    def get_or_set(self, key, function):
+        """
+        Return the value cached for key, calling function to create it if needed.
+
+        Args:
+            key: The key under which the value is cached.
+            function: Callable taking no arguments which returns the value.
+        """
+        with self._lock:
+            entry = self._lookup(key)
+        if entry is not None:
+            return entry[0]
+        value = function()
+        self.set(key, value)
+        return value
+
+    def invalidate(self, *keys):
+        """Remove keys from the cache. Remove everything if no keys are given."""
+        with self._lock:
+            if not keys:
+                self._data.clear()
+            for key in keys:
+                self._data.pop(key, None)
+
+    def _purge(self, now):
+        expired = [k for k, (_, expires) in self._data.items() if expires < now]
+        for key in expired:
+            del self._data[key]
+
+    def _lookup(self, key):
+        entry = self._data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] < time.monotonic():
+            del self._data[key]
+            entry = None
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        if self.on_lookup is not None:
+            self.on_lookup(entry is not None)
+        return entry
+
+
+class ClientCaches:
+    """
+    A separate Cache for each Cloud Commerce API client.
+
+    Values loaded with one client are never returned for another. A client's
+    Cache is discarded when the client is garbage collected, but its hits and
+    misses are kept in the totals returned by stats.
+
+    Kwargs:
+        ttl: The number of seconds for which values are kept. If None values
+            are kept until they are invalidated.
+    """
+
+    def __init__(self, ttl=None):
+        """Create an empty set of caches."""
+        self.ttl = ttl
+        self._caches = weakref.WeakKeyDictionary()
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+    def for_client(self, client):
+        """Return the Cache for client."""
+        with self._lock:
+            try:
+                return self._caches[client]
+            except KeyError:
+                cache = self._caches[client] = Cache(
+                    ttl=self.ttl, on_lookup=self._count_lookup
+                )
+                return cache
+
+    def stats(self):
+        """Return the total hits and misses of every client's Cache."""
+        with self._stats_lock:
+            return self._hits, self._misses
+
+    def _count_lookup(self, hit):
+        with self._stats_lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+    def invalidate(self, *keys):
+        """Remove keys from the caches of every client, or everything."""
+        with self._lock:
+            caches = list(self._caches.values())
+        for cache in caches:
+            cache.invalidate(*keys)
+
+
+SALES_CHANNELS_TTL = 60
+FACTORY_LINKS_TTL = 300
+
+sales_channels = ClientCaches(ttl=SALES_CHANNELS_TTL)
+shop_options = ClientCaches()
+pending_stock = ClientCaches(ttl=30)
+factory_links = ClientCaches(ttl=FACTORY_LINKS_TTL)
@@ -0,0 +1,94 @@
+"""
+Access to the Cloud Commerce API client.
+
+All requests made by cc_products go through a client object with the same
+interface as ccapi.CCAPI. Functions and classes which make requests accept a
+client argument. When it is not given the default client is used, which is
+ccapi.CCAPI unless another has been set with set_default_client.
+
+Clients which send requests with a requests.Session, available as their
+session attribute, can share a pool of keep alive connections between
+threads:
+
+    >>> set_default_client(client, pool_size=20)
+    >>> get_range(range_id)
+    >>> get_pooling_adapter().metrics()
+"""
+
+import threading
+import weakref
+
+_default_client = None
+_adapters = weakref.WeakKeyDictionary()
+_adapters_lock = threading.Lock()
+
+
+def get_client(client=None):
+    """Return client, or the default client if client is None."""
+    if client is not None:
+        return client
+    if _default_client is not None:
+        return _default_client
+    from ccapi import CCAPI
+
+    return CCAPI
+
+
+def set_default_client(client, pool_size=None, pool_block=False):
+    """
+    Set the client used when none is given. If client is None use CCAPI.
+
+    Kwargs:
+        pool_size: If not None the client's session is configured to keep up
+            to this many connections to each host open, with
+            enable_pooling.
+        pool_block: If True requests wait for a free connection when all
+            pooled connections are in use.
+    """
+    global _default_client
+    _default_client = client
+    if pool_size is not None:
+        enable_pooling(client, pool_size=pool_size, pool_block=pool_block)
+
+
+def enable_pooling(client=None, pool_size=None, pool_block=False, compression=True):
+    """
+    Send the requests of a client through a pool of keep alive connections.
+
+    Kwargs:
+        client: The Cloud Commerce API client. It must make its requests
+            with the requests.Session stored as its session attribute. If
+            None the default client is used.
+        pool_size: The maximum number of open connections to each host.
+            Defaults to cc_products.pooling.POOL_SIZE.
+        pool_block: If True requests wait for a free connection when all
+            connections to a host are in use.
+        compression: If True ask for compressed responses.
+
+    Returns:
+        The cc_products.pooling.PoolingAdapter used by the client.
+
+    Raises:
+        ValueError if the client has no session.
+    """
+    from . import pooling
+
+    client = get_client(client)
+    session = getattr(client, "session", None)
+    if session is None:
+        raise ValueError("{!r} has no session to pool.".format(client))
+    adapter = pooling.configure_session(
+        session,
+        pool_size=pool_size or pooling.POOL_SIZE,
+        pool_block=pool_block,
+        compression=compression,
+    )
+    with _adapters_lock:
+        _adapters[client] = adapter
+    return adapter
+
+
+def get_pooling_adapter(client=None):
+    """Return the PoolingAdapter used by a client, or None if it has none."""
+    with _adapters_lock:
+        return _adapters.get(get_client(client))
@@ -21,6 +21,16 @@ class FactoryDoesNotExist(KeyError):
         )
 
 
+class ProductOptionDoesNotExist(KeyError):
+    """No Product Option exists with given name."""
+
+    def __init__(self, option_name):
+        """Return exception message."""
+        return super().__init__(
+            'No Product Option exists with name "{}".'.format(option_name)
+        )
+
+
 class DepartmentError(ValueError):
     """Base exeption for errors relating to product Departments."""
 
@@ -43,3 +53,41 @@ class MixedDepartmentsError(DepartmentError):
     def __init__(self, product_range):
         """Return exception message."""
         return super().__init__("{} has mixed departments.".format(product_range))
+
+
+class OptionValueNotRecognised(ValueError):
+    """Product Option value can not be converted to a Python value."""
+
+    def __init__(self, value):
+        """Return exception message."""
+        return super().__init__(
+            'Product Option value "{}" not recognised.'.format(value)
+        )
+
+
+class ValidationError(ValueError):
+    """Changes to products are not valid."""
+
+    def __init__(self, invalid_changes):
+        """Return exception message."""
+        self.invalid_changes = invalid_changes
+        return super().__init__(
+            "{} invalid changes: {}".format(
+                len(invalid_changes),
+                "; ".join(
+                    "{}.{}: {}".format(c.product, c.attribute, c.message)
+                    for c in invalid_changes
+                ),
+            )
+        )
+
+
+class CircuitOpenError(Exception):
+    """Requests are not being sent because the API is failing."""
+
+    def __init__(self, retry_after):
+        """Return exception message."""
+        self.retry_after = retry_after
+        return super().__init__(
+            "Circuit open, retry after {:.1f} seconds.".format(retry_after)
+        )
@@ -0,0 +1,424 @@
+"""
+An in memory stand in for the Cloud Commerce API.
+
+FakeCCAPI implements the parts of the ccapi.CCAPI interface used by
+cc_products, storing everything in memory. It can be passed as the client to
+any cc_products function or class, or set as the default client, to use
+cc_products without network access.
+
+    >>> client = FakeCCAPI()
+    >>> range_id = client.create_range("Test Range")
+    >>> product_range = cc_products.get_range(range_id, client=client)
+"""
+
+import itertools
+import threading
+from types import SimpleNamespace
+
+
+class FakeCCAPIError(Exception):
+    """Exception raised for requests FakeCCAPI can not fulfil."""
+
+
+class FakeCCAPI:
+    """In memory implementation of the Cloud Commerce API used by cc_products."""
+
+    RANGE_FIELDS = (
+        "ID",
+        "FullName",
+        "ManufacturerSKU",
+        "RangeID",
+        "ProductType",
+        "defaultImageUrl",
+        "Name",
+        "Description",
+        "Barcode",
+        "EndOfLine",
+        "StockLevel",
+        "DeliveryLeadTimeDays",
+        "HSCode",
+        "CountryOfOriginId",
+    )
+
+    def __init__(self):
+        """Create an empty backend."""
+        self._ids = itertools.count(1)
+        self._lock = threading.RLock()
+        self.ranges = {}
+        self.products = {}
+        self.options = {}
+        self.option_values = {}
+        self.range_options = {}
+        self.product_options = {}
+        self.sales_channels = {}
+        self.bays = {}
+        self.pending_stock = {}
+        self.factories = {}
+        self.factory_links = {}
+
+    def _new_id(self):
+        return str(next(self._ids))
+
+    def _product(self, product_id):
+        try:
+            return self.products[str(product_id)]
+        except KeyError:
+            raise FakeCCAPIError("No product with ID {}.".format(product_id))
+
+    def _range(self, range_id):
+        try:
+            return self.ranges[str(range_id)]
+        except KeyError:
+            raise FakeCCAPIError("No range with ID {}.".format(range_id))
+
+    def add_option(self, name):
+        """Create a shop Product Option and return its ID."""
+        with self._lock:
+            option_id = self._new_id()
+            self.options[option_id] = name
+            self.option_values[option_id] = {}
+            return option_id
+
+    def add_factory(self, name):
+        """Create a Factory and return it."""
+        with self._lock:
+            factory = SimpleNamespace(id=self._new_id(), name=name)
+            self.factories[factory.id] = factory
+            return factory
+
+    def add_sales_channel(self, range_id, channel_id):
+        """List a Product Range on a Sales Channel."""
+        with self._lock:
+            self.sales_channels[str(range_id)].append(
+                SimpleNamespace(id=str(channel_id))
+            )
+
+    def create_range(self, range_name, sku=None):
+        """Create a Product Range and return its ID."""
+        with self._lock:
+            range_id = self._new_id()
+            self.ranges[range_id] = {
+                "ID": range_id,
+                "Name": range_name,
+                "ManufacturerSKU": sku or "RNG_{}".format(range_id),
+                "EndOfLine": False,
+                "ThumbNail": "",
+                "PreOrder": False,
+                "Grouped": False,
+                "ProductIDs": [],
+            }
+            self.range_options[range_id] = {}
+            self.sales_channels[range_id] = []
+            return range_id
+
+    def delete_range(self, range_id):
+        """Delete a Product Range and its products."""
+        with self._lock:
+            for product_id in self._range(range_id)["ProductIDs"]:
+                del self.products[product_id]
+            del self.ranges[str(range_id)]
+
+    def get_range(self, range_id):
+        """Return a Product Range with range data for its products."""
+        with self._lock:
+            range_data = dict(self._range(range_id))
+            product_ids = range_data.pop("ProductIDs")
+            range_data["Products"] = [
+                {key: self.products[p][key] for key in self.RANGE_FIELDS}
+                for p in product_ids
+            ]
+            return SimpleNamespace(json=range_data)
+
+    def update_range_settings(
+        self,
+        range_id,
+        current_name=None,
+        current_sku=None,
+        current_end_of_line=None,
+        current_pre_order=None,
+        current_group_items=None,
+        new_name=None,
+        new_sku=None,
+        new_end_of_line=None,
+        new_pre_order=None,
+        new_group_items=None,
+        channels=None,
+    ):
+        """Update the settings of a Product Range."""
+        with self._lock:
+            range_data = self._range(range_id)
+            range_data["Name"] = new_name
+            range_data["ManufacturerSKU"] = new_sku
+            range_data["EndOfLine"] = new_end_of_line
+            range_data["PreOrder"] = new_pre_order
+            range_data["Grouped"] = new_group_items
+
+    def get_sales_channels_for_range(self, range_id):
+        """Return the Sales Channels on which a Product Range is listed."""
+        with self._lock:
+            self._range(range_id)
+            return list(self.sales_channels[str(range_id)])
+
+    def create_product(
+        self, range_id, name, barcode, sku=None, description=None, vat_rate=20
+    ):
+        """Create a product in a Product Range and return its ID."""
+        with self._lock:
+            range_data = self._range(range_id)
+            product_id = self._new_id()
+            self.products[product_id] = {
+                "ID": product_id,
+                "FullName": name,
+                "ManufacturerSKU": sku or "SKU-{}".format(product_id),
+                "RangeID": range_data["ID"],
+                "ProductType": 0,
+                "defaultImageUrl": "",
+                "ExternalProductId": None,
+                "Name": name,
+                "Description": description or name,
+                "Barcode": barcode,
+                "EndOfLine": False,
+                "StockLevel": 0,
+                "LengthMM": 0,
+                "WidthMM": 0,
+                "HeightMM": 0,
+                "LargeLetterCompatible": False,
+                "WeightGM": 0,
+                "DeliveryLeadTimeDays": 1,
+                "BasePrice": 0,
+                "VatRateID": None,
+                "HSCode": None,
+                "CountryOfOriginId": None,
+            }
+            range_data["ProductIDs"].append(product_id)
+            self.product_options[product_id] = {}
+            self.bays[product_id] = []
+            self.pending_stock[product_id] = 0
+            self.factory_links[product_id] = []
+            self.set_product_vat_rate([product_id], vat_rate)
+            return product_id
+
+    def get_product(self, product_id):
+        """Return a product."""
+        with self._lock:
+            product = dict(self._product(product_id))
+            return SimpleNamespace(json=product, description=product["Description"])
+
+    def _set_product_field(self, product_ids, field, value):
+        with self._lock:
+            for product_id in product_ids:
+                self._product(product_id)[field] = value
+
+    def set_product_name(self, product_ids, name):
+        """Set the name of products."""
+        self._set_product_field(product_ids, "Name", name)
+
+    def set_product_description(self, product_ids, description):
+        """Set the description of products."""
+        self._set_product_field(product_ids, "Description", description)
+
+    def set_product_barcode(self, product_id, barcode):
+        """Set the barcode of a product."""
+        self._set_product_field([product_id], "Barcode", barcode)
+
+    def set_product_handling_time(self, product_id, handling_time):
+        """Set the handling time of a product."""
+        self._set_product_field([product_id], "DeliveryLeadTimeDays", handling_time)
+
+    def set_product_base_price(self, product_id, price):
+        """Set the base price of a product."""
+        self._set_product_field([product_id], "BasePrice", price)
+
+    def set_hs_code(self, product_IDs, HS_code):
+        """Set the HS Code of products."""
+        self._set_product_field(product_IDs, "HSCode", HS_code)
+
+    def set_country_of_origin(self, product_id, country_id):
+        """Set the country of origin of a product."""
+        self._set_product_field([product_id], "CountryOfOriginId", country_id)
+
+    def set_product_vat_rate(self, product_ids, vat_rate):
+        """Set the VAT rate of products."""
+        from ccapi import VatRates
+
+        vat_rate_id = VatRates.get_vat_rate_id_by_rate(vat_rate)
+        self._set_product_field(product_ids, "VatRateID", vat_rate_id)
+
+    def set_product_scope(
+        self,
+        product_id,
+        weight,
+        height,
+        length,
+        width,
+        large_letter_compatible,
+        external_id=None,
+    ):
+        """Set the weight, dimensions and external ID of a product."""
+        with self._lock:
+            product = self._product(product_id)
+            product["WeightGM"] = weight
+            product["HeightMM"] = height
+            product["LengthMM"] = length
+            product["WidthMM"] = width
+            product["LargeLetterCompatible"] = large_letter_compatible
+            product["ExternalProductId"] = external_id
+
+    def update_product_stock_level(self, product_id, new_stock_level, old_stock_level):
+        """Set the stock level of a product if it is currently old_stock_level."""
+        with self._lock:
+            product = self._product(product_id)
+            if product["StockLevel"] != old_stock_level:
+                raise FakeCCAPIError(
+                    "Stock level for product {} is not {}.".format(
+                        product_id, old_stock_level
+                    )
+                )
+            product["StockLevel"] = new_stock_level
+
+    def get_pending_stock(self, product_id):
+        """Return the pending stock level of a product."""
+        with self._lock:
+            self._product(product_id)
+            return self.pending_stock[str(product_id)]
+
+    def get_bays_for_product(self, product_id):
+        """Return the Warehouse Bays in which a product is located."""
+        with self._lock:
+            self._product(product_id)
+            return [SimpleNamespace(id=bay) for bay in self.bays[str(product_id)]]
+
+    def add_warehouse_bay_to_product(self, product_id, bay_id):
+        """Add a Warehouse Bay to a product."""
+        with self._lock:
+            self._product(product_id)
+            self.bays[str(product_id)].append(int(bay_id))
+
+    def remove_warehouse_bay_from_product(self, product_id, bay_id):
+        """Remove a Warehouse Bay from a product."""
+        with self._lock:
+            self._product(product_id)
+            self.bays[str(product_id)].remove(int(bay_id))
+
+    def get_product_range_options(self, range_id):
+        """Return the shop's Product Options and those used by a Product Range."""
+        with self._lock:
+            self._range(range_id)
+            return SimpleNamespace(
+                shop_options=[
+                    SimpleNamespace(id=option_id, name=name)
+                    for option_id, name in self.options.items()
+                ],
+                options=[
+                    SimpleNamespace(id=option_id, is_web_shop_select=drop_down)
+                    for option_id, drop_down in self.range_options[
+                        str(range_id)
+                    ].items()
+                ],
+            )
+
+    def add_option_to_product(self, range_id, option_id):
+        """Select a Product Option for a Product Range."""
+        with self._lock:
+            self._range(range_id)
+            self.range_options[str(range_id)].setdefault(option_id, False)
+
+    def remove_option_from_product(self, range_id, option_id):
+        """Remove a Product Option from a Product Range."""
+        with self._lock:
+            self._range(range_id)
+            self.range_options[str(range_id)].pop(option_id, None)
+
+    def set_range_option_drop_down(self, range_id, option_id, drop_down):
+        """Set whether a Product Option is a drop down for a Product Range."""
+        with self._lock:
+            self._range(range_id)
+            if option_id not in self.range_options[str(range_id)]:
+                raise FakeCCAPIError(
+                    "Option {} is not selected for range {}.".format(
+                        option_id, range_id
+                    )
+                )
+            self.range_options[str(range_id)][option_id] = drop_down
+
+    def get_option_value_id(self, option_id, value, create=False):
+        """Return the ID of a Product Option Value."""
+        with self._lock:
+            values = self.option_values[option_id]
+            if value not in values:
+                if not create:
+                    raise FakeCCAPIError(
+                        "Option {} has no value {}.".format(option_id, value)
+                    )
+                values[value] = self._new_id()
+            return values[value]
+
+    def set_product_option_value(self, product_ids, option_id, option_value_id):
+        """Set the value of a Product Option for products."""
+        with self._lock:
+            values = {
+                value_id: value
+                for value, value_id in self.option_values[option_id].items()
+            }
+            for product_id in product_ids:
+                self._product(product_id)
+                self.product_options[str(product_id)][option_id] = values[
+                    option_value_id
+                ]
+
+    def get_options_for_product(self, product_id):
+        """Return the Product Options of a product, with their values."""
+        with self._lock:
+            product = self._product(product_id)
+            values = self.product_options[product["ID"]]
+            option_ids = list(self.range_options[product["RangeID"]])
+            option_ids += [o for o in values if o not in option_ids]
+            return [
+                SimpleNamespace(
+                    id=option_id,
+                    option_name=self.options[option_id],
+                    value=(
+                        SimpleNamespace(value=values[option_id])
+                        if option_id in values
+                        else None
+                    ),
+                )
+                for option_id in option_ids
+            ]
+
+    def get_factories(self):
+        """Return the shop's Factories."""
+        with self._lock:
+            factories = list(self.factories.values())
+            return SimpleNamespace(
+                factories=factories, names={f.name: f for f in factories}
+            )
+
+    def get_product_factory_links(self, product_id):
+        """Return the Factory Links for a product."""
+        with self._lock:
+            self._product(product_id)
+            return list(self.factory_links[str(product_id)])
+
+    def update_product_factory_link(
+        self, product_id, factory_id, dropship=False, supplier_sku="", price=0
+    ):
+        """Link a product to a Factory."""
+        with self._lock:
+            self._product(product_id)
+            links = self.factory_links[str(product_id)]
+            link = SimpleNamespace(
+                product_id=str(product_id),
+                factory_id=factory_id,
+                factory_name=self.factories[factory_id].name,
+                dropship=dropship,
+                supplier_sku=supplier_sku,
+                price=price,
+            )
+            link.delete = lambda: self._delete_factory_link(link)
+            links.append(link)
+            return link
+
+    def _delete_factory_link(self, link):
+        with self._lock:
+            self.factory_links[link.product_id].remove(link)
@@ -1,24 +1,289 @@
 """Main methods for cc_products."""
 
-from ccapi import CCAPI
+from collections import defaultdict
 
-from .productrange import ProductRange
-from .variation import Variation
+from . import batch, cache, exceptions, metrics, refresh
+from .client import get_client
+from .productoptions import get_shop_options
+from .productrange import ProductRange, get_sales_channels
+from .variation import Variation, get_factory
 
 
-def get_product(product_id):
+def get_product(product_id, client=None):
     """Retrive a Product from Cloud Commerce."""
-    product = CCAPI.get_product(product_id).json
-    return Variation(product)
+    client = get_client(client)
+    product = client.get_product(product_id).json
+    return Variation(product, client=client)
 
 
-def get_range(range_id):
-    """Retrive a Product Range from Cloud Commerce."""
-    product_range = ProductRange(CCAPI.get_range(range_id).json)
+def get_range(range_id, client=None):
+    """
+    Retrive a Product Range from Cloud Commerce.
+
+    If a RangeRefresher is running for the client a warm copy of the range
+    may be returned.
+    """
+    client = get_client(client)
+    refresher = refresh.get_refresher()
+    if refresher is not None and refresher.client is client:
+        return refresher.get_range(range_id)
+    return load_range(range_id, client=client)
+
+
+def load_range(range_id, client=None):
+    """Load a Product Range from Cloud Commerce."""
+    client = get_client(client)
+    with metrics.timed("range_load"):
+        product_range = ProductRange(client.get_range(range_id).json, client=client)
     return product_range
 
 
-def create_range(title):
+def create_range(title, client=None):
     """Create a new Product Range."""
-    range_id = CCAPI.create_range(title)
-    return get_range(range_id)
+    client = get_client(client)
+    range_id = client.create_range(title)
+    return get_range(range_id, client=client)
+
+
+def create_range_from_template(template, client=None, progress=None):
+    """
+    Create a Product Range and its products from a template.
+
+    Products are created concurrently and built from the values used to
+    create them rather than being reloaded. Option values shared by several
+    products are set for all of them with one request.
+
+    Args:
+        template: dict containing:
+            name: The name of the Product Range.
+            products: list of dicts containing the barcode, description and
+                vat_rate of each product, and optionally options, a dict of
+                Product Option names to values for the product.
+            options (optional): dict of Product Option names to values for
+                every product.
+            variable (optional): list of the names of the Product Options to
+                use as Variation Options.
+
+    Kwargs:
+        client: The Cloud Commerce API client to use.
+        progress: Callable taking the number of completed and total requests,
+            called as the range is created.
+
+    Returns:
+        The new cc_products.ProductRange.
+    """
+    client = get_client(client)
+    products = template["products"]
+    variable = list(template.get("variable", []))
+    option_values = defaultdict(list)
+    for index, product in enumerate(products):
+        options = dict(template.get("options", {}), **product.get("options", {}))
+        for option_name, value in options.items():
+            option_values[(option_name, str(value))].append(index)
+    progress = batch.Progress(progress, total=len(products) + len(option_values) + 3)
+    range_id = client.create_range(template["name"])
+    progress.step()
+
+    def create_product(product):
+        product_id = client.create_product(
+            range_id=range_id,
+            name=template["name"],
+            barcode=product["barcode"],
+            description=product.get("description"),
+            vat_rate=product["vat_rate"],
+        )
+        progress.step()
+        return product_id
+
+    range_data, *product_ids = batch.run_concurrently(
+        lambda: client.get_range(range_id).json,
+        *[lambda product=product: create_product(product) for product in products],
+    )
+    progress.step()
+    product_range = ProductRange(dict(range_data, Products=[]), client=client)
+    product_range.products = [
+        Variation.create_from_new_product(
+            product_id,
+            product_range,
+            barcode=product["barcode"],
+            vat_rate=product["vat_rate"],
+            description=product.get("description"),
+        )
+        for product_id, product in zip(product_ids, products)
+    ]
+    product_range.options.update(
+        selected={option_name for option_name, _ in option_values} | set(variable),
+        variable=variable,
+    )
+    progress.step()
+
+    def set_option_value(option_value):
+        (option_name, value), indexes = option_value
+        product_range._set_product_option_value(
+            option_name, value, products=[product_range.products[i] for i in indexes]
+        )
+        progress.step()
+
+    batch.map_concurrently(set_option_value, option_values.items())
+    return product_range
+
+
+def prefetch_sales_channels(range_ids, client=None):
+    """Load the Sales Channels for multiple Product Ranges into the cache."""
+    batch.map_concurrently(
+        lambda range_id: get_sales_channels(range_id, client=client), range_ids
+    )
+
+
+def rename_ranges(names, client=None):
+    """
+    Rename multiple Product Ranges concurrently.
+
+    Each range is loaded at the same time as its Sales Channels, after which
+    the product names and range settings are updated together.
+
+    Args:
+        names: dict of Product Range IDs to new names.
+
+    Kwargs:
+        client: The Cloud Commerce API client to use.
+
+    Returns:
+        dict of Product Range IDs to renamed cc_products.ProductRange objects.
+    """
+
+    def rename(range_id):
+        product_range, _ = batch.run_concurrently(
+            lambda: get_range(range_id, client=client),
+            lambda: get_sales_channels(range_id, client=client),
+        )
+        product_range.name = names[range_id]
+        return product_range
+
+    return dict(zip(names, batch.map_concurrently(rename, names)))
+
+
+def prefetch_factory_links(product_ids, client=None):
+    """
+    Load the Factory Links for multiple products into the cache.
+
+    Returns:
+        dict of Product IDs to lists of Factory Links.
+    """
+    client = get_client(client)
+    links = batch.map_concurrently(client.get_product_factory_links, product_ids)
+    cached_links = cache.factory_links.for_client(client)
+    for product_id, product_links in zip(product_ids, links):
+        cached_links.set(product_id, product_links)
+    return dict(zip(product_ids, links))
+
+
+def reassign_supplier(products, factory, client=None):
+    """
+    Link many products to a new Factory and set their Supplier option.
+
+    Existing Factory Links are loaded concurrently, then each product's links
+    are replaced concurrently, keeping the supplier SKU of its current link.
+    The new link is created before the old links are deleted, so a product
+    keeps its links if the new one cannot be created. The Supplier Product
+    Option is set for every product with one request.
+
+    Args:
+        products: Product IDs or cc_products.Variation objects.
+        factory: The name of a Factory, or a ccapi Factory.
+
+    Kwargs:
+        client: The Cloud Commerce API client to use.
+
+    Returns:
+        dict of Product IDs to the new Factory Links.
+
+    Raises:
+        cc_products.exceptions.FactoryDoesNotExist if no Factory has the name.
+        cc_products.exceptions.ProductOptionDoesNotExist if the shop has no
+            Supplier Product Option.
+    """
+    client = get_client(client)
+    factory = get_factory(factory, client=client)
+    products = list(products)
+    products, links = batch.run_concurrently(
+        lambda: batch.map_concurrently(
+            lambda product: (
+                product
+                if isinstance(product, Variation)
+                else get_product(product, client=client)
+            ),
+            products,
+        ),
+        lambda: prefetch_factory_links(
+            [getattr(product, "id", product) for product in products], client=client
+        ),
+    )
+    if not products:
+        return {}
+    product_ids = [product.id for product in products]
+
+    def relink(product):
+        old_links = links[product.id]
+        try:
+            new_link = client.update_product_factory_link(
+                product_id=product.id,
+                factory_id=factory.id,
+                supplier_sku=(
+                    getattr(old_links[0], "supplier_sku", "") if old_links else ""
+                ),
+            )
+            for link in old_links:
+                # A link to the same Factory may have been updated in place.
+                if getattr(link, "factory_id", None) != factory.id:
+                    link.delete()
+            return new_link
+        finally:
+            cache.factory_links.for_client(client).invalidate(product.id)
+
+    new_links = batch.run_concurrently(
+        lambda: _set_supplier_option(products, factory.name, client),
+        *[lambda product=product: relink(product) for product in products],
+    )[1:]
+    return dict(zip(product_ids, new_links))
+
+
+def _set_supplier_option(products, value, client):
+    ranges = {}
+    for product in products:
+        ranges.setdefault(product.range_id, product._product_range)
+    first_range_id = next(iter(ranges))
+    option_data = {first_range_id: client.get_product_range_options(first_range_id)}
+    option_id = next(
+        (
+            o.id
+            for o in get_shop_options(option_data[first_range_id], client=client)
+            if o.name == "Supplier"
+        ),
+        None,
+    )
+    if option_id is None:
+        raise exceptions.ProductOptionDoesNotExist("Supplier")
+
+    def select(range_id):
+        product_range = ranges[range_id]
+        if product_range is not None:
+            option = product_range.options["Supplier"]
+            if not option.selected:
+                option.selected = True
+            return
+        if range_id not in option_data:
+            option_data[range_id] = client.get_product_range_options(range_id)
+        if option_id not in {o.id for o in option_data[range_id].options}:
+            client.add_option_to_product(range_id=range_id, option_id=option_id)
+
+    batch.map_concurrently(select, ranges)
+    value_id = client.get_option_value_id(option_id, value, create=True)
+    client.set_product_option_value(
+        product_ids=[product.id for product in products],
+        option_id=option_id,
+        option_value_id=value_id,
+    )
+    for product in products:
+        if product._options is not None:
+            product._options._set_cached_value(option_id, "Supplier", value)
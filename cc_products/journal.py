@@ -0,0 +1,332 @@
+"""
+Write-ahead journal for resumable bulk updates.
+
+A JournalingClient wraps a Cloud Commerce API client. Before each write is
+sent its endpoint and arguments are appended to a journal file, and once it
+succeeds the write is marked complete. If a job stops part way through,
+resume replays only the writes which were not completed.
+
+    >>> client = JournalingClient(CCAPI, "price_update.journal")
+    >>> for product in get_range(range_id, client=client):
+    ...     product.retail_price = new_prices[product.sku]
+
+After an interruption:
+
+    >>> report = resume("price_update.journal")
+
+The journal is a text file containing one JSON object per line. Writes are
+recorded as {"id", "endpoint", "args", "kwargs"} and completions as
+{"complete": id}.
+"""
+
+import json
+import os
+import threading
+import uuid
+from collections import defaultdict
+
+from . import batch
+from .client import get_client
+
+WRITE_ENDPOINTS = frozenset(
+    (
+        "add_option_to_product",
+        "add_warehouse_bay_to_product",
+        "remove_option_from_product",
+        "remove_warehouse_bay_from_product",
+        "set_country_of_origin",
+        "set_hs_code",
+        "set_product_barcode",
+        "set_product_base_price",
+        "set_product_description",
+        "set_product_handling_time",
+        "set_product_name",
+        "set_product_option_value",
+        "set_product_scope",
+        "set_product_vat_rate",
+        "set_range_option_drop_down",
+        "update_product_factory_link",
+        "update_product_stock_level",
+        "update_range_settings",
+    )
+)
+
+# Endpoints accepting many products, with the name of the product ID argument
+# and of any arguments which select what is written for each product.
+BATCHED_ENDPOINTS = {
+    "set_hs_code": ("product_IDs", ()),
+    "set_product_description": ("product_ids", ()),
+    "set_product_name": ("product_ids", ()),
+    "set_product_option_value": ("product_ids", ("option_id",)),
+    "set_product_vat_rate": ("product_ids", ()),
+}
+
+
+class Journal:
+    """
+    Append only record of writes to Cloud Commerce.
+
+    Args:
+        path: The path of the journal file. It is created if it does not
+            exist and appended to if it does.
+
+    Kwargs:
+        sync: If True the file is synced to disk after every line, so that
+            entries survive a crash of the machine as well as the process.
+    """
+
+    def __init__(self, path, sync=False):
+        """Open the journal file."""
+        self.path = path
+        self.sync = sync
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def record(self, endpoint, args=(), kwargs=None):
+        """
+        Add a write to the journal before it is sent.
+
+        Returns:
+            str: The ID of the journal entry.
+        """
+        entry_id = uuid.uuid4().hex
+        self._write(
+            {
+                "id": entry_id,
+                "endpoint": endpoint,
+                "args": list(args),
+                "kwargs": kwargs or {},
+            }
+        )
+        return entry_id
+
+    def complete(self, *entry_ids):
+        """Mark journal entries as successfully sent."""
+        for entry_id in entry_ids:
+            self._write({"complete": entry_id})
+
+    def pending(self):
+        """Return a list of the entries not marked complete, in order."""
+        with self._lock:
+            self._file.flush()
+            return pending_entries(self.path)
+
+    def close(self):
+        """Close the journal file."""
+        with self._lock:
+            self._file.close()
+
+    def _write(self, entry):
+        line = json.dumps(entry) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            if self.sync:
+                os.fsync(self._file.fileno())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class JournalingClient:
+    """
+    Cloud Commerce API client which journals writes before sending them.
+
+    Calls to endpoints in WRITE_ENDPOINTS are recorded in the journal and
+    marked complete when they return. Writes which raise are left pending.
+    All other attributes are taken from the wrapped client.
+
+    Args:
+        client: The Cloud Commerce API client to wrap. If None the default
+            client is used.
+        journal: A Journal, or the path of a journal file.
+    """
+
+    def __init__(self, client, journal):
+        """Wrap client."""
+        self.client = get_client(client)
+        if not isinstance(journal, Journal):
+            journal = Journal(journal)
+        self.journal = journal
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        if name not in WRITE_ENDPOINTS:
+            return attr
+
+        def journaled(*args, **kwargs):
+            entry_id = self.journal.record(name, args, kwargs)
+            result = attr(*args, **kwargs)
+            self.journal.complete(entry_id)
+            return result
+
+        return journaled
+
+
+class ResumeReport:
+    """
+    Summary of a resumed journal.
+
+    Attributes:
+        replayed: list of the IDs of entries which were sent.
+        superseded: list of the IDs of entries which were not sent because a
+            later entry writes the same value for the same products.
+        failed: dict of entry IDs to the exception raised sending them.
+        requests: The number of requests sent.
+    """
+
+    def __init__(self):
+        """Create an empty summary."""
+        self.replayed = []
+        self.superseded = []
+        self.failed = {}
+        self.requests = 0
+
+    def __repr__(self):
+        return "Replayed: {}, Superseded: {}, Failed: {}, Requests: {}".format(
+            len(self.replayed), len(self.superseded), len(self.failed), self.requests
+        )
+
+
+def pending_entries(path):
+    """Return a list of the entries in a journal file not marked complete."""
+    entries = {}
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as journal_file:
+        for line in journal_file:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # The last line may be incomplete if the process was killed.
+                continue
+            if "complete" in entry:
+                entries.pop(entry["complete"], None)
+            else:
+                entries[entry["id"]] = entry
+    return list(entries.values())
+
+
+def _plan(entries):
+    """
+    Return the calls needed to send entries, and the IDs of superseded entries.
+
+    Each call is a tuple of endpoint, args, kwargs and the IDs of the entries
+    it completes. Only the last entry writing to each product with a batched
+    endpoint is kept, and kept entries which differ only in their products
+    are combined into one call.
+    """
+    owners = {}
+    for entry in entries:
+        key = _batch_key(entry)
+        if key is not None:
+            ids_arg, target = key
+            for product_id in entry["kwargs"][ids_arg]:
+                owners[(entry["endpoint"], target, product_id)] = entry["id"]
+    calls = []
+    groups = {}
+    superseded = []
+    for entry in entries:
+        endpoint, args, kwargs = entry["endpoint"], entry["args"], entry["kwargs"]
+        key = _batch_key(entry)
+        if key is None:
+            calls.append((endpoint, args, kwargs, [entry["id"]]))
+            continue
+        ids_arg, target = key
+        kwargs = dict(kwargs)
+        product_ids = [
+            product_id
+            for product_id in kwargs.pop(ids_arg)
+            if owners[(endpoint, target, product_id)] == entry["id"]
+        ]
+        if not product_ids:
+            superseded.append(entry["id"])
+            continue
+        group_key = (endpoint, json.dumps(kwargs, sort_keys=True))
+        if group_key not in groups:
+            groups[group_key] = (endpoint, [], dict(kwargs, **{ids_arg: []}), [])
+            calls.append(groups[group_key])
+        call = groups[group_key]
+        call[2][ids_arg].extend(p for p in product_ids if p not in call[2][ids_arg])
+        call[3].append(entry["id"])
+    return calls, superseded
+
+
+def _batch_key(entry):
+    if entry["endpoint"] not in BATCHED_ENDPOINTS or entry["args"]:
+        return None
+    ids_arg, target_args = BATCHED_ENDPOINTS[entry["endpoint"]]
+    if ids_arg not in entry["kwargs"]:
+        return None
+    return ids_arg, tuple(entry["kwargs"].get(arg) for arg in target_args)
+
+
+def _target(args, kwargs):
+    """Return the product or range a call writes to, if there is only one."""
+    for name in ("product_id", "range_id"):
+        if name in kwargs:
+            return kwargs[name]
+    if args:
+        return args[0]
+    return None
+
+
+def resume(journal, client=None, max_workers=batch.MAX_WORKERS):
+    """
+    Send the writes in a journal which were not completed.
+
+    Writes to batched endpoints which differ only in their products are
+    combined into one request, and writes overwritten by a later entry are
+    not sent. Other writes to the same product or range are sent in the order
+    they were journaled, while writes to different products are sent
+    concurrently. Each write is marked complete in the journal when it
+    succeeds, so resume can be run again if it is interrupted.
+
+    Args:
+        journal: A Journal, or the path of a journal file.
+
+    Kwargs:
+        client: The Cloud Commerce API client to send the writes with.
+        max_workers: The maximum number of concurrent requests.
+
+    Returns:
+        ResumeReport.
+    """
+    if not isinstance(journal, Journal):
+        with Journal(journal) as journal:
+            return resume(journal, client=client, max_workers=max_workers)
+    client = get_client(client)
+    calls, superseded = _plan(journal.pending())
+    journal.complete(*superseded)
+    chains = defaultdict(list)
+    for index, call in enumerate(calls):
+        target = _target(call[1], call[2])
+        chains[index if target is None else str(target)].append(call)
+
+    def send(chain):
+        results = []
+        for endpoint, args, kwargs, entry_ids in chain:
+            try:
+                getattr(client, endpoint)(*args, **kwargs)
+            except Exception as exception:
+                results.append((entry_ids, exception))
+            else:
+                journal.complete(*entry_ids)
+                results.append((entry_ids, None))
+        return results
+
+    report = ResumeReport()
+    report.superseded = superseded
+    for results in batch.map_concurrently(
+        send, chains.values(), max_workers=max_workers
+    ):
+        for entry_ids, exception in results:
+            report.requests += 1
+            if exception is None:
+                report.replayed.extend(entry_ids)
+            else:
+                report.failed.update(dict.fromkeys(entry_ids, exception))
+    return report
@@ -0,0 +1,458 @@
+"""
+Load test cc_products with many concurrent workers against FakeCCAPI.
+
+A catalogue of Product Ranges is created in a FakeCCAPI, which is wrapped by
+a FaultInjectingClient adding latency, throttling and errors to every
+request. Worker threads then repeatedly choose an operation from a weighted
+mix of workloads, such as loading a range with get_range, reading and
+writing descriptors, stock levels and Warehouse Bays, reading Factory Links
+and using range setters, and the time taken by each operation is recorded.
+
+    >>> report = run(workers=50, duration=30, latency=0.05, error_rate=0.01)
+    >>> print(report.summary())
+
+Or from the command line:
+
+    python -m cc_products.loadtest --workers 50 --duration 30 --latency 0.05
+"""
+
+import argparse
+import math
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from .fake import FakeCCAPI, FakeCCAPIError
+from .functions import get_range
+from .resilience import CircuitBreaker, ResilientClient, RetryPolicy
+
+OPTION_NAMES = ("Colour", "Department", "Retail Price", "Size")
+FACTORY_NAME = "Load Test Factory"
+BAY_IDS = tuple(range(1, 11))
+
+
+class InjectedError(FakeCCAPIError):
+    """Exception raised by FaultInjectingClient in place of a request."""
+
+
+class ThrottledError(InjectedError):
+    """Exception raised by FaultInjectingClient for a throttled request."""
+
+
+class FaultInjectingClient:
+    """
+    Cloud Commerce API client which delays requests and makes some fail.
+
+    Each request waits for latency plus a random part of jitter seconds
+    before it is sent, and then fails with ThrottledError with a probability
+    of throttle_rate, or with InjectedError with a probability of error_rate.
+
+    Args:
+        client: The Cloud Commerce API client to wrap, usually a FakeCCAPI.
+
+    Kwargs:
+        latency: The minimum number of seconds each request takes.
+        jitter: The maximum number of seconds added to latency.
+        error_rate: The fraction of requests which fail.
+        throttle_rate: The fraction of requests which are throttled.
+        seed: Seed for the random number generator.
+    """
+
+    def __init__(
+        self,
+        client,
+        latency=0.0,
+        jitter=0.0,
+        error_rate=0.0,
+        throttle_rate=0.0,
+        seed=None,
+    ):
+        """Wrap client."""
+        self.client = client
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.requests = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        def request(*args, **kwargs):
+            with self._lock:
+                self.requests[name] += 1
+                delay = self.latency + self._random.uniform(0, self.jitter)
+                outcome = self._random.random()
+            time.sleep(delay)
+            if outcome < self.throttle_rate:
+                raise ThrottledError("Request to {} throttled.".format(name))
+            if outcome < self.throttle_rate + self.error_rate:
+                raise InjectedError("Request to {} failed.".format(name))
+            return attr(*args, **kwargs)
+
+        return request
+
+
+def create_catalogue(client, ranges=20, products_per_range=5):
+    """
+    Add Product Ranges with products and Product Options to a FakeCCAPI.
+
+    Each product is linked to a Factory and located in one Warehouse Bay.
+
+    Returns:
+        list: The IDs of the Product Ranges created.
+    """
+    for name in OPTION_NAMES:
+        client.add_option(name)
+    factory = client.add_factory(FACTORY_NAME)
+    range_ids = []
+    for range_number in range(ranges):
+        range_id = client.create_range("Load Test Range {}".format(range_number))
+        for product_number in range(products_per_range):
+            product_id = client.create_product(
+                range_id=range_id,
+                name="Load Test Range {}".format(range_number),
+                barcode="{}{:04d}".format(range_number, product_number),
+            )
+            client.update_product_factory_link(
+                product_id=product_id,
+                factory_id=factory.id,
+                supplier_sku="SUP{}".format(product_id),
+            )
+            client.add_warehouse_bay_to_product(
+                product_id, BAY_IDS[product_number % len(BAY_IDS)]
+            )
+        range_ids.append(range_id)
+    return range_ids
+
+
+def load_range(client, range_id, rng):
+    """Load a Product Range and read the product fields of every product."""
+    for product in get_range(range_id, client=client):
+        product.name, product.sku, product.barcode
+
+
+def read_options(client, range_id, rng):
+    """Load a Product Range and read option descriptors of every product."""
+    for product in get_range(range_id, client=client):
+        product.colour, product.retail_price
+
+
+def write_option(client, range_id, rng):
+    """Set an option descriptor of one product."""
+    product = rng.choice(get_range(range_id, client=client).products)
+    product.retail_price = round(rng.uniform(1, 50), 2)
+
+
+def write_scope(client, range_id, rng):
+    """Set the weight of one product."""
+    product = rng.choice(get_range(range_id, client=client).products)
+    product.weight = rng.randint(1, 2000)
+
+
+def set_range_description(client, range_id, rng):
+    """Set the description of every product in a Product Range."""
+    product_range = get_range(range_id, client=client)
+    product_range.description = "Load test description {}".format(rng.random())
+
+
+def read_stock(client, range_id, rng):
+    """Read the stock level and pending stock of one product."""
+    product = rng.choice(get_range(range_id, client=client).products)
+    product.stock_level, product.get_pending_stock(use_cache=True)
+
+
+def write_stock(client, range_id, rng):
+    """Set the stock level of one product."""
+    product = rng.choice(get_range(range_id, client=client).products)
+    product.stock_level = rng.randint(0, 100)
+
+
+def read_bays(client, range_id, rng):
+    """Load a Product Range and read the Warehouse Bays of every product."""
+    for product in get_range(range_id, client=client):
+        product.bays
+
+
+def write_bays(client, range_id, rng):
+    """Move one product to a different Warehouse Bay."""
+    product = rng.choice(get_range(range_id, client=client).products)
+    product.bays = [rng.choice(BAY_IDS)]
+
+
+def read_supplier(client, range_id, rng):
+    """Load a Product Range and read the Factory Link of every product."""
+    for product in get_range(range_id, client=client):
+        product.supplier
+
+
+WORKLOADS = {
+    "load_range": load_range,
+    "read_options": read_options,
+    "write_option": write_option,
+    "write_scope": write_scope,
+    "set_range_description": set_range_description,
+    "read_stock": read_stock,
+    "write_stock": write_stock,
+    "read_bays": read_bays,
+    "write_bays": write_bays,
+    "read_supplier": read_supplier,
+}
+
+MIX = {
+    "load_range": 30,
+    "read_options": 20,
+    "write_option": 10,
+    "write_scope": 8,
+    "set_range_description": 7,
+    "read_stock": 8,
+    "write_stock": 5,
+    "read_bays": 5,
+    "write_bays": 2,
+    "read_supplier": 5,
+}
+
+
+class LoadTestReport:
+    """
+    Times and errors of the operations run by a load test.
+
+    Attributes:
+        elapsed: The number of seconds the load test ran for.
+        latencies: dict of operation names to a list of the seconds taken by
+            each run of the operation, including failed runs.
+        errors: dict of operation names to a collections.Counter of the
+            names of the exceptions raised.
+        requests: collections.Counter of the number of requests made to
+            each endpoint.
+        retries: collections.Counter of the number of requests retried for
+            each endpoint.
+    """
+
+    def __init__(self):
+        """Create an empty report."""
+        self.elapsed = 0
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(Counter)
+        self.requests = Counter()
+        self.retries = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, operation, seconds, error=None):
+        """Record a run of an operation."""
+        with self._lock:
+            self.latencies[operation].append(seconds)
+            if error is not None:
+                self.errors[operation][type(error).__name__] += 1
+
+    def count(self, operation=None):
+        """Return the number of runs of operation, or of all operations."""
+        if operation is not None:
+            return len(self.latencies.get(operation, ()))
+        return sum(len(latencies) for latencies in self.latencies.values())
+
+    def error_count(self, operation=None):
+        """Return the number of failed runs of operation, or of all operations."""
+        if operation is not None:
+            return sum(self.errors.get(operation, Counter()).values())
+        return sum(sum(errors.values()) for errors in self.errors.values())
+
+    def error_rate(self, operation=None):
+        """Return the fraction of runs of operation, or of all, which failed."""
+        count = self.count(operation)
+        return self.error_count(operation) / count if count else 0
+
+    def throughput(self, operation=None):
+        """Return the number of runs per second of operation, or of all."""
+        return self.count(operation) / self.elapsed if self.elapsed else 0
+
+    def percentile(self, percent, operation=None):
+        """Return the percentile of the seconds taken by operation, or by all."""
+        if operation is None:
+            latencies = [s for values in self.latencies.values() for s in values]
+        else:
+            latencies = list(self.latencies.get(operation, ()))
+        if not latencies:
+            return 0
+        latencies.sort()
+        index = max(math.ceil(percent / 100 * len(latencies)) - 1, 0)
+        return latencies[index]
+
+    def summary(self):
+        """Return a table of throughput, latency and error rate per operation."""
+        lines = [
+            "{:<24}{:>8}{:>10}{:>10}{:>10}{:>9}".format(
+                "operation", "runs", "per sec", "p50 ms", "p99 ms", "errors"
+            )
+        ]
+        for operation in sorted(self.latencies) + [None]:
+            lines.append(
+                "{:<24}{:>8}{:>10.1f}{:>10.1f}{:>10.1f}{:>8.1%}".format(
+                    operation or "total",
+                    self.count(operation),
+                    self.throughput(operation),
+                    self.percentile(50, operation) * 1000,
+                    self.percentile(99, operation) * 1000,
+                    self.error_rate(operation),
+                )
+            )
+        lines.append(
+            "{} requests, {} retries in {:.1f}s".format(
+                sum(self.requests.values()), sum(self.retries.values()), self.elapsed
+            )
+        )
+        return "\n".join(lines)
+
+
+def run(
+    workers=50,
+    duration=10,
+    operations=None,
+    ranges=20,
+    products_per_range=5,
+    mix=None,
+    latency=0.0,
+    jitter=0.0,
+    error_rate=0.0,
+    throttle_rate=0.0,
+    retry=False,
+    seed=None,
+):
+    """
+    Run a load test and return a LoadTestReport.
+
+    Kwargs:
+        workers: The number of concurrent worker threads.
+        duration: The number of seconds to run for. If None the test runs
+            until operations operations have been run.
+        operations: The total number of operations to run. If None the test
+            runs for duration seconds.
+        ranges: The number of Product Ranges in the catalogue.
+        products_per_range: The number of products in each Product Range.
+        mix: dict of the names of WORKLOADS to their relative weights.
+            Defaults to MIX.
+        latency: The minimum number of seconds each request takes.
+        jitter: The maximum number of seconds added to latency.
+        error_rate: The fraction of requests which fail.
+        throttle_rate: The fraction of requests which are throttled.
+        retry: If True requests are sent through a
+            cc_products.resilience.ResilientClient, which retries injected
+            errors.
+        seed: Seed for the choice of operations and injected faults.
+
+    Raises:
+        ValueError: If neither duration nor operations is given.
+    """
+    if duration is None and operations is None:
+        raise ValueError("Either duration or operations is required.")
+    mix = MIX if mix is None else mix
+    fake = FakeCCAPI()
+    range_ids = create_catalogue(
+        fake, ranges=ranges, products_per_range=products_per_range
+    )
+    client = fault_injecting_client = FaultInjectingClient(
+        fake,
+        latency=latency,
+        jitter=jitter,
+        error_rate=error_rate,
+        throttle_rate=throttle_rate,
+        seed=seed,
+    )
+    if retry:
+        client = ResilientClient(
+            client,
+            retry_policy=RetryPolicy(
+                backoff=max(latency, 0.01),
+                transient_errors=(InjectedError,),
+                throttled_errors=(ThrottledError,),
+            ),
+            circuit_breaker=CircuitBreaker(reset_timeout=1),
+        )
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    seeds = random.Random(seed)
+    report = LoadTestReport()
+    remaining = [operations]
+    remaining_lock = threading.Lock()
+    start = time.perf_counter()
+    deadline = None if duration is None else start + duration
+
+    def claim():
+        if deadline is not None and time.perf_counter() >= deadline:
+            return False
+        with remaining_lock:
+            if remaining[0] is None:
+                return True
+            if remaining[0] <= 0:
+                return False
+            remaining[0] -= 1
+            return True
+
+    def work(rng):
+        while claim():
+            operation = rng.choices(names, weights)[0]
+            range_id = rng.choice(range_ids)
+            operation_start = time.perf_counter()
+            try:
+                WORKLOADS[operation](client, range_id, rng)
+            except Exception as exception:
+                report.record(
+                    operation, time.perf_counter() - operation_start, exception
+                )
+            else:
+                report.record(operation, time.perf_counter() - operation_start)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(work, random.Random(seeds.random())) for _ in range(workers)
+        ]
+        for future in futures:
+            future.result()
+    report.elapsed = time.perf_counter() - start
+    report.requests = Counter(fault_injecting_client.requests)
+    if retry:
+        report.retries = Counter(client.retries)
+    return report
+
+
+def main(argv=None):
+    """Run a load test configured by command line arguments and print a summary."""
+    parser = argparse.ArgumentParser(
+        prog="python -m cc_products.loadtest", description=__doc__.split("\n")[1]
+    )
+    parser.add_argument("--workers", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--operations", type=int, default=None)
+    parser.add_argument("--ranges", type=int, default=20)
+    parser.add_argument("--products-per-range", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--retry", action="store_true")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+    report = run(
+        workers=args.workers,
+        duration=None if args.operations else args.duration,
+        operations=args.operations,
+        ranges=args.ranges,
+        products_per_range=args.products_per_range,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry=args.retry,
+        seed=args.seed,
+    )
+    print(report.summary())
+
+
+if __name__ == "__main__":
+    main()
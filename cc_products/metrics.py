@@ -0,0 +1,316 @@
+"""
+Counters and latency histograms for Cloud Commerce requests and cc_products.
+
+Requests made through a MetricsClient are counted and timed per endpoint.
+cc_products records its own operations, such as loading a range or
+reloading a product, whichever client is used. render returns every metric,
+and the hit ratios of the caches, in the Prometheus text exposition format,
+and start_http_server serves it from the worker process.
+
+    >>> set_default_client(MetricsClient(CCAPI))
+    >>> server = start_http_server(port=9100)
+
+Operations recorded by cc_products:
+    range_load: Loading a Product Range.
+    reload: Reloading a product.
+    option_fetch: Loading the Product Options of a product.
+    range_option_fetch: Loading the Product Options of a range.
+    option_write: Setting a Product Option through a descriptor.
+    scope_write: Setting product scope values.
+"""
+
+import bisect
+import contextlib
+import threading
+import time
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    return "{{{}}}".format(
+        ",".join(
+            '{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+            for name, value in zip(names, values)
+        )
+    )
+
+
+class Counter:
+    """
+    A count for each combination of label values.
+
+    Args:
+        name: The name of the metric.
+        description: Help text for the metric.
+
+    Kwargs:
+        labels: The names of the labels of the metric.
+    """
+
+    def __init__(self, name, description, labels=()):
+        """Create a counter with no counts."""
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        """Add amount to the count for label_values."""
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def get(self, *label_values):
+        """Return the count for label_values."""
+        with self._lock:
+            return self._values.get(label_values, 0)
+
+    def clear(self):
+        """Remove every count."""
+        with self._lock:
+            self._values.clear()
+
+    def render(self):
+        """Return the counter in the text exposition format."""
+        lines = [
+            "# HELP {} {}".format(self.name, self.description),
+            "# TYPE {} counter".format(self.name),
+        ]
+        with self._lock:
+            values = sorted(self._values.items())
+        for label_values, value in values:
+            lines.append(
+                "{}{} {}".format(
+                    self.name, _format_labels(self.labels, label_values), value
+                )
+            )
+        return "\n".join(lines)
+
+
+class Histogram:
+    """
+    Distribution of observed values for each combination of label values.
+
+    Args:
+        name: The name of the metric.
+        description: Help text for the metric.
+
+    Kwargs:
+        labels: The names of the labels of the metric.
+        buckets: The upper bounds of the buckets, in increasing order.
+    """
+
+    def __init__(self, name, description, labels=(), buckets=BUCKETS):
+        """Create a histogram with no observations."""
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        """Record an observed value for label_values."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            try:
+                counts, total = self._values[label_values]
+            except KeyError:
+                counts, total = [0] * (len(self.buckets) + 1), 0
+            counts[index] += 1
+            self._values[label_values] = (counts, total + value)
+
+    def count(self, *label_values):
+        """Return the number of values observed for label_values."""
+        with self._lock:
+            entry = self._values.get(label_values)
+        return 0 if entry is None else sum(entry[0])
+
+    def clear(self):
+        """Remove every observation."""
+        with self._lock:
+            self._values.clear()
+
+    def render(self):
+        """Return the histogram in the text exposition format."""
+        lines = [
+            "# HELP {} {}".format(self.name, self.description),
+            "# TYPE {} histogram".format(self.name),
+        ]
+        with self._lock:
+            values = sorted((k, (list(c), t)) for k, (c, t) in self._values.items())
+        names = self.labels + ("le",)
+        for label_values, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                lines.append(
+                    "{}_bucket{} {}".format(
+                        self.name,
+                        _format_labels(names, label_values + (bound,)),
+                        cumulative,
+                    )
+                )
+            labels = _format_labels(self.labels, label_values)
+            lines.append("{}_sum{} {}".format(self.name, labels, total))
+            lines.append("{}_count{} {}".format(self.name, labels, cumulative))
+        return "\n".join(lines)
+
+
+api_requests = Histogram(
+    "cc_products_api_request_seconds",
+    "Time taken by Cloud Commerce API requests.",
+    labels=("endpoint",),
+)
+api_errors = Counter(
+    "cc_products_api_errors_total",
+    "Cloud Commerce API requests which raised an exception.",
+    labels=("endpoint",),
+)
+api_retries = Counter(
+    "cc_products_api_retries_total",
+    "Cloud Commerce API requests retried by a ResilientClient.",
+    labels=("endpoint", "error"),
+)
+operations = Histogram(
+    "cc_products_operation_seconds",
+    "Time taken by cc_products operations.",
+    labels=("operation",),
+)
+operation_errors = Counter(
+    "cc_products_operation_errors_total",
+    "cc_products operations which raised an exception.",
+    labels=("operation",),
+)
+
+METRICS = [api_requests, api_errors, api_retries, operations, operation_errors]
+
+
+@contextlib.contextmanager
+def timed(operation):
+    """Record the time taken by a cc_products operation and any error."""
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        operation_errors.inc(operation)
+        raise
+    finally:
+        operations.observe(time.perf_counter() - start, operation)
+
+
+class MetricsClient:
+    """
+    Cloud Commerce API client which counts and times requests per endpoint.
+
+    Args:
+        client: The Cloud Commerce API client to wrap. If None the default
+            client is used.
+    """
+
+    def __init__(self, client):
+        """Wrap client."""
+        from .client import get_client
+
+        self.client = get_client(client)
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        def timed_request(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return attr(*args, **kwargs)
+            except BaseException:
+                api_errors.inc(name)
+                raise
+            finally:
+                api_requests.observe(time.perf_counter() - start, name)
+
+        return timed_request
+
+
+def render_caches():
+    """Return cache hits, misses and hit ratios in the text exposition format."""
+    from . import cache
+
+    caches = {
+        name: value
+        for name, value in vars(cache).items()
+        if isinstance(value, cache.ClientCaches)
+    }
+    lines = {"hits": [], "misses": [], "ratio": []}
+    for name, client_caches in sorted(caches.items()):
+        hits, misses = client_caches.stats()
+        labels = _format_labels(("cache",), (name,))
+        ratio = hits / (hits + misses) if hits + misses else 0
+        lines["hits"].append("cc_products_cache_hits_total{} {}".format(labels, hits))
+        lines["misses"].append(
+            "cc_products_cache_misses_total{} {}".format(labels, misses)
+        )
+        lines["ratio"].append("cc_products_cache_hit_ratio{} {}".format(labels, ratio))
+    return "\n".join(
+        [
+            "# HELP cc_products_cache_hits_total Cache lookups which found a value.",
+            "# TYPE cc_products_cache_hits_total counter",
+            *lines["hits"],
+            "# HELP cc_products_cache_misses_total Cache lookups which found no value.",
+            "# TYPE cc_products_cache_misses_total counter",
+            *lines["misses"],
+            "# HELP cc_products_cache_hit_ratio Fraction of cache lookups which hit.",
+            "# TYPE cc_products_cache_hit_ratio gauge",
+            *lines["ratio"],
+        ]
+    )
+
+
+def render():
+    """Return every metric in the Prometheus text exposition format."""
+    return "\n".join([m.render() for m in METRICS] + [render_caches()]) + "\n"
+
+
+def clear():
+    """Remove every recorded metric, except cache hits and misses."""
+    for metric in METRICS:
+        metric.clear()
+
+
+def start_http_server(port=9100, address="127.0.0.1"):
+    """
+    Serve metrics at /metrics from a daemon thread.
+
+    Kwargs:
+        port: The port to listen on. If 0 a free port is used.
+        address: The address to listen on.
+
+    Returns:
+        The http.server.ThreadingHTTPServer. Call its shutdown method to
+        stop serving.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((address, port), Handler)
+    threading.Thread(
+        target=server.serve_forever, name="cc_products metrics", daemon=True
+    ).start()
+    return server
@@ -2,7 +2,7 @@
 
 import datetime
 
-from . import exceptions
+from . import exceptions, metrics
 
 
 class OptionDescriptor:
@@ -13,117 +13,186 @@ class OptionDescriptor:
         self.option_name = option_name
 
     def __get__(self, instance, owner):
-        return self.to_python(instance, owner)
+        if instance is None:
+            return self
+        return instance.options.get_typed_value(self.option_name)
 
     def __set__(self, instance, value):
-        instance.options[self.option_name] = self.clean(value)
+        self.validate(type(instance), value)
+        with metrics.timed("option_write"):
+            instance.options[self.option_name] = self.clean(value)
 
     def __delete__(self, instance):
-        self.__set__(instance, "")
+        instance.options[self.option_name] = ""
 
     def to_python(self, instance, owner):
         """Return Product Option value in the correct type for python."""
-        if self.option_name not in instance.options:
-            return None
-        value = instance.options[self.option_name]
+        return self.decode(instance.options[self.option_name])
+
+    def decode(self, value):
+        """Return a Product Option value in the correct type for python."""
         return value
 
+    def validate(self, owner, value):
+        """
+        Raise ValueError if value can not be stored in this Product Option.
+
+        Args:
+            owner: The class of the product to which value would be set.
+            value: The value to check.
+        """
+        if value is None:
+            raise ValueError("{} can not be None.".format(self.option_name))
+
     def clean(self, value):
         """Format value for storage as a Product Option in Cloud Commerce."""
         return str(value)
 
 
-class PackageTypeOption(OptionDescriptor):
+class ChoiceOption(OptionDescriptor):
+    """
+    Base class for Product Options which must have one of a set of values.
+
+    Subclasses set choice_attributes to the names of the attributes of the
+    product class which hold the valid values.
+    """
+
+    choice_attributes = ()
+
+    def choices(self, owner):
+        """Return the valid values for the Product Option."""
+        return tuple(getattr(owner, name) for name in self.choice_attributes)
+
+    def validate(self, owner, value):
+        """Raise ValueError if value is not one of the valid choices."""
+        if not isinstance(value, str) or value.strip() not in self.choices(owner):
+            raise ValueError(
+                '"{}" is not a valid {}'.format(value, self.option_name.lower())
+            )
+
+    def clean(self, value):
+        """Return value without surrounding whitespace."""
+        return super().clean(value.strip())
+
+
+class PackageTypeOption(ChoiceOption):
     """Product Option Descriptor for the Package Type Product Option."""
 
+    choice_attributes = (
+        "LARGE_LETTER",
+        "LARGE_LETTER_SINGLE",
+        "PACKET",
+        "HEAVY_AND_LARGE",
+        "COURIER",
+    )
+
     def __init__(self):
         """Set product option name."""
         super().__init__("Package Type")
 
     def __set__(self, instance, value):
-        value = value.strip()
-        non_large_letter_values = (
-            instance.PACKET,
-            instance.HEAVY_AND_LARGE,
-            instance.COURIER,
+        super().__set__(instance, value)
+        instance.large_letter_compatible = value.strip() in (
+            instance.LARGE_LETTER,
+            instance.LARGE_LETTER_SINGLE,
         )
-        if value in (instance.LARGE_LETTER, instance.LARGE_LETTER_SINGLE):
-            super().__set__(instance, value)
-            instance.large_letter_compatible = True
-        elif value in non_large_letter_values:
-            super().__set__(instance, value)
-            instance.large_letter_compatible = False
-        else:
-            raise ValueError('"{}" is not a valid package type'.format(value))
 
 
-class GenderOption(OptionDescriptor):
+class GenderOption(ChoiceOption):
     """Product Option Descriptor for Gender."""
 
+    choice_attributes = (
+        "MENS",
+        "GIRLS",
+        "WOMENS",
+        "BOYS",
+        "BABY_BOYS",
+        "BABY_GIRLS",
+        "UNISEX_BABY",
+    )
+
     def __init__(self):
         """Set product option name."""
         super().__init__("Gender")
 
-    def __set__(self, instance, value):
-        value = value.strip()
-        valid_values = (
-            instance.MENS,
-            instance.GIRLS,
-            instance.WOMENS,
-            instance.BOYS,
-            instance.BABY_BOYS,
-            instance.BABY_GIRLS,
-            instance.UNISEX_BABY,
-        )
-        if value in valid_values:
-            super().__set__(value)
-        else:
-            raise ValueError('"{}" is not a valid gender'.format(value))
-
 
 class DateOption(OptionDescriptor):
     """Product Option Descriptor for Product Options containing dates."""
 
-    def to_python(self, *args, **kwargs):
+    def decode(self, value):
         """Return Product Option value as datetime.datetime."""
-        value = super().to_python(*args, **kwargs)
         if value is None:
             return None
         year, month, day = value.split("-")
         return datetime.date(year=int(year), month=int(month), day=int(day))
 
+    def validate(self, owner, value):
+        """Raise ValueError if value is not a date."""
+        if not isinstance(value, datetime.date):
+            raise ValueError(
+                '"{}" is not a valid date for {}.'.format(value, self.option_name)
+            )
+
     def clean(self, value):
         """Return value as a string containting a formatted date."""
         return super().clean(value.strftime("%Y-%m-%d"))
 
 
-class FloatOption(OptionDescriptor):
-    """Product Option Descriptor for Product Options containing floats."""
+class NumberOption(OptionDescriptor):
+    """
+    Base class for Product Options containing numbers.
 
-    def to_python(self, *args, **kwargs):
-        """Return Product Option value as a float."""
-        value = super().to_python(*args, **kwargs)
-        try:
-            return float(value)
-        except (TypeError, ValueError):
-            return None
+    Args:
+        option_name: The name of the Product Option.
 
+    Kwargs:
+        minimum: The lowest valid value, if any.
+        maximum: The highest valid value, if any.
+    """
 
-class IntegerOption(OptionDescriptor):
-    """Product Option Descriptor for Product Options containing integers."""
+    number_type = float
 
-    def __set__(self, instance, value):
-        """Save value in an integer form."""
-        super().__set__(instance, value)
+    def __init__(self, option_name, minimum=None, maximum=None):
+        """Set the valid range of values."""
+        self.minimum = minimum
+        self.maximum = maximum
+        super().__init__(option_name)
 
-    def to_python(self, *args, **kwargs):
-        """Return Product Option value as an integer."""
-        value = super().to_python(*args, **kwargs)
+    def decode(self, value):
+        """Return Product Option value as a number."""
         try:
-            return int(value)
+            return self.number_type(value)
         except (TypeError, ValueError):
             return None
 
+    def validate(self, owner, value):
+        """Raise ValueError if value is not a number in the valid range."""
+        number = None
+        if not isinstance(value, bool):
+            number = self.decode(value)
+        if number is None:
+            raise ValueError(
+                '"{}" is not a valid number for {}.'.format(value, self.option_name)
+            )
+        if self.minimum is not None and number < self.minimum:
+            raise ValueError(
+                "{} must be at least {}.".format(self.option_name, self.minimum)
+            )
+        if self.maximum is not None and number > self.maximum:
+            raise ValueError(
+                "{} must be at most {}.".format(self.option_name, self.maximum)
+            )
+
+
+class FloatOption(NumberOption):
+    """Product Option Descriptor for Product Options containing floats."""
+
+
+class IntegerOption(NumberOption):
+    """Product Option Descriptor for Product Options containing integers."""
+
+    number_type = int
+
 
 class BoolOption(OptionDescriptor):
     """Product Option Descriptor for boolean product options."""
@@ -141,15 +210,21 @@ class BoolOption(OptionDescriptor):
         self.false = false
         super().__init__(option_name)
 
-    def to_python(self, *args, **kwargs):
+    def decode(self, value):
         """Return Product Option value as a bool."""
-        value = super().to_python(*args, **kwargs)
         if value is None or value == self.false:
             return False
         if value == self.true:
             return True
         raise exceptions.OptionValueNotRecognised(value)
 
+    def validate(self, owner, value):
+        """Raise ValueError if value is not a bool."""
+        if not isinstance(value, bool):
+            raise ValueError(
+                "{} must be True or False, not {!r}.".format(self.option_name, value)
+            )
+
     def clean(self, value):
         """Return self.true if value is True, else False."""
         if value is True:
@@ -171,13 +246,24 @@ class ListOption(OptionDescriptor):
         self.delimiter = delimiter
         super().__init__(option_name)
 
-    def to_python(self, *args, **kwargs):
+    def decode(self, value):
         """Return list containing Product Option values."""
-        value = super().to_python(*args, **kwargs)
         if value is None:
             return []
         return value.split(self.delimiter)
 
+    def validate(self, owner, value):
+        """Raise ValueError if value is not a list of undelimited values."""
+        if not isinstance(value, (list, tuple)):
+            raise ValueError("{} must be a list.".format(self.option_name))
+        for item in value:
+            if self.delimiter in str(item):
+                raise ValueError(
+                    '"{}" in {} contains "{}".'.format(
+                        item, self.option_name, self.delimiter
+                    )
+                )
+
     def clean(self, value):
         """Return values as a delimited string."""
         return super().clean(self.delimiter.join([str(v) for v in value]))
@@ -0,0 +1,122 @@
+"""
+Pooled, keep alive HTTP sessions for Cloud Commerce API requests.
+
+Requests to Cloud Commerce are made by ccapi using a requests.Session.
+configure_session mounts a PoolingAdapter on a session so that connections
+to each host are kept open and shared between threads, rather than being
+created for each request. This can be applied to the session used by ccapi,
+or to a session created with create_session.
+
+    >>> adapter = configure_session(session, pool_size=20)
+    >>> adapter.metrics()
+"""
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+POOL_SIZE = 10
+
+
+class PoolingAdapter(HTTPAdapter):
+    """
+    HTTPAdapter which keeps connections open and records how they are used.
+
+    Kwargs:
+        pool_size: The maximum number of open connections to each host.
+        pool_block: If True requests wait for a free connection when all
+            connections to a host are in use. If False extra connections are
+            opened and closed after use.
+    """
+
+    def __init__(self, pool_size=POOL_SIZE, pool_block=False):
+        """Configure the connection pool."""
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        super().__init__(
+            pool_connections=pool_size, pool_maxsize=pool_size, pool_block=pool_block
+        )
+
+    def send(self, request, **kwargs):
+        """Send a request using a pooled connection."""
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            return super().send(request, **kwargs)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def pool_metrics(self):
+        """
+        Return the use of the connection pool for each host.
+
+        Returns:
+            dict of "scheme://host:port" to dict containing:
+                connections: The number of connections opened.
+                requests: The number of requests sent.
+                idle: The number of open connections not in use.
+                size: The maximum number of connections kept open.
+        """
+        pools = self.poolmanager.pools
+        metrics = {}
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            host = "{}://{}:{}".format(pool.scheme, pool.host, pool.port)
+            metrics[host] = {
+                "connections": pool.num_connections,
+                "requests": pool.num_requests,
+                "idle": pool.pool.qsize() if pool.pool is not None else 0,
+                "size": pool.pool.maxsize if pool.pool is not None else 0,
+            }
+        return metrics
+
+    def metrics(self):
+        """Return request counts and connection pool use for all hosts."""
+        with self._lock:
+            metrics = {
+                "requests": self.requests,
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+            }
+        metrics["pools"] = self.pool_metrics()
+        return metrics
+
+
+def configure_session(session, pool_size=POOL_SIZE, pool_block=False, compression=True):
+    """
+    Use a pool of keep alive connections for requests made with session.
+
+    Args:
+        session: The requests.Session to configure.
+
+    Kwargs:
+        pool_size: The maximum number of open connections to each host.
+        pool_block: If True wait for a free connection when all are in use.
+        compression: If True ask for compressed responses.
+
+    Returns:
+        The PoolingAdapter mounted on session.
+    """
+    adapter = PoolingAdapter(pool_size=pool_size, pool_block=pool_block)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["Connection"] = "keep-alive"
+    session.headers["Accept-Encoding"] = "gzip, deflate" if compression else "identity"
+    return adapter
+
+
+def create_session(pool_size=POOL_SIZE, pool_block=False, compression=True):
+    """Return a new requests.Session using a pool of keep alive connections."""
+    session = requests.Session()
+    configure_session(
+        session, pool_size=pool_size, pool_block=pool_block, compression=compression
+    )
+    return session
@@ -1,6 +1,36 @@
 """Tools for working with Cloud Commerce Pro's Product Options."""
 
-from ccapi import CCAPI
+from collections import namedtuple
+
+from . import batch, cache, metrics
+from .client import get_client
+
+ShopOption = namedtuple("ShopOption", ["id", "name"])
+
+
+def get_shop_options(option_data, client=None):
+    """
+    Return the Product Options available to the shop.
+
+    The options are parsed from option_data the first time this is called for
+    a client and shared by all Product Ranges using that client after that.
+
+    Args:
+        option_data: The CCAPI product range options for any Product Range.
+
+    Kwargs:
+        client: The Cloud Commerce API client option_data was loaded with.
+
+    Returns:
+        list of ShopOption.
+    """
+    return cache.shop_options.for_client(get_client(client)).get_or_set(
+        "shop_options",
+        lambda: [
+            ShopOption(o.id, o.name.replace(" (Master)", ""))
+            for o in option_data.shop_options
+        ],
+    )
 
 
 class OptionList:
@@ -17,6 +47,15 @@ class OptionList:
         """Return list containing the names of product options in self."""
         return [o.name for o in self.options]
 
+    @property
+    def is_loaded(self):
+        """Return True if the Product Options have been loaded."""
+        return self._options is not None
+
+    def invalidate(self):
+        """Discard loaded options so that they are loaded again when next used."""
+        self._options = None
+
     def __contains__(self, key):
         return key in self.names
 
@@ -34,9 +73,10 @@ class VariationOptions(OptionList):
         Args:
             product: The cc_products.Variation to which this option belongs.
             product_range: The cc_product.ProductRange to which product
-                belongs.
+                belongs, or None if it has not been loaded.
         """
         self._options = None
+        self._typed_values = None
         self.product = product
         self.product_range = product_range
 
@@ -53,11 +93,18 @@ class VariationOptions(OptionList):
             range_option = self.product.product_range.options[key]
             range_option.selected = True
             option = range_option
-        value_id = CCAPI.get_option_value_id(option.id, value, create=True)
-        CCAPI.set_product_option_value(
-            product_ids=[self.product.id], option_id=option.id, option_value_id=value_id
-        )
-        self._options = None
+        client = self.product.client
+        value_id = client.get_option_value_id(option.id, value, create=True)
+        try:
+            client.set_product_option_value(
+                product_ids=[self.product.id],
+                option_id=option.id,
+                option_value_id=value_id,
+            )
+        except Exception:
+            self.invalidate()
+            raise
+        self._set_cached_value(option.id, option.name, value)
 
     def __repr__(self):
         return self.names.__repr__()
@@ -74,27 +121,107 @@ class VariationOptions(OptionList):
     def options(self):
         """Return Variation Product Options belinging to self.product."""
         if self._options is None:
-            options = CCAPI.get_options_for_product(self.product.id)
-            self._options = [VariationOption(o) for o in options]
+            with metrics.timed("option_fetch"):
+                options = self.product.client.get_options_for_product(self.product.id)
+            self._options = [VariationOption.from_cc_data(o) for o in options]
+            self._typed_values = None
         return self._options
 
+    @property
+    def typed_values(self):
+        """
+        Return a dict of Product Option names to decoded values.
+
+        Values are decoded once by the Product Option descriptors of the
+        product's class and kept until an option is changed.
+        """
+        if self._typed_values is None:
+            values = {o.name: o.value for o in self.options}
+            typed_values = {}
+            for name, descriptor in type(self.product).option_descriptors().items():
+                try:
+                    typed_values[name] = descriptor.decode(values.get(name))
+                except Exception as exception:
+                    typed_values[name] = _DecodeError(exception)
+            self._typed_values = typed_values
+        return self._typed_values
+
+    def get_typed_value(self, name):
+        """Return the decoded value of a Product Option."""
+        value = self.typed_values[name]
+        if isinstance(value, _DecodeError):
+            raise value.exception
+        if isinstance(value, list):
+            return list(value)
+        return value
+
     @property
     def names(self):
         """Return dict contining Product Options Name and Product Options."""
         return {o.name: o for o in self.options}
 
+    def invalidate(self):
+        """Discard loaded options so that they are loaded again when next used."""
+        super().invalidate()
+        self._typed_values = None
+
+    def _set_cached_value(self, option_id, name, value):
+        """Update the value of an option if options have been loaded."""
+        if self._options is None:
+            return
+        self._typed_values = None
+        for option in self._options:
+            if option.id == option_id:
+                option.value = value
+                return
+        self._options.append(VariationOption(option_id, name, value))
+
+    def _add_cached_option(self, option_id, name):
+        """Add an option without a value if options have been loaded."""
+        if self._options is None:
+            return
+        self._typed_values = None
+        if option_id not in (o.id for o in self._options):
+            self._options.append(VariationOption(option_id, name))
+
+    def _remove_cached_option(self, option_id):
+        """Remove an option if options have been loaded."""
+        if self._options is not None:
+            self._options = [o for o in self._options if o.id != option_id]
+            self._typed_values = None
+
+
+class _DecodeError:
+    """Exception raised decoding a Product Option value."""
+
+    def __init__(self, exception):
+        """Store the exception."""
+        self.exception = exception
+
 
 class VariationOption:
     """Container for a single Variation Product Option."""
 
-    def __init__(self, option):
-        """Configure product option."""
-        self.id = option.id
-        self.name = option.option_name
-        if option.value is None:
-            self.value = None
-        else:
-            self.value = option.value.value
+    def __init__(self, option_id, name, value=None):
+        """
+        Configure product option.
+
+        Args:
+            option_id: The ID of the Product Option.
+            name: The name of the Product Option.
+
+        Kwargs:
+            value: The value of the Product Option for the product.
+        """
+        self.id = option_id
+        self.name = name
+        self.value = value
+
+    @classmethod
+    def from_cc_data(cls, option):
+        """Return a VariationOption from a CCAPI product option."""
+        value = None if option.value is None else option.value.value
+        return cls(option.id, option.option_name, value)
 
     def __repr__(self):
         return "{}: {}".format(self.name, self.value)
@@ -112,12 +239,7 @@ class RangeOptions(OptionList):
                 Options.
         """
         self.product_range = product_range
-        option_data = CCAPI.get_product_range_options(self.product_range.id)
-        options = {o.id: o for o in option_data.options}
-        self.options = [
-            RangeOption(self.product_range, o, options.get(o.id))
-            for o in option_data.shop_options
-        ]
+        self._options = None
 
     def __getitem__(self, key):
         return self.names[key]
@@ -129,6 +251,76 @@ class RangeOptions(OptionList):
         for option in self.options:
             yield option
 
+    @property
+    def options(self):
+        """Return a RangeOption for each of the shop's Product Options."""
+        if self._options is None:
+            client = self.product_range.client
+            with metrics.timed("range_option_fetch"):
+                option_data = client.get_product_range_options(self.product_range.id)
+            range_options = {o.id: o for o in option_data.options}
+            self._options = [
+                RangeOption(self.product_range, o, range_options.get(o.id))
+                for o in get_shop_options(option_data, client=client)
+            ]
+        return self._options
+
+    def update(self, selected=None, variable=None):
+        """
+        Set which Product Options are selected and variable for the range.
+
+        Only options whose state changes are updated. Options are added and
+        removed concurrently, followed by any drop down changes.
+
+        Kwargs:
+            selected: Names of the Product Options to select. Any other
+                options are removed from the range. If None the selected
+                options are not changed, except to select variable options.
+            variable: Names of the Product Options to use as Variation
+                Options. Any other options are made not variable. If None
+                variable options are not changed.
+
+        Raises:
+            KeyError if any name does not match a Product Option.
+        """
+        names = self.names
+        selected = None if selected is None else set(selected)
+        variable = None if variable is None else set(variable)
+        for name in (selected or set()) | (variable or set()):
+            if name not in names:
+                raise KeyError(name)
+        if variable is not None:
+            if selected is None:
+                selected = self.selected_names
+            selected |= variable
+        if selected is not None:
+            changed = [
+                option
+                for option in self.options
+                if option.selected != (option.name in selected)
+            ]
+            batch.run_concurrently(
+                *[
+                    lambda option=option: option._set_selected(option.name in selected)
+                    for option in changed
+                ]
+            )
+            for option in changed:
+                option._patch_variation_options()
+        if variable is not None:
+            batch.run_concurrently(
+                *[
+                    lambda option=option: option._set_variable(option.name in variable)
+                    for option in self.options
+                    if option.selected and option.variable != (option.name in variable)
+                ]
+            )
+
+    @property
+    def selected_names(self):
+        """Return a set of the names of the selected Product Options."""
+        return {o.name for o in self.options if o.selected}
+
     @property
     def variation_options(self):
         """Return the Range's Variation Options."""
@@ -164,14 +356,14 @@ class RangeOption:
 
         Args:
             product_range: The Product Range to which the option belongs.
-            product_option: The CCAPI product option object.
+            product_option: The ShopOption for the Product Option.
 
         Kwargs:
             shop_option: True if this product is a Variation Option.
         """
         self.product_range = product_range
         self.id = product_option.id
-        self.name = product_option.name.replace(" (Master)", "")
+        self.name = product_option.name
         if shop_option is not None:
             self._selected = True
             self._variable = shop_option.is_web_shop_select
@@ -195,18 +387,8 @@ class RangeOption:
         Args:
             selected(bool): If True product option will be seleced.
         """
-        value = bool(selected)
-        if value:
-            CCAPI.add_option_to_product(
-                range_id=self.product_range.id, option_id=self.id
-            )
-        else:
-            CCAPI.remove_option_from_product(
-                range_id=self.product_range.id, option_id=self.id
-            )
-        for product in self.product_range:
-            product._options = None
-        self._selected = value
+        self._set_selected(selected)
+        self._patch_variation_options()
 
     @property
     def variable(self):
@@ -222,10 +404,38 @@ class RangeOption:
             selected(bool): If True product option will be set as a Variation
                 Option.
         """
+        self._set_variable(value)
+
+    def _set_selected(self, selected):
+        """Add or remove the option from the range."""
+        value = bool(selected)
+        if value:
+            self.product_range.client.add_option_to_product(
+                range_id=self.product_range.id, option_id=self.id
+            )
+        else:
+            self.product_range.client.remove_option_from_product(
+                range_id=self.product_range.id, option_id=self.id
+            )
+            self._variable = False
+        self._selected = value
+
+    def _patch_variation_options(self):
+        """Add or remove the option from loaded Variation Options."""
+        for product in self.product_range:
+            if product._options is None:
+                continue
+            if self._selected:
+                product._options._add_cached_option(self.id, self.name)
+            else:
+                product._options._remove_cached_option(self.id)
+
+    def _set_variable(self, value):
+        """Set the option as a drop down if it is not already."""
         value = bool(value)
         if value == self._variable:
             return
-        CCAPI.set_range_option_drop_down(
+        self.product_range.client.set_range_option_drop_down(
             range_id=self.product_range.id, option_id=self.id, drop_down=value
         )
         self._variable = value
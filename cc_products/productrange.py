@@ -4,18 +4,49 @@ Provides the ProductRange class.
 A wrapper for Cloud Commerce Product Ranges.
 """
 
-from ccapi import CCAPI
+from collections import namedtuple
 
-from . import exceptions, productoptions
+from . import (
+    batch,
+    cache,
+    exceptions,
+    productoptions,
+    query,
+    stock,
+    validation,
+    vat,
+)
 from .baseproduct import BaseProduct
+from .client import get_client
 from .variation import Variation
 
+RangeRefresh = namedtuple("RangeRefresh", ["added", "changed", "removed"])
+
+
+def get_sales_channels(range_id, client=None):
+    """Return the Sales Channels for a Product Range, using the cache if possible."""
+    client = get_client(client)
+    return cache.sales_channels.for_client(client).get_or_set(
+        range_id, lambda: client.get_sales_channels_for_range(range_id)
+    )
+
 
 class ProductRange(BaseProduct):
     """Wrapper for Cloud Commerce Product Ranges."""
 
-    def __init__(self, data):
-        """Initialise attributes."""
+    REFRESH_PARTS = ("header", "products", "stock", "options", "bays")
+
+    def __init__(self, data, client=None):
+        """
+        Initialise attributes.
+
+        Args:
+            data: Cloud Commerce Product Range data.
+
+        Kwargs:
+            client: The Cloud Commerce API client to use.
+        """
+        self.client = get_client(client)
         self.load_from_cc_data(data)
         self._options = None
         self._products = None
@@ -29,6 +60,87 @@ class ProductRange(BaseProduct):
 
     def load_from_cc_data(self, data):
         """Set attributes from Cloud Commerce API data."""
+        self._load_header(data)
+        self.products = [
+            Variation.create_from_range(product_data, product_range=self)
+            for product_data in data["Products"]
+        ]
+
+    def refresh(self, parts=None):
+        """
+        Reload parts of the range from Cloud Commerce.
+
+        Products are updated in place, so existing references to them stay
+        valid. Products whose data in the range is unchanged keep their
+        cached values, and their Product Options are not reloaded.
+
+        Kwargs:
+            parts: The names of the parts to reload, from REFRESH_PARTS:
+                header: The name, SKU and settings of the range.
+                products: The fields of products included in the range data.
+                    New products are added and deleted products removed.
+                stock: The stock levels of the products, and their cached
+                    pending stock levels.
+                options: The range's Product Options and the Product
+                    Options of products whose data changed, where they have
+                    been loaded.
+                bays: The Warehouse Bays of products, where they have been
+                    loaded.
+                If None every part is reloaded.
+
+        Returns:
+            RangeRefresh(added, changed, removed): lists of the
+            cc_products.Variation which were added to, changed in and
+            removed from Cloud Commerce.
+
+        Raises:
+            ValueError: If a part is not in REFRESH_PARTS.
+        """
+        parts = set(self.REFRESH_PARTS if parts is None else parts)
+        unknown = parts.difference(self.REFRESH_PARTS)
+        if unknown:
+            raise ValueError("Can not refresh {}.".format(", ".join(sorted(unknown))))
+        added, changed, removed = [], [], []
+        if parts != {"bays"}:
+            data = self.client.get_range(self.id).json
+            existing = {product.id: product for product in self.products}
+            products = []
+            for product_data in data["Products"]:
+                product = existing.pop(product_data["ID"], None)
+                if product is None:
+                    product = Variation.create_from_range(product_data, self)
+                    added.append(product)
+                elif product._data_changed(product_data, from_range=True):
+                    changed.append(product)
+                    if "products" in parts:
+                        product.load_from_cc_data(product_data, from_range=True)
+                    elif "stock" in parts:
+                        product._stock_level = product_data["StockLevel"]
+                products.append(product)
+            removed = list(existing.values())
+            if "header" in parts:
+                self._load_header(data)
+            if "products" in parts:
+                self.products = products
+            if "stock" in parts:
+                cache.pending_stock.for_client(self.client).invalidate(
+                    *[product.id for product in self.products]
+                )
+        calls = []
+        if "options" in parts:
+            if self._options is not None and self._options.is_loaded:
+                calls.append(self._refetch_options)
+            calls.extend(p._refetch_options for p in changed if p._options_loaded())
+        if "bays" in parts:
+            calls.extend(p._refetch_bays for p in self.products if p._bays is not None)
+        batch.run_concurrently(*calls)
+        return RangeRefresh(added, changed, removed)
+
+    def _refetch_options(self):
+        self.options.invalidate()
+        self.options.options
+
+    def _load_header(self, data):
         self.raw = data
         self.id = data["ID"]
         self._name = data["Name"]
@@ -38,10 +150,6 @@ class ProductRange(BaseProduct):
         self.thumbnail = data["ThumbNail"]
         self.pre_order = bool(data["PreOrder"])
         self.grouped = bool(data["Grouped"])
-        self.products = [
-            Variation.create_from_range(product_data, product_range=self)
-            for product_data in data["Products"]
-        ]
 
     @property
     def department(self):
@@ -70,9 +178,15 @@ class ProductRange(BaseProduct):
     @description.setter
     def description(self, description):
         """Set the description for the Range."""
-        CCAPI.set_product_description(
-            product_ids=[p.id for p in self.products], description=description
-        )
+        try:
+            self.client.set_product_description(
+                product_ids=[p.id for p in self.products], description=description
+            )
+        except Exception:
+            self._description = None
+            for product in self.products:
+                product.invalidate("_description")
+            raise
         self._description = description
 
     @property
@@ -89,23 +203,28 @@ class ProductRange(BaseProduct):
             value <bool>: True if product is End of Line, else False.
 
         """
-        CCAPI.update_range_settings(
-            self.id,
-            current_name=self.name,
-            current_sku=self.sku,
-            current_end_of_line=self.end_of_line,
-            current_pre_order=self.pre_order,
-            current_group_items=self.grouped,
-            new_name=self.name,
-            new_sku=self.sku,
-            new_end_of_line=bool(value),
-            new_pre_order=self.pre_order,
-            new_group_items=self.grouped,
-            channels=[],
+        value = bool(value)
+        discontinued = Variation.discontinued
+        batch.run_concurrently(
+            lambda: self.client.update_range_settings(
+                self.id,
+                current_name=self.name,
+                current_sku=self.sku,
+                current_end_of_line=self.end_of_line,
+                current_pre_order=self.pre_order,
+                current_group_items=self.grouped,
+                new_name=self.name,
+                new_sku=self.sku,
+                new_end_of_line=value,
+                new_pre_order=self.pre_order,
+                new_group_items=self.grouped,
+                channels=[],
+            ),
+            lambda: self._set_product_option_value(
+                discontinued.option_name, discontinued.clean(value)
+            ),
         )
-        self._end_of_line = bool(value)
-        for product in self.products:
-            product.discontinued = True
+        self._end_of_line = value
 
     @property
     def name(self):
@@ -114,21 +233,33 @@ class ProductRange(BaseProduct):
 
     @name.setter
     def name(self, name):
-        CCAPI.set_product_name(product_ids=[p.id for p in self.products], name=name)
-        CCAPI.update_range_settings(
-            self.id,
-            current_name=self.name,
-            current_sku=self.sku,
-            current_end_of_line=self.end_of_line,
-            current_pre_order=self.pre_order,
-            current_group_items=self.grouped,
-            new_name=name,
-            new_sku=self.sku,
-            new_end_of_line=self.end_of_line,
-            new_pre_order=self.pre_order,
-            new_group_items=self.grouped,
-            channels=self._get_sales_channel_ids(),
-        )
+        """Set the name of the range and its products."""
+        channels = self._get_sales_channel_ids()
+        try:
+            batch.run_concurrently(
+                lambda: self.client.set_product_name(
+                    product_ids=[p.id for p in self.products], name=name
+                ),
+                lambda: self.client.update_range_settings(
+                    self.id,
+                    current_name=self.name,
+                    current_sku=self.sku,
+                    current_end_of_line=self.end_of_line,
+                    current_pre_order=self.pre_order,
+                    current_group_items=self.grouped,
+                    new_name=name,
+                    new_sku=self.sku,
+                    new_end_of_line=self.end_of_line,
+                    new_pre_order=self.pre_order,
+                    new_group_items=self.grouped,
+                    channels=channels,
+                ),
+            )
+        except Exception:
+            for product in self.products:
+                product.invalidate("_name", "full_name")
+            raise
+        self._name = name
 
     @property
     def options(self):
@@ -147,26 +278,178 @@ class ProductRange(BaseProduct):
         """Return list of Product Options which are variable for the range."""
         return self.options.variable_options
 
+    def filter(self, **lookups):
+        """
+        Return the products of the range matching keyword lookups.
+
+        See cc_products.query for the lookups available.
+
+        Returns:
+            cc_products.query.Catalogue.
+        """
+        return query.Catalogue([self], client=self.client).filter(**lookups)
+
+    def stock_snapshot(self):
+        """
+        Return the stock and pending stock levels of the products in the range.
+
+        Pending stock levels are loaded concurrently and cached briefly.
+
+        Returns:
+            dict of product SKUs to cc_products.stock.StockLevel.
+        """
+        pending_stock = batch.map_concurrently(
+            lambda product: product.get_pending_stock(use_cache=True), self.products
+        )
+        return {
+            product.sku: stock.StockLevel(product.stock_level, pending)
+            for product, pending in zip(self.products, pending_stock)
+        }
+
+    def vat_rates(self):
+        """
+        Return the VAT rates of the products in the range.
+
+        Products whose VAT rate ID is not known, such as those loaded with the
+        range, are loaded once each, concurrently.
+
+        Returns:
+            dict of product SKUs to VAT rates.
+        """
+        unloaded = [p for p in self.products if p._vat_rate_id is None]
+        batch.map_concurrently(lambda product: product._reload(), unloaded)
+        return {
+            product.sku: vat.vat_rates.get_rate(product._vat_rate_id)
+            for product in self.products
+        }
+
+    def set_scopes(self, scopes):
+        """
+        Set the scope values of many products in the range concurrently.
+
+        Every value is validated before any request is sent. Each product is
+        reloaded at most once and has its scope set with one request.
+
+        Args:
+            scopes: dict of Product IDs to dicts of keyword arguments for
+                cc_products.Variation.set_scope.
+
+        Raises:
+            KeyError if a Product ID does not match a product in the range.
+            cc_products.exceptions.ValidationError listing every invalid
+            value, in which case no requests are sent.
+        """
+        products = {product.id: product for product in self.products}
+        invalid_changes = []
+        for product_id, values in scopes.items():
+            product = products[product_id]
+            for name, value in values.items():
+                try:
+                    type(product).validate_scope(name, value)
+                except ValueError as exception:
+                    invalid_changes.append(
+                        validation.InvalidChange(product, name, value, str(exception))
+                    )
+        if invalid_changes:
+            raise exceptions.ValidationError(invalid_changes)
+        batch.map_concurrently(
+            lambda product_id: products[product_id].set_scope(**scopes[product_id]),
+            scopes,
+        )
+
     def add_product(self, barcode, description, vat_rate):
         """Create a new product belonging to this range."""
         from .functions import get_product
 
-        product_id = CCAPI.create_product(
+        product_id = self.client.create_product(
             range_id=self.id,
             name=self.name,
             barcode=barcode,
             description=description,
             vat_rate=vat_rate,
         )
-        return get_product(product_id)
+        return get_product(product_id, client=self.client)
 
     def delete(self):
         """Delete this Product Range."""
-        CCAPI.delete_range(self.id)
+        self.client.delete_range(self.id)
+
+    def clone(self, name, barcodes, progress=None):
+        """
+        Create a copy of this Product Range.
+
+        Products are copied with their description, VAT rate and Product
+        Option values, and the same Variation Options are used.
+
+        Args:
+            name: The name of the new Product Range.
+            barcodes: A barcode for each product, in the order of
+                self.products.
+
+        Kwargs:
+            progress: Callable taking the number of completed and total
+                requests, called as the new range is created.
+
+        Returns:
+            The new cc_products.ProductRange.
+        """
+        from .functions import create_range_from_template
+
+        if len(barcodes) != len(self.products):
+            raise ValueError("A barcode is required for each product.")
+
+        def product_template(product_and_barcode):
+            product, barcode = product_and_barcode
+            return {
+                "barcode": barcode,
+                "description": product.description,
+                "vat_rate": product.vat_rate,
+                "options": {k: v for k, v in product.options if v is not None},
+            }
+
+        template = {
+            "name": name,
+            "products": batch.map_concurrently(
+                product_template, zip(self.products, barcodes)
+            ),
+            "variable": [option.name for option in self.variable_options],
+        }
+        return create_range_from_template(
+            template, client=self.client, progress=progress
+        )
+
+    def _set_product_option_value(self, option_name, value, products=None):
+        """
+        Set a Product Option value for many products at once.
+
+        Kwargs:
+            products: The products to update. Defaults to every product in the
+                range.
+        """
+        if products is None:
+            products = self.products
+        if not products:
+            return
+        option = self.options[option_name]
+        if not option.selected:
+            option.selected = True
+        value_id = self.client.get_option_value_id(option.id, value, create=True)
+        self.client.set_product_option_value(
+            product_ids=[product.id for product in products],
+            option_id=option.id,
+            option_value_id=value_id,
+        )
+        for product in products:
+            if product._options is not None:
+                product._options._set_cached_value(option.id, option.name, value)
+
+    def invalidate_sales_channels(self):
+        """Clear cached Sales Channels for this Product Range."""
+        cache.sales_channels.for_client(self.client).invalidate(self.id)
 
     def _get_sales_channels(self):
         """Get Sales Channels for this Product Range."""
-        return CCAPI.get_sales_channels_for_range(self.id)
+        return get_sales_channels(self.id, client=self.client)
 
     def _get_sales_channel_ids(self):
         """Get IDs of Sales Channels on which this Product Range is listed."""
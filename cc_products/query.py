@@ -0,0 +1,267 @@
+"""
+Filter the products of Product Ranges by their attributes and Product Options.
+
+A Catalogue is a set of Product Ranges whose products can be filtered with
+keyword lookups, in the form attribute__lookup=value, where attribute is any
+attribute of cc_products.Variation. If no lookup is given the value must
+match exactly.
+
+    >>> catalogue = Catalogue(range_ids)
+    >>> for product in catalogue.filter(
+    ...     department="Womens", retail_price__lt=20, discontinued=False
+    ... ):
+    ...     print(product.sku)
+
+Ranges are loaded a chunk at a time as results are consumed. Lookups on
+attributes are evaluated first. Products are reloaded concurrently first if
+a lookup needs a field which is not in Product Range data, such as weight or
+price. Then the Product Options of the remaining products are fetched
+concurrently, only if any lookup needs them, and the lookups on Product
+Options are evaluated.
+
+Lookups:
+    exact: Equal to value.
+    ne: Not equal to value.
+    lt, lte, gt, gte: Less than, less than or equal to, greater than and
+        greater than or equal to value.
+    in: One of the items of value.
+    contains: Contains value.
+    icontains: Contains value, ignoring case.
+    isnull: None if value is True, otherwise not None.
+"""
+
+import inspect
+import itertools
+import operator
+
+from . import batch
+from .client import get_client
+from .optiondescriptors import OptionDescriptor
+from .productoptions import _DecodeError
+from .variation import VAT, CCDataField, ProductScopeDescriptor, Variation
+
+# Placeholder for Product Option values which could not be decoded, which
+# match no lookup.
+_UNDECODABLE = object()
+
+
+def _contains(value, argument):
+    return value is not None and argument in value
+
+
+def _icontains(value, argument):
+    return value is not None and argument.lower() in value.lower()
+
+
+LOOKUPS = {
+    "exact": operator.eq,
+    "ne": operator.ne,
+    "lt": operator.lt,
+    "lte": operator.le,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "in": lambda value, argument: value in argument,
+    "contains": _contains,
+    "icontains": _icontains,
+    "isnull": lambda value, argument: (value is None) == bool(argument),
+}
+
+
+class Predicate:
+    """
+    A lookup on one attribute of a product.
+
+    Args:
+        field: The name of the attribute of the product.
+        lookup: The name of the lookup, one of LOOKUPS.
+        argument: The value to compare with.
+        option_name: The name of the Product Option holding the value of
+            field, if it is a Product Option.
+        data_field: The name of the CCDataField holding the value of field,
+            if it is not in Product Range data.
+    """
+
+    def __init__(self, field, lookup, argument, option_name=None, data_field=None):
+        """Set the lookup."""
+        self.field = field
+        self.lookup = lookup
+        self.argument = argument
+        self.option_name = option_name
+        self.data_field = data_field
+        self._function = LOOKUPS[lookup]
+
+    def __repr__(self):
+        return "{}__{}={!r}".format(self.field, self.lookup, self.argument)
+
+    def column(self, products):
+        """Return a list of the value of field for each of products."""
+        if self.option_name is None:
+            return [getattr(product, self.field) for product in products]
+        column = []
+        for product in products:
+            value = product.options.typed_values[self.option_name]
+            column.append(_UNDECODABLE if isinstance(value, _DecodeError) else value)
+        return column
+
+    def needs_reload(self, product):
+        """Return True if product must be reloaded to read field."""
+        if self.data_field is None or self.data_field in product._field_values:
+            return False
+        return product._from_range or self.data_field in product._load_on_access
+
+    def mask(self, column):
+        """Return a list of True for each value in column which matches."""
+        mask = []
+        for value in column:
+            if value is _UNDECODABLE:
+                mask.append(False)
+                continue
+            try:
+                mask.append(bool(self._function(value, self.argument)))
+            except (TypeError, AttributeError):
+                mask.append(False)
+        return mask
+
+
+def parse_lookups(lookups, product_class=Variation):
+    """
+    Return a list of Predicates for keyword lookups.
+
+    Args:
+        lookups: dict of attribute__lookup strings to values.
+
+    Kwargs:
+        product_class: The class of the products to filter.
+
+    Raises:
+        ValueError: If an attribute or lookup is not recognised.
+    """
+    predicates = []
+    for key, argument in lookups.items():
+        field, _, lookup = key.partition("__")
+        lookup = lookup or "exact"
+        if lookup not in LOOKUPS:
+            raise ValueError("{} is not a valid lookup.".format(lookup))
+        try:
+            attribute = inspect.getattr_static(product_class, field)
+        except AttributeError:
+            raise ValueError(
+                "{} has no attribute {}.".format(product_class.__name__, field)
+            ) from None
+        option_name = None
+        if isinstance(attribute, OptionDescriptor):
+            option_name = attribute.option_name
+        data_field = _detail_field(product_class, field, attribute)
+        predicates.append(Predicate(field, lookup, argument, option_name, data_field))
+    return predicates
+
+
+def _detail_field(product_class, field, attribute):
+    """Return the name of the CCDataField behind field if it needs a reload."""
+    if isinstance(attribute, ProductScopeDescriptor):
+        name = attribute.instance_attr
+    elif isinstance(attribute, VAT):
+        name = "_vat_rate_id"
+    elif isinstance(attribute, CCDataField):
+        name = field
+    else:
+        name = "_" + field
+    data_field = product_class.data_fields().get(name)
+    if data_field is None or data_field.in_range_data:
+        return None
+    return name
+
+
+class Catalogue:
+    """
+    Lazily filtered products of a set of Product Ranges.
+
+    Args:
+        ranges: An iterable of Product Range IDs or cc_products.ProductRange
+            objects. It is copied to a list, so a Catalogue can be iterated
+            more than once.
+
+    Kwargs:
+        client: The Cloud Commerce API client used to load Product Ranges.
+        chunk_size: The number of Product Ranges loaded at a time.
+        max_workers: The maximum number of concurrent requests.
+    """
+
+    def __init__(
+        self, ranges, client=None, chunk_size=20, max_workers=batch.MAX_WORKERS
+    ):
+        """Set the Product Ranges to filter."""
+        self.ranges = list(ranges)
+        self.client = get_client(client)
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.predicates = []
+
+    def filter(self, **lookups):
+        """
+        Return a Catalogue of the products matching every lookup.
+
+        Raises:
+            ValueError: If an attribute or lookup is not recognised.
+        """
+        catalogue = Catalogue(
+            self.ranges,
+            client=self.client,
+            chunk_size=self.chunk_size,
+            max_workers=self.max_workers,
+        )
+        catalogue.predicates = self.predicates + parse_lookups(lookups)
+        return catalogue
+
+    def __iter__(self):
+        ranges = iter(self.ranges)
+        while True:
+            chunk = list(itertools.islice(ranges, self.chunk_size))
+            if not chunk:
+                return
+            products = [
+                product
+                for product_range in batch.map_concurrently(
+                    self._load_range, chunk, max_workers=self.max_workers
+                )
+                for product in product_range.products
+            ]
+            yield from self._match(products)
+
+    def first(self):
+        """Return the first matching product, or None if there is none."""
+        return next(iter(self), None)
+
+    def _load_range(self, product_range):
+        if isinstance(product_range, (str, int)):
+            from .functions import get_range
+
+            return get_range(product_range, client=self.client)
+        return product_range
+
+    def _match(self, products):
+        attribute_predicates = [p for p in self.predicates if p.option_name is None]
+        option_predicates = [p for p in self.predicates if p.option_name is not None]
+        reload = [
+            product
+            for product in products
+            if any(p.needs_reload(product) for p in attribute_predicates)
+        ]
+        batch.map_concurrently(
+            lambda product: product._reload(), reload, max_workers=self.max_workers
+        )
+        products = self._apply(attribute_predicates, products)
+        if option_predicates and products:
+            batch.map_concurrently(
+                lambda product: product.options.options,
+                [p for p in products if not p.options.is_loaded],
+                max_workers=self.max_workers,
+            )
+            products = self._apply(option_predicates, products)
+        return products
+
+    def _apply(self, predicates, products):
+        for predicate in predicates:
+            mask = predicate.mask(predicate.column(products))
+            products = [p for p, matches in zip(products, mask) if matches]
+        return products
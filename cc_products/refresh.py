@@ -0,0 +1,205 @@
+"""
+Keep frequently used Product Ranges loaded in the background.
+
+When a RangeRefresher is started, get_range counts how often each Product
+Range is requested. A worker thread periodically reloads the most requested
+ranges so that get_range can return them without waiting for Cloud Commerce.
+A warm copy older than the refresh interval is still returned, and is
+reloaded in the background.
+
+Warm copies are shared: every call to get_range for a warm range returns the
+same ProductRange object until it is refreshed, so changes made to it are
+seen by every caller.
+
+Request counts are halved after each refresh so that ranges which are no
+longer requested fall out of the hot set, and ranges whose count reaches
+zero are forgotten.
+
+    >>> refresher = start_refresher(top_n=200, interval=300)
+    >>> product_range = get_range(range_id)
+    >>> stop_refresher()
+"""
+
+import collections
+import logging
+import threading
+import time
+
+from . import batch
+from .client import get_client
+
+logger = logging.getLogger(__name__)
+
+_refresher = None
+_refresher_lock = threading.Lock()
+
+
+class RangeRefresher:
+    """
+    Keep the most requested Product Ranges loaded.
+
+    Kwargs:
+        top_n: The number of Product Ranges to keep loaded.
+        interval: The number of seconds between refreshes. Warm copies older
+            than this are reloaded when they are requested.
+        client: The Cloud Commerce API client to use.
+        load_options: If True the Product Options of warm ranges are loaded
+            when they are refreshed.
+    """
+
+    def __init__(self, top_n=100, interval=300, client=None, load_options=True):
+        """Configure the refresher."""
+        self.top_n = top_n
+        self.interval = interval
+        self.client = get_client(client)
+        self.load_options = load_options
+        self.access_counts = collections.Counter()
+        self._hot_range_ids = set()
+        self._ranges = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start refreshing warm ranges in a worker thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="cc_products range refresher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the worker thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def get_range(self, range_id):
+        """
+        Return a Product Range, using a warm copy if there is one.
+
+        Stale warm copies are returned and reloaded in the background.
+        Ranges without a warm copy are loaded, and kept if they are in the
+        hot set or there is room for them in it.
+
+        Warm copies are shared with every other caller, not copied.
+        """
+        with self._lock:
+            self.access_counts[range_id] += 1
+            entry = self._ranges.get(range_id)
+            is_stale = entry is not None and self._is_stale(entry)
+            if is_stale and range_id not in self._refreshing:
+                self._refreshing.add(range_id)
+            else:
+                is_stale = False
+        if entry is None:
+            product_range = self._load(range_id)
+            with self._lock:
+                if len(self._hot_range_ids) < self.top_n:
+                    self._hot_range_ids.add(range_id)
+            self._store(range_id, product_range)
+            return product_range
+        if is_stale:
+            threading.Thread(
+                target=self._refresh_range,
+                args=(range_id,),
+                name="cc_products range refresh {}".format(range_id),
+                daemon=True,
+            ).start()
+        return entry[0]
+
+    def hot_range_ids(self):
+        """Return a set of the IDs of the Product Ranges to keep warm."""
+        with self._lock:
+            return set(self._hot_range_ids)
+
+    def is_warm(self, range_id):
+        """Return True if a copy of the Product Range is loaded."""
+        with self._lock:
+            return range_id in self._ranges
+
+    def refresh(self):
+        """
+        Reload the most requested ranges and discard all other copies.
+
+        The hot set is recalculated from the request counts, which are then
+        halved.
+        """
+        with self._lock:
+            hot_range_ids = {r for r, _ in self.access_counts.most_common(self.top_n)}
+            self._hot_range_ids = set(hot_range_ids)
+            self.access_counts = collections.Counter(
+                {r: count // 2 for r, count in self.access_counts.items() if count > 1}
+            )
+            for range_id in list(self._ranges):
+                if range_id not in hot_range_ids:
+                    del self._ranges[range_id]
+            hot_range_ids -= self._refreshing
+            self._refreshing |= hot_range_ids
+        batch.map_concurrently(self._refresh_range, hot_range_ids)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Error refreshing warm Product Ranges.")
+
+    def _is_stale(self, entry):
+        return time.monotonic() - entry[1] > self.interval
+
+    def _load(self, range_id):
+        from .functions import load_range
+
+        product_range = load_range(range_id, client=self.client)
+        if self.load_options:
+            product_range.options.options
+        return product_range
+
+    def _store(self, range_id, product_range):
+        with self._lock:
+            if range_id in self._hot_range_ids:
+                self._ranges[range_id] = (product_range, time.monotonic())
+
+    def _refresh_range(self, range_id):
+        try:
+            self._store(range_id, self._load(range_id))
+        except Exception:
+            logger.exception("Error refreshing Product Range %s.", range_id)
+        finally:
+            with self._lock:
+                self._refreshing.discard(range_id)
+
+
+def get_refresher():
+    """Return the running RangeRefresher, or None if there is none."""
+    return _refresher
+
+
+def start_refresher(top_n=100, interval=300, client=None, load_options=True):
+    """
+    Start keeping the most requested Product Ranges loaded.
+
+    Returns:
+        The running RangeRefresher.
+    """
+    global _refresher
+    with _refresher_lock:
+        if _refresher is not None:
+            _refresher.stop()
+        _refresher = RangeRefresher(
+            top_n=top_n, interval=interval, client=client, load_options=load_options
+        )
+        _refresher.start()
+        return _refresher
+
+
+def stop_refresher():
+    """Stop the running RangeRefresher, if any."""
+    global _refresher
+    with _refresher_lock:
+        if _refresher is not None:
+            _refresher.stop()
+            _refresher = None
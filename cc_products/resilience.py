@@ -0,0 +1,252 @@
+"""
+Retries and a circuit breaker for Cloud Commerce API requests.
+
+A ResilientClient wraps a Cloud Commerce API client. Requests which fail
+with a transient error, such as a dropped connection or a 5xx response, or
+which are throttled, are retried with exponential backoff. Requests which
+fail with any other error are not retried.
+
+All requests through the client share a CircuitBreaker. After repeated
+transient failures it opens, and requests pause until the reset timeout has
+passed. One trial request is then sent, and the circuit closes again if it
+succeeds.
+
+    >>> set_default_client(ResilientClient(CCAPI))
+
+Endpoints in NON_IDEMPOTENT_ENDPOINTS create something each time they are
+called. A transient failure may happen after the request was applied, so
+they are only retried when they are throttled.
+"""
+
+import random
+import threading
+import time
+from collections import Counter
+
+from . import exceptions, metrics
+from .client import get_client
+
+TRANSIENT = "transient"
+THROTTLED = "throttled"
+PERMANENT = "permanent"
+
+TRANSIENT_STATUS_CODES = frozenset((500, 502, 503, 504))
+THROTTLED_STATUS_CODES = frozenset((429,))
+
+NON_IDEMPOTENT_ENDPOINTS = frozenset(("create_product", "create_range"))
+
+
+def _status_code(exception):
+    status_code = getattr(exception, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(exception, "response", None), "status_code", None)
+    return status_code
+
+
+class RetryPolicy:
+    """
+    Decide which failed requests are retried, and when.
+
+    Kwargs:
+        max_attempts: The maximum number of times to send a request.
+        backoff: The number of seconds to wait before the first retry. The
+            wait doubles with each retry.
+        max_backoff: The maximum number of seconds to wait between retries.
+        transient_errors: Exception classes to treat as transient, in
+            addition to OSError and 5xx responses.
+        throttled_errors: Exception classes to treat as throttling, in
+            addition to 429 responses.
+    """
+
+    def __init__(
+        self,
+        max_attempts=4,
+        backoff=0.5,
+        max_backoff=30,
+        transient_errors=(),
+        throttled_errors=(),
+    ):
+        """Set the retry limits."""
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.transient_errors = tuple(transient_errors)
+        self.throttled_errors = tuple(throttled_errors)
+
+    def classify(self, exception):
+        """Return TRANSIENT, THROTTLED or PERMANENT for a request error."""
+        if isinstance(exception, self.throttled_errors):
+            return THROTTLED
+        if isinstance(exception, self.transient_errors):
+            return TRANSIENT
+        status_code = _status_code(exception)
+        if status_code in THROTTLED_STATUS_CODES:
+            return THROTTLED
+        if status_code in TRANSIENT_STATUS_CODES:
+            return TRANSIENT
+        if status_code is None and isinstance(exception, OSError):
+            return TRANSIENT
+        return PERMANENT
+
+    def should_retry(self, endpoint, kind, attempt):
+        """Return True if a request which failed on attempt can be retried."""
+        if attempt >= self.max_attempts or kind == PERMANENT:
+            return False
+        return kind == THROTTLED or endpoint not in NON_IDEMPOTENT_ENDPOINTS
+
+    def delay(self, attempt, exception):
+        """
+        Return the number of seconds to wait before retrying.
+
+        A Retry-After header on the response is used if there is one,
+        otherwise the backoff is doubled for each attempt with full jitter.
+        """
+        headers = getattr(getattr(exception, "response", None), "headers", None)
+        try:
+            return min(float(headers["Retry-After"]), self.max_backoff)
+        except (KeyError, TypeError, ValueError):
+            pass
+        backoff = min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+        return random.uniform(0, backoff)
+
+
+class CircuitBreaker:
+    """
+    Stop sending requests while the API is failing.
+
+    The circuit opens after failure_threshold consecutive failures. While it
+    is open requests wait, or raise exceptions.CircuitOpenError, until
+    reset_timeout seconds have passed. The circuit is then half open: one
+    trial request is allowed, and the circuit closes if it succeeds or opens
+    again if it fails.
+
+    Kwargs:
+        failure_threshold: The number of consecutive failures which open the
+            circuit.
+        reset_timeout: The number of seconds the circuit stays open.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        """Create a closed circuit."""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def before_request(self, block=True):
+        """
+        Wait until a request is allowed.
+
+        Kwargs:
+            block: If False raise exceptions.CircuitOpenError instead of
+                waiting.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if self.state == self.CLOSED:
+                    return
+                reopen = self._opened_at + self.reset_timeout
+                if self.state == self.OPEN and now >= reopen:
+                    self.state = self.HALF_OPEN
+                if self.state == self.HALF_OPEN and not self._trial_running:
+                    self._trial_running = True
+                    return
+                wait = max(reopen - now, 0) or min(self.reset_timeout, 1) / 10
+            if not block:
+                raise exceptions.CircuitOpenError(wait)
+            time.sleep(wait)
+
+    def record_success(self):
+        """Record a request which reached the API, closing the circuit."""
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_running = False
+
+    def record_cancelled(self):
+        """Record a request which was interrupted before it had an outcome."""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self):
+        """Record a transient failure, opening the circuit if needed."""
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.state == self.HALF_OPEN or (
+                self.failures >= self.failure_threshold
+            ):
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class ResilientClient:
+    """
+    Cloud Commerce API client which retries failed requests.
+
+    Args:
+        client: The Cloud Commerce API client to wrap. If None the default
+            client is used.
+
+    Kwargs:
+        retry_policy: The RetryPolicy to use. Defaults to RetryPolicy().
+        circuit_breaker: The CircuitBreaker to use. Defaults to
+            CircuitBreaker().
+        block: If True requests wait while the circuit is open, otherwise
+            they raise exceptions.CircuitOpenError.
+
+    Attributes:
+        retries: collections.Counter of the number of retries of each
+            endpoint.
+    """
+
+    def __init__(self, client, retry_policy=None, circuit_breaker=None, block=True):
+        """Wrap client."""
+        self.client = get_client(client)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.block = block
+        self.retries = Counter()
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        def resilient_request(*args, **kwargs):
+            attempt = 0
+            while True:
+                attempt += 1
+                self.circuit_breaker.before_request(block=self.block)
+                try:
+                    result = attr(*args, **kwargs)
+                except Exception as exception:
+                    kind = self.retry_policy.classify(exception)
+                    if kind == PERMANENT:
+                        self.circuit_breaker.record_success()
+                        raise
+                    self.circuit_breaker.record_failure()
+                    if not self.retry_policy.should_retry(name, kind, attempt):
+                        raise
+                    with self._lock:
+                        self.retries[name] += 1
+                    metrics.api_retries.inc(name, kind)
+                    time.sleep(self.retry_policy.delay(attempt, exception))
+                except BaseException:
+                    # Allow another trial request if this one was interrupted.
+                    self.circuit_breaker.record_cancelled()
+                    raise
+                else:
+                    self.circuit_breaker.record_success()
+                    return result
+
+        return resilient_request
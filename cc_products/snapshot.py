@@ -0,0 +1,455 @@
+"""
+Read only snapshots of Product Ranges which can be shared between processes.
+
+write_snapshot saves loaded Product Ranges to a file of fixed width columns,
+one for each attribute, with every string stored once in a string table.
+Snapshot memory maps the file, so any number of processes opening the same
+snapshot share one copy of it in the page cache. Products are read through
+SnapshotVariation views, which have the same attribute names as
+cc_products.Variation and read values from the mapped file when accessed.
+
+    >>> write_snapshot("catalogue.snapshot", [get_range(i) for i in range_ids])
+
+In each reading process:
+
+    >>> with Snapshot("catalogue.snapshot") as snapshot:
+    ...     for product in snapshot.get_range(range_id):
+    ...         print(product.sku, product.retail_price)
+
+File format: the 8 byte MAGIC, the length of a JSON directory as an
+unsigned 64 bit little endian integer, the directory, and then each column,
+aligned to 8 bytes. The directory holds the number of ranges and products
+and the offset, type code and length of each column. Numeric columns are
+little endian arrays. String columns hold indexes into the string table,
+which is an array of offsets followed by the UTF-8 encoded strings. Missing
+values are stored as NULL_INDEX, NULL_INTEGER, NaN or -1 for strings,
+integers, floats and bools.
+"""
+
+import array
+import inspect
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+from collections.abc import Sequence
+
+from . import batch
+from .optiondescriptors import OptionDescriptor
+from .variation import Variation
+
+MAGIC = b"CCPSNAP1"
+VERSION = 1
+NULL_INDEX = 2**32 - 1
+NULL_INTEGER = -(2**63)
+
+STRING = "I"
+INTEGER = "q"
+FLOAT = "d"
+BOOL = "b"
+
+RANGE_COLUMNS = {
+    "id": STRING,
+    "name": STRING,
+    "sku": STRING,
+    "thumbnail": STRING,
+    "end_of_line": BOOL,
+    "pre_order": BOOL,
+    "grouped": BOOL,
+}
+
+PRODUCT_COLUMNS = {
+    "id": STRING,
+    "sku": STRING,
+    "full_name": STRING,
+    "range_id": STRING,
+    "name": STRING,
+    "description": STRING,
+    "barcode": STRING,
+    "stock_level": INTEGER,
+    "handling_time": INTEGER,
+    "is_multipack": BOOL,
+}
+
+# Columns which are not in Product Range data, so saving them reloads
+# products.
+DETAIL_COLUMNS = {
+    "price": FLOAT,
+    "vat_rate": INTEGER,
+    "weight": INTEGER,
+    "cloud_commerce_length": INTEGER,
+    "cloud_commerce_width": INTEGER,
+    "cloud_commerce_height": INTEGER,
+    "large_letter_compatible": BOOL,
+    "external_product_id": STRING,
+}
+
+
+def option_attributes(product_class=Variation):
+    """Return a dict of the attribute names of Product Option descriptors."""
+    return {
+        name: attr
+        for klass in reversed(product_class.__mro__)
+        for name, attr in vars(klass).items()
+        if isinstance(attr, OptionDescriptor)
+    }
+
+
+class _StringTable:
+    def __init__(self):
+        self.indexes = {}
+
+    def add(self, value):
+        if value is None:
+            return NULL_INDEX
+        value = str(value)
+        try:
+            return self.indexes[value]
+        except KeyError:
+            index = self.indexes[value] = len(self.indexes)
+            return index
+
+    def sections(self):
+        encoded = [value.encode("utf-8") for value in self.indexes]
+        offsets = array.array("Q", [0])
+        for value in encoded:
+            offsets.append(offsets[-1] + len(value))
+        return offsets, b"".join(encoded)
+
+
+def _encode(typecode, value, strings):
+    if typecode == STRING:
+        return strings.add(value)
+    if typecode == INTEGER:
+        return NULL_INTEGER if value is None else int(value)
+    if typecode == FLOAT:
+        return math.nan if value is None else float(value)
+    return -1 if value is None else int(bool(value))
+
+
+def _product_row(product, columns, options):
+    row = {name: getattr(product, name) for name in columns}
+    if options:
+        values = {o.name: o.value for o in product.options.options}
+        for name, descriptor in option_attributes(Variation).items():
+            row["option." + name] = values.get(descriptor.option_name)
+    return row
+
+
+def write_snapshot(
+    path, ranges, details=False, options=True, max_workers=batch.MAX_WORKERS
+):
+    """
+    Save Product Ranges as a snapshot file.
+
+    The file is written alongside path and moved into place, so processes
+    which have the previous snapshot open are not affected.
+
+    Args:
+        path: The path of the snapshot file.
+        ranges: An iterable of cc_products.ProductRange.
+
+    Kwargs:
+        details: If True the values in DETAIL_COLUMNS are saved, which
+            reloads products which were loaded with their range.
+        options: If True the Product Option values of each product are
+            saved, which loads them if they have not been loaded.
+        max_workers: The maximum number of concurrent requests.
+    """
+    ranges = list(ranges)
+    products = [product for product_range in ranges for product in product_range]
+    columns = dict(PRODUCT_COLUMNS, **(DETAIL_COLUMNS if details else {}))
+    rows = batch.map_concurrently(
+        lambda product: _product_row(product, columns, options),
+        products,
+        max_workers=max_workers,
+    )
+    if options:
+        columns.update(
+            ("option." + name, STRING) for name in option_attributes(Variation)
+        )
+    strings = _StringTable()
+    sections = {}
+    for name, typecode in RANGE_COLUMNS.items():
+        sections["range." + name] = array.array(
+            typecode, (_encode(typecode, getattr(r, name), strings) for r in ranges)
+        )
+    sections["range.product_start"] = array.array("Q")
+    sections["range.product_count"] = array.array("Q")
+    sections["product.range_index"] = array.array("Q")
+    for index, product_range in enumerate(ranges):
+        sections["range.product_start"].append(len(sections["product.range_index"]))
+        sections["range.product_count"].append(len(product_range.products))
+        sections["product.range_index"].extend([index] * len(product_range.products))
+    for name, typecode in columns.items():
+        sections["product." + name] = array.array(
+            typecode, (_encode(typecode, row.get(name), strings) for row in rows)
+        )
+    sections["strings.offsets"], sections["strings.data"] = strings.sections()
+    _write(path, sections, len(ranges), len(products))
+
+
+def _write(path, sections, range_count, product_count):
+    directory = {
+        "version": VERSION,
+        "ranges": range_count,
+        "products": product_count,
+        "columns": {},
+    }
+    offset = 0
+    for name, section in sections.items():
+        size = len(section) * getattr(section, "itemsize", 1)
+        directory["columns"][name] = [
+            offset,
+            getattr(section, "typecode", "B"),
+            len(section),
+        ]
+        offset += size + (-size % 8)
+    header = json.dumps(directory).encode("utf-8")
+    header += b" " * (-(len(MAGIC) + 8 + len(header)) % 8)
+    temporary_path = "{}.{}.tmp".format(path, os.getpid())
+    with open(temporary_path, "wb") as snapshot_file:
+        snapshot_file.write(MAGIC + struct.pack("<Q", len(header)) + header)
+        for section in sections.values():
+            if sys.byteorder != "little" and isinstance(section, array.array):
+                section = array.array(section.typecode, section)
+                section.byteswap()
+            data = bytes(section)
+            snapshot_file.write(data + b"\0" * (-len(data) % 8))
+    os.replace(temporary_path, path)
+
+
+class SnapshotColumn:
+    """Read only descriptor reading a column of a Snapshot."""
+
+    def __init__(self, column):
+        """Set the name of the column."""
+        self.column = column
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return instance._snapshot._value(self.column, instance._index)
+
+    def __set__(self, instance, value):
+        raise AttributeError("{} is read only.".format(type(instance).__name__))
+
+
+class SnapshotOption(SnapshotColumn):
+    """Read only descriptor decoding a Product Option value from a Snapshot."""
+
+    def __init__(self, column, descriptor):
+        """Set the name of the column and the Product Option descriptor."""
+        super().__init__(column)
+        self.descriptor = descriptor
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return self.descriptor.decode(super().__get__(instance, owner))
+
+
+class SnapshotRange:
+    """Read only view of a Product Range in a Snapshot."""
+
+    __slots__ = ("_snapshot", "_index")
+
+    def __init__(self, snapshot, index):
+        """Set the Snapshot and the position of the range in it."""
+        self._snapshot = snapshot
+        self._index = index
+
+    def __repr__(self):
+        return self.name
+
+    def __iter__(self):
+        return iter(self.products)
+
+    @property
+    def products(self):
+        """Return a list of SnapshotVariation for the products of the range."""
+        start = self._snapshot._value("range.product_start", self._index)
+        count = self._snapshot._value("range.product_count", self._index)
+        return [
+            SnapshotVariation(self._snapshot, i) for i in range(start, start + count)
+        ]
+
+
+for _name in RANGE_COLUMNS:
+    setattr(SnapshotRange, _name, SnapshotColumn("range." + _name))
+
+
+class SnapshotVariation:
+    """
+    Read only view of a product in a Snapshot.
+
+    Has the attributes of cc_products.Variation which were saved in the
+    snapshot. Reading an attribute which was not saved raises
+    AttributeError.
+    """
+
+    __slots__ = ("_snapshot", "_index")
+
+    def __init__(self, snapshot, index):
+        """Set the Snapshot and the position of the product in it."""
+        self._snapshot = snapshot
+        self._index = index
+
+    def __repr__(self):
+        return self.full_name
+
+    @property
+    def product_range(self):
+        """Return the SnapshotRange to which the product belongs."""
+        return SnapshotRange(
+            self._snapshot, self._snapshot._value("product.range_index", self._index)
+        )
+
+
+for _name, _column in dict(PRODUCT_COLUMNS, **DETAIL_COLUMNS).items():
+    setattr(SnapshotVariation, _name, SnapshotColumn("product." + _name))
+for _name, _descriptor in option_attributes(Variation).items():
+    if inspect.getattr_static(SnapshotVariation, _name, None) is None:
+        setattr(
+            SnapshotVariation,
+            _name,
+            SnapshotOption("product.option." + _name, _descriptor),
+        )
+
+
+class _Views(Sequence):
+    def __init__(self, snapshot, view_class, length):
+        self._snapshot = snapshot
+        self._view_class = view_class
+        self._length = length
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError(index)
+        return self._view_class(self._snapshot, index)
+
+
+class Snapshot:
+    """
+    Memory mapped snapshot file written by write_snapshot.
+
+    Args:
+        path: The path of the snapshot file.
+
+    Attributes:
+        ranges: Sequence of SnapshotRange.
+        products: Sequence of SnapshotVariation.
+
+    Raises:
+        ValueError: If the file is not a snapshot of a supported version.
+    """
+
+    def __init__(self, path):
+        """Map the snapshot file."""
+        if sys.byteorder != "little":
+            raise ValueError("Snapshots can only be read on little endian machines.")
+        self.path = path
+        with open(path, "rb") as snapshot_file:
+            self._mmap = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[: len(MAGIC)] != MAGIC:
+            self._mmap.close()
+            raise ValueError("{} is not a snapshot file.".format(path))
+        (header_length,) = struct.unpack_from("<Q", self._mmap, len(MAGIC))
+        start = len(MAGIC) + 8
+        directory = json.loads(self._mmap[start : start + header_length])
+        if directory["version"] != VERSION:
+            self._mmap.close()
+            raise ValueError(
+                "Snapshot version {} is not supported.".format(directory["version"])
+            )
+        data_start = start + header_length
+        self._views = [memoryview(self._mmap)]
+        self._columns = {}
+        for name, (offset, typecode, length) in directory["columns"].items():
+            size = length * array.array(typecode).itemsize
+            section = self._views[0][data_start + offset : data_start + offset + size]
+            self._views.append(section)
+            if typecode != "B":
+                section = section.cast(typecode)
+                self._views.append(section)
+            self._columns[name] = section
+        self._range_indexes = None
+        self._product_indexes = None
+        self.ranges = _Views(self, SnapshotRange, directory["ranges"])
+        self.products = _Views(self, SnapshotVariation, directory["products"])
+
+    def get_range(self, range_id):
+        """
+        Return the SnapshotRange with the ID range_id.
+
+        Raises:
+            KeyError: If the range is not in the snapshot.
+        """
+        if self._range_indexes is None:
+            self._range_indexes = self._index("range.id")
+        return SnapshotRange(self, self._range_indexes[str(range_id)])
+
+    def get_product(self, product_id):
+        """
+        Return the SnapshotVariation with the ID product_id.
+
+        Raises:
+            KeyError: If the product is not in the snapshot.
+        """
+        if self._product_indexes is None:
+            self._product_indexes = self._index("product.id")
+        return SnapshotVariation(self, self._product_indexes[str(product_id)])
+
+    def close(self):
+        """Unmap the snapshot file."""
+        for view in reversed(self._views):
+            view.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _index(self, column):
+        return {self._string(i): n for n, i in enumerate(self._columns[column])}
+
+    def _string(self, index):
+        if index == NULL_INDEX:
+            return None
+        offsets = self._columns["strings.offsets"]
+        return str(
+            self._columns["strings.data"][offsets[index] : offsets[index + 1]], "utf-8"
+        )
+
+    def _value(self, column, index):
+        try:
+            values = self._columns[column]
+        except KeyError:
+            raise AttributeError(
+                "{} was not saved in the snapshot.".format(column.split(".")[-1])
+            ) from None
+        value = values[index]
+        typecode = values.format
+        if typecode == STRING:
+            return self._string(value)
+        if typecode == INTEGER:
+            return None if value == NULL_INTEGER else value
+        if typecode == FLOAT:
+            return None if math.isnan(value) else value
+        if typecode == BOOL:
+            return None if value == -1 else bool(value)
+        return value
@@ -0,0 +1,159 @@
+"""Tools for updating stock levels for many products at once."""
+
+from collections import namedtuple
+
+from . import batch
+from .client import get_client
+
+StockLevel = namedtuple("StockLevel", ["stock_level", "pending_stock"])
+
+
+class StockReconciliation:
+    """
+    Summary of a stock reconciliation.
+
+    Attributes:
+        updated: dict of Product IDs to the stock level they were updated to.
+        unchanged: list of Product IDs already at the requested stock level.
+        conflicts: list of Product IDs whose stock level changed before it
+            was updated and were retried with the current level.
+        failed: dict of Product IDs to the exception raised updating them.
+    """
+
+    def __init__(self):
+        """Create an empty summary."""
+        self.updated = {}
+        self.unchanged = []
+        self.conflicts = []
+        self.failed = {}
+
+    def __repr__(self):
+        return "Updated: {}, Unchanged: {}, Conflicts: {}, Failed: {}".format(
+            len(self.updated),
+            len(self.unchanged),
+            len(self.conflicts),
+            len(self.failed),
+        )
+
+
+def get_stock_level(product_id, client=None):
+    """Return the current stock level of a product from Cloud Commerce."""
+    return get_client(client).get_product(product_id).json["StockLevel"]
+
+
+def _load_stock_levels(product_ids, client, max_workers):
+    """Return dicts of loaded stock levels and of exceptions, by Product ID."""
+
+    def load(product_id):
+        try:
+            return get_stock_level(product_id, client=client), None
+        except Exception as exception:
+            return None, exception
+
+    levels, failed = {}, {}
+    results = batch.map_concurrently(load, product_ids, max_workers=max_workers)
+    for product_id, (level, error) in zip(product_ids, results):
+        if error is None:
+            levels[product_id] = level
+        else:
+            failed[product_id] = error
+    return levels, failed
+
+
+def reconcile_stock(
+    stock_levels,
+    product_ranges=(),
+    max_workers=batch.MAX_WORKERS,
+    calls_per_second=None,
+    max_retries=3,
+    client=None,
+):
+    """
+    Set the stock level of many products, updating only those that differ.
+
+    Current stock levels are read from the range data of product_ranges.
+    Products not in any of product_ranges are loaded individually.
+
+    If an update fails the current stock level is reloaded. If it has changed
+    since it was read the update is retried with the current level as the
+    old stock level, up to max_retries times. Products whose stock level
+    cannot be loaded, or whose update or reload fails, are recorded in the
+    report's failed dict.
+
+    Args:
+        stock_levels: dict of Product IDs to new stock levels.
+
+    Kwargs:
+        product_ranges: cc_products.ProductRange objects containing the
+            products.
+        max_workers: The maximum number of concurrent requests.
+        calls_per_second: The maximum number of stock updates to send each
+            second. If None updates are not limited.
+        max_retries: The maximum number of times to retry a conflicting
+            update.
+        client: The Cloud Commerce API client to use.
+
+    Returns:
+        StockReconciliation.
+    """
+    client = get_client(client)
+    products = {
+        product.id: product
+        for product_range in product_ranges
+        for product in product_range.products
+        if product.id in stock_levels
+    }
+    missing = [product_id for product_id in stock_levels if product_id not in products]
+    current_levels = {product_id: p.stock_level for product_id, p in products.items()}
+    report = StockReconciliation()
+    loaded, report.failed = _load_stock_levels(missing, client, max_workers)
+    current_levels.update(loaded)
+    rate_limiter = batch.RateLimiter(calls_per_second)
+
+    def update(product_id):
+        new_level = stock_levels[product_id]
+        old_level = current_levels[product_id]
+        conflict = False
+        for attempt in range(max_retries + 1):
+            if old_level == new_level:
+                return product_id, new_level, conflict, None
+            rate_limiter.wait()
+            try:
+                client.update_product_stock_level(
+                    product_id=product_id,
+                    new_stock_level=new_level,
+                    old_stock_level=old_level,
+                )
+            except Exception as exception:
+                error = exception
+            else:
+                return product_id, new_level, conflict, None
+            try:
+                refreshed_level = get_stock_level(product_id, client=client)
+            except Exception as exception:
+                return product_id, old_level, conflict, exception
+            if refreshed_level == old_level:
+                break
+            conflict = True
+            old_level = refreshed_level
+        return product_id, old_level, conflict, error
+
+    changed = []
+    for product_id, new_level in stock_levels.items():
+        if product_id not in current_levels:
+            continue
+        if current_levels[product_id] == new_level:
+            report.unchanged.append(product_id)
+        else:
+            changed.append(product_id)
+    results = batch.map_concurrently(update, changed, max_workers=max_workers)
+    for product_id, level, conflict, error in results:
+        if conflict:
+            report.conflicts.append(product_id)
+        if error is not None:
+            report.failed[product_id] = error
+            continue
+        report.updated[product_id] = level
+        if product_id in products:
+            products[product_id]._stock_level = level
+    return report
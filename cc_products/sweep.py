@@ -0,0 +1,109 @@
+"""
+Process many Product Ranges in parallel using a pool of processes.
+
+sweep divides a list of Product Range IDs into chunks, which are loaded and
+processed by worker processes. Only the results of the processing function
+are sent back to the calling process. The number of chunks in progress is
+limited so that memory use does not grow with the number of ranges.
+
+    >>> def count_products(product_range):
+    ...     return len(product_range.products)
+    >>> for result in sweep(range_ids, count_products):
+    ...     print(result.range_id, result.value)
+"""
+
+import itertools
+import os
+import pickle
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from .client import set_default_client
+
+SweepResult = namedtuple("SweepResult", ["range_id", "value", "error"])
+
+
+def _init_worker(client_factory):
+    if client_factory is not None:
+        set_default_client(client_factory())
+
+
+def _process_chunk(function, range_ids):
+    from .functions import get_range
+
+    results = []
+    for range_id in range_ids:
+        try:
+            value = function(get_range(range_id))
+            pickle.dumps(value)
+        except Exception as exception:
+            results.append(SweepResult(range_id, None, repr(exception)))
+        else:
+            results.append(SweepResult(range_id, value, None))
+    return results
+
+
+def _chunks(items, chunk_size):
+    items = iter(items)
+    while True:
+        chunk = list(itertools.islice(items, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def sweep(
+    range_ids,
+    function,
+    processes=None,
+    chunk_size=10,
+    max_pending=None,
+    client_factory=None,
+):
+    """
+    Apply function to Product Ranges in a pool of worker processes.
+
+    Results are yielded as each chunk of ranges is completed, so they are not
+    in the order of range_ids. An exception raised loading or processing a
+    range, or pickling its result, is returned as the error of its result
+    rather than stopping the sweep.
+
+    Args:
+        range_ids: An iterable of Product Range IDs. It is consumed as
+            workers become free.
+        function: A picklable callable taking a cc_products.ProductRange and
+            returning a picklable value.
+
+    Kwargs:
+        processes: The number of worker processes. Defaults to the number
+            of CPUs.
+        chunk_size: The number of ranges sent to a worker at a time.
+        max_pending: The maximum number of chunks in progress at once.
+            Defaults to twice the number of processes.
+        client_factory: A picklable callable returning the Cloud Commerce API
+            client for each worker to use. If None workers use the default
+            client.
+
+    Yields:
+        SweepResult(range_id, value, error) for each range. error is None, or
+        the repr of the exception raised for the range.
+    """
+    processes = processes or os.cpu_count() or 1
+    max_pending = max_pending or processes * 2
+    executor = ProcessPoolExecutor(
+        max_workers=processes, initializer=_init_worker, initargs=(client_factory,)
+    )
+    pending = set()
+    try:
+        for chunk in _chunks(range_ids, chunk_size):
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+            pending.add(executor.submit(_process_chunk, function, chunk))
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
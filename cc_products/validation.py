@@ -0,0 +1,137 @@
+"""
+Check changes to Variations before they are sent to Cloud Commerce.
+
+Changes are given as a dict of products to dicts of Variation attribute names
+and new values. All changes are checked locally, without making any
+requests, and every invalid change is reported at once.
+
+    >>> changes = {variation: {"retail_price": 12.5, "gender": "womens"}}
+    >>> validate_changes(changes)
+    >>> apply_changes(changes)
+"""
+
+from collections import namedtuple
+
+from . import exceptions
+from .variation import Variation
+
+InvalidChange = namedtuple(
+    "InvalidChange", ["product", "attribute", "value", "message"]
+)
+
+
+def _check_number(name, value, number_type=float):
+    if isinstance(value, bool):
+        raise ValueError("{} must be a number, not {!r}.".format(name, value))
+    try:
+        number = number_type(value)
+    except (TypeError, ValueError):
+        raise ValueError("{} must be a number, not {!r}.".format(name, value))
+    if number < 0:
+        raise ValueError("{} must be at least 0.".format(name))
+
+
+def _check_string(name, value):
+    if not isinstance(value, str):
+        raise ValueError("{} must be a string, not {!r}.".format(name, value))
+
+
+def _check_hs_code(name, value):
+    if not str(value).isdigit() or len(str(value)) > 10:
+        raise ValueError("{!r} is not a valid HS Code.".format(value))
+
+
+def _check_bays(name, value):
+    for bay in value:
+        _check_number(name, bay, number_type=int)
+
+
+PROPERTY_VALIDATORS = {
+    "price": _check_number,
+    "stock_level": lambda name, value: _check_number(name, value, int),
+    "handling_time": lambda name, value: _check_number(name, value, int),
+    "country_of_origin": lambda name, value: _check_number(name, value, int),
+    "hs_code": _check_hs_code,
+    "bays": _check_bays,
+    "name": _check_string,
+    "barcode": _check_string,
+    "description": lambda name, value: value is None or _check_string(name, value),
+}
+
+
+def check_value(attribute, value, variation_class=Variation):
+    """
+    Raise ValueError if value can not be set to a Variation attribute.
+
+    Args:
+        attribute: The name of the Variation attribute.
+        value: The new value for the attribute.
+
+    Kwargs:
+        variation_class: The class of the product.
+    """
+    descriptor = getattr(variation_class, attribute, None)
+    if hasattr(descriptor, "validate"):
+        descriptor.validate(variation_class, value)
+    elif attribute in PROPERTY_VALIDATORS:
+        PROPERTY_VALIDATORS[attribute](attribute, value)
+    elif not isinstance(descriptor, property) or descriptor.fset is None:
+        raise ValueError("{} is not a writable attribute.".format(attribute))
+
+
+def find_invalid_changes(changes, variation_class=Variation):
+    """
+    Return a list of InvalidChange for each invalid change in changes.
+
+    Args:
+        changes: dict of products to dicts of attribute names and values.
+
+    Kwargs:
+        variation_class: The class of the products.
+    """
+    invalid_changes = []
+    for product, values in changes.items():
+        for attribute, value in values.items():
+            try:
+                check_value(attribute, value, variation_class=variation_class)
+            except ValueError as exception:
+                invalid_changes.append(
+                    InvalidChange(product, attribute, value, str(exception))
+                )
+    return invalid_changes
+
+
+def validate_changes(changes, variation_class=Variation):
+    """
+    Check that every change in changes is valid.
+
+    Args:
+        changes: dict of products to dicts of attribute names and values.
+
+    Kwargs:
+        variation_class: The class of the products.
+
+    Raises:
+        cc_products.exceptions.ValidationError listing every invalid change.
+    """
+    invalid_changes = find_invalid_changes(changes, variation_class=variation_class)
+    if invalid_changes:
+        raise exceptions.ValidationError(invalid_changes)
+
+
+def apply_changes(changes):
+    """
+    Validate changes to Variations, then set them if they are all valid.
+
+    Args:
+        changes: dict of cc_products.Variation to dicts of attribute names
+            and values.
+
+    Raises:
+        cc_products.exceptions.ValidationError if any change is invalid, in
+        which case no changes are sent.
+    """
+    validate_changes(changes)
+    for product, values in changes.items():
+        for attribute, value in values.items():
+            setattr(product, attribute, value)
@@ -4,86 +4,209 @@ Variation class.
 Wrapper for Cloud Commerce Products.
 """
 
-from ccapi import CCAPI, VatRates
-from ccapi.cc_objects import Factory
-
-from . import exceptions, optiondescriptors, productoptions
+import contextlib
+
+from . import (
+    batch,
+    cache,
+    exceptions,
+    metrics,
+    optiondescriptors,
+    productoptions,
+    vat,
+)
 from .baseproduct import BaseProduct
+from .client import get_client
+
+
+def get_factory_links(product_id, client=None):
+    """Return the Factory Links for a product, using the cache if possible."""
+    client = get_client(client)
+    return cache.factory_links.for_client(client).get_or_set(
+        product_id, lambda: client.get_product_factory_links(product_id)
+    )
+
+
+def get_factory(factory, client=None):
+    """
+    Return a Factory.
+
+    Args:
+        factory: The name of a Factory, or a ccapi Factory which is returned
+            unchanged.
+
+    Kwargs:
+        client: The Cloud Commerce API client to use.
+
+    Raises:
+        cc_products.exceptions.FactoryDoesNotExist if no Factory has the name.
+    """
+    from ccapi.cc_objects import Factory
+
+    if isinstance(factory, Factory):
+        return factory
+    factories = get_client(client).get_factories()
+    if factory not in factories.names:
+        raise exceptions.FactoryDoesNotExist(factory)
+    return factories.names[factory]
+
+
+class CCDataField:
+    """
+    Descriptor for attributes read from a product's Cloud Commerce data.
+
+    Values are looked up in the data when accessed rather than copied when the
+    product is loaded. Assigning to the attribute overrides the loaded value.
+
+    Args:
+        key: The key of the value in the Cloud Commerce data.
+
+    Kwargs:
+        convert: Callable applied to the value when it is read.
+        in_range_data: False if Product Range data does not contain a reliable
+            value for this field, in which case it reads as None for products
+            created from a range. Products can also mark fields as missing
+            from their data with load_from_cc_data, in which case the product
+            is reloaded when the field is read.
+    """
+
+    def __init__(self, key, convert=None, in_range_data=True):
+        """Set the data key for the field."""
+        self.key = key
+        self.convert = convert
+        self.in_range_data = in_range_data
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        try:
+            return instance._field_values[self.name]
+        except KeyError:
+            pass
+        if self.name in instance._load_on_access:
+            instance._reload()
+        if instance._from_range and not self.in_range_data:
+            return None
+        value = instance.raw[self.key]
+        if self.convert is not None:
+            value = self.convert(value)
+        return value
+
+    def __set__(self, instance, value):
+        instance._field_values[self.name] = value
 
 
 class VAT:
     """Descriptor for handeling product VAT rate."""
 
     def __get__(self, instance, owner):
+        if instance is None:
+            return self
         if instance._vat_rate_id is None:
             instance._reload()
-        return VatRates.get_vat_rate_by_id(int(instance._vat_rate_id))
+        return vat.vat_rates.get_rate(instance._vat_rate_id)
 
     def __set__(self, instance, value):
-        try:
-            vat_rate_id = VatRates.get_vat_rate_id_by_rate(value)
-        except KeyError:
-            raise Exception("{}% is not a valid VAT rate.".format(value))
-        CCAPI.set_product_vat_rate(product_ids=[instance.id], vat_rate=value)
+        self.validate(type(instance), value)
+        vat_rate_id = vat.vat_rates.get_id(value)
+        with instance._invalidate_on_error("_vat_rate_id"):
+            instance.client.set_product_vat_rate(
+                product_ids=[instance.id], vat_rate=value
+            )
         instance._vat_rate_id = vat_rate_id
 
+    def validate(self, owner, value):
+        """Raise ValueError if value is not a valid VAT rate."""
+        if not vat.vat_rates.is_valid(value):
+            raise ValueError("{}% is not a valid VAT rate.".format(value))
+
 
 class ProductScopeDescriptor:
-    """Base class for descriptors handeling product scope attributes."""
+    """
+    Base class for descriptors handeling product scope attributes.
+
+    Subclasses set instance_attr to the CCDataField holding the value and
+    scope_name to the name of the value for Variation.set_scope.
+    """
 
     def __get__(self, instance, owner):
+        if instance is None:
+            return self
         value = getattr(instance, self.instance_attr)
         if value is None:
             instance._reload()
         return getattr(instance, self.instance_attr)
 
     def __set__(self, instance, value):
-        setattr(instance, self.instance_attr, value)
-        CCAPI.set_product_scope(
-            product_id=instance.id,
-            weight=instance.weight,
-            height=instance.cloud_commerce_height,
-            length=instance.cloud_commerce_length,
-            width=instance.cloud_commerce_width,
-            large_letter_compatible=instance.large_letter_compatible,
-            external_id=instance.external_product_id,
-        )
+        instance.set_scope(**{self.scope_name: value})
+
+    def validate(self, owner, value):
+        """Raise ValueError if value is not a non negative integer."""
+        if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+            raise ValueError(
+                '"{}" is not a valid value for {}.'.format(
+                    value, self.instance_attr.strip("_")
+                )
+            )
 
 
 class WeightDescriptor(ProductScopeDescriptor):
     """Descriptor for product wieght."""
 
     instance_attr = "_weight"
+    scope_name = "weight"
 
 
 class LengthDescriptor(ProductScopeDescriptor):
     """Descriptor for product length."""
 
     instance_attr = "_length"
+    scope_name = "length"
 
 
 class WidthDescriptor(ProductScopeDescriptor):
     """Descriptor for product width."""
 
     instance_attr = "_width"
+    scope_name = "width"
 
 
 class HeightDescriptor(ProductScopeDescriptor):
     """Descriptor for product height."""
 
     instance_attr = "_height"
+    scope_name = "height"
 
 
 class LargeLetterCompatibleDescriptor(ProductScopeDescriptor):
     """Descriptor for product large letter compatibility."""
 
     instance_attr = "_large_letter_compatible"
+    scope_name = "large_letter_compatible"
+
+    def validate(self, owner, value):
+        """Raise ValueError if value is not a bool."""
+        if not isinstance(value, bool):
+            raise ValueError(
+                "large_letter_compatible must be True or False, not {!r}.".format(value)
+            )
 
 
 class ExternalProductIDDescriptor(ProductScopeDescriptor):
     """Descriptor for product external ID."""
 
     instance_attr = "_external_product_id"
+    scope_name = "external_product_id"
+
+    def validate(self, owner, value):
+        """Raise ValueError if value is not a string or None."""
+        if value is not None and not isinstance(value, str):
+            raise ValueError(
+                "external_product_id must be a string, not {!r}.".format(value)
+            )
 
 
 class Variation(BaseProduct):
@@ -103,9 +226,11 @@ class Variation(BaseProduct):
     BABY_GIRLS = "baby-girls"
     UNISEX_BABY = "unisex-baby"
 
+    REFRESH_PARTS = ("data", "stock", "options", "bays")
+
     department = optiondescriptors.OptionDescriptor("Department")
-    purchase_price = optiondescriptors.FloatOption("Purchase Price")
-    retail_price = optiondescriptors.FloatOption("Retail Price")
+    purchase_price = optiondescriptors.FloatOption("Purchase Price", minimum=0)
+    retail_price = optiondescriptors.FloatOption("Retail Price", minimum=0)
     supplier_sku = optiondescriptors.OptionDescriptor("Supplier SKU")
     brand = optiondescriptors.OptionDescriptor("Brand")
     manufacturer = optiondescriptors.OptionDescriptor("Manufacturer")
@@ -124,11 +249,11 @@ class Variation(BaseProduct):
     )
     amazon_bullets = optiondescriptors.ListOption("Amazon Bullets")
     amazon_search_terms = optiondescriptors.ListOption("Amazon Search Terms")
-    gender = optiondescriptors.OptionDescriptor("Gender")
+    gender = optiondescriptors.GenderOption()
     weight = WeightDescriptor()
-    length = optiondescriptors.IntegerOption("Length MM")
-    width = optiondescriptors.IntegerOption("Width MM")
-    height = optiondescriptors.IntegerOption("Height MM")
+    length = optiondescriptors.IntegerOption("Length MM", minimum=0)
+    width = optiondescriptors.IntegerOption("Width MM", minimum=0)
+    height = optiondescriptors.IntegerOption("Height MM", minimum=0)
     created_by = optiondescriptors.OptionDescriptor("Created By")
     vat_rate = VAT()
     weight = WeightDescriptor()
@@ -138,65 +263,350 @@ class Variation(BaseProduct):
     large_letter_compatible = LargeLetterCompatibleDescriptor()
     external_product_id = ExternalProductIDDescriptor()
 
-    def __init__(self, data, product_range=None):
-        """Initialise hidden attributes."""
+    id = CCDataField("ID")
+    full_name = CCDataField("FullName")
+    sku = CCDataField("ManufacturerSKU")
+    range_id = CCDataField("RangeID")
+    is_multipack = CCDataField("ProductType", convert=bool)
+    default_image_url = CCDataField("defaultImageUrl")
+    _external_product_id = CCDataField("ExternalProductId", in_range_data=False)
+    _name = CCDataField("Name")
+    _description = CCDataField("Description")
+    _barcode = CCDataField("Barcode")
+    _end_of_line = CCDataField("EndOfLine")
+    _stock_level = CCDataField("StockLevel")
+    _length = CCDataField("LengthMM", in_range_data=False)
+    _width = CCDataField("WidthMM", in_range_data=False)
+    _height = CCDataField("HeightMM", in_range_data=False)
+    _large_letter_compatible = CCDataField("LargeLetterCompatible", in_range_data=False)
+    _weight = CCDataField("WeightGM", in_range_data=False)
+    _handling_time = CCDataField("DeliveryLeadTimeDays")
+    _price = CCDataField("BasePrice", in_range_data=False)
+    _vat_rate_id = CCDataField("VatRateID", in_range_data=False)
+    _hs_code = CCDataField("HSCode")
+    _country_of_origin_id = CCDataField("CountryOfOriginId")
+
+    def __init__(self, data, product_range=None, from_range=False, client=None):
+        """
+        Initialise hidden attributes.
+
+        Args:
+            data: Cloud Commerce Product data.
+
+        Kwargs:
+            product_range: The cc_products.ProductRange to which the product
+                belongs.
+            from_range: True if data is taken from Cloud Commerce Product
+                Range data.
+            client: The Cloud Commerce API client to use. Defaults to the
+                client of product_range, if given.
+        """
+        if client is None and product_range is not None:
+            client = product_range.client
+        self.client = get_client(client)
         self._product_range = product_range
         self._options = None
         self._bays = None
-        self._price = None
         self._vat_rate = None
-        self._vat_rate_id = None
-        self.load_from_cc_data(data)
+        self.load_from_cc_data(data, from_range=from_range)
         if self._product_range is not None:
             self.range_id = self._product_range.id
 
     def __repr__(self):
         return self.full_name
 
-    def load_from_cc_data(self, data):
-        """Load initial data from Cloud Commerce Product data."""
+    @classmethod
+    def data_fields(cls):
+        """Return a dict of attribute names to their CCDataFields."""
+        if "_data_fields" not in cls.__dict__:
+            cls._data_fields = {
+                name: attr
+                for klass in reversed(cls.__mro__)
+                for name, attr in vars(klass).items()
+                if isinstance(attr, CCDataField)
+            }
+        return cls._data_fields
+
+    @classmethod
+    def scope_descriptors(cls):
+        """Return a dict of product scope names to their descriptors."""
+        if "_scope_descriptors" not in cls.__dict__:
+            cls._scope_descriptors = {
+                attr.scope_name: attr
+                for klass in reversed(cls.__mro__)
+                for attr in vars(klass).values()
+                if isinstance(attr, ProductScopeDescriptor)
+            }
+        return cls._scope_descriptors
+
+    @classmethod
+    def validate_scope(cls, name, value):
+        """Raise ValueError if value can not be set as the scope value name."""
+        descriptors = cls.scope_descriptors()
+        if name not in descriptors:
+            raise ValueError("{} is not a product scope value.".format(name))
+        descriptors[name].validate(cls, value)
+
+    @classmethod
+    def option_descriptors(cls):
+        """Return a dict of Product Option names to their descriptors."""
+        if "_option_descriptors" not in cls.__dict__:
+            cls._option_descriptors = {
+                attr.option_name: attr
+                for klass in reversed(cls.__mro__)
+                for attr in vars(klass).values()
+                if isinstance(attr, optiondescriptors.OptionDescriptor)
+            }
+        return cls._option_descriptors
+
+    def load_from_cc_data(self, data, from_range=False, load_on_access=()):
+        """
+        Load initial data from Cloud Commerce Product data.
+
+        The data is kept as self.raw and is neither copied nor modified.
+
+        Args:
+            data: Cloud Commerce Product data.
+
+        Kwargs:
+            from_range: True if data is taken from Cloud Commerce Product Range
+                data.
+            load_on_access: Names of the CCDataFields for which data does not
+                contain a value. The product is reloaded when any of them is
+                read.
+        """
+        self._field_values = {}
         self.raw = data
-        self.id = data["ID"]
-        self.full_name = data["FullName"]
-        self.sku = data["ManufacturerSKU"]
-        self.range_id = data["RangeID"]
-        self.is_multipack = bool(data["ProductType"])
-        self.default_image_url = data["defaultImageUrl"]
-        self._external_product_id = data["ExternalProductId"]
-        self._name = data["Name"]
-        self._description = data["Description"]
-        self._barcode = data["Barcode"]
-        self._end_of_line = data["EndOfLine"]
-        self._stock_level = data["StockLevel"]
-        self._length = data["LengthMM"]
-        self._width = data["WidthMM"]
-        self._height = data["HeightMM"]
-        self._large_letter_compatible = data["LargeLetterCompatible"]
-        self._weight = data["WeightGM"]
-        self._handling_time = data["DeliveryLeadTimeDays"]
-        self._price = data["BasePrice"]
-        self._vat_rate_id = data["VatRateID"]
-        self._hs_code = data["HSCode"]
-        self._country_of_origin_id = data["CountryOfOriginId"]
+        self._from_range = from_range
+        self._load_on_access = frozenset(load_on_access)
 
     @classmethod
     def create_from_range(cls, data, product_range):
-        """Load initial data from Cloud Commerce Product Range data."""
-        data["BasePrice"] = None
-        data["VatRateID"] = None
-        data["WeightGM"] = None
-        data["LengthMM"] = None
-        data["WidthMM"] = None
-        data["HeightMM"] = None
-        data["LargeLetterCompatible"] = None
-        data["ExternalProductId"] = None
-        return cls(data, product_range=product_range)
+        """
+        Load initial data from Cloud Commerce Product Range data.
+
+        Fields which are not reliably included in range data are loaded from
+        the product when they are first needed.
+        """
+        return cls(data, product_range=product_range, from_range=True)
+
+    @classmethod
+    def create_from_new_product(
+        cls, product_id, product_range, barcode, vat_rate, description=None
+    ):
+        """
+        Return a Variation for a newly created product without loading it.
+
+        Fields set from the values used to create the product are available
+        immediately. The product is loaded when any other field is read.
+
+        Args:
+            product_id: The ID of the new product.
+            product_range: The cc_products.ProductRange containing the product.
+            barcode: The barcode the product was created with.
+            vat_rate: The VAT rate the product was created with.
+
+        Kwargs:
+            description: The description the product was created with.
+        """
+        data = {
+            "ID": product_id,
+            "RangeID": product_range.id,
+            "Name": product_range.name,
+            "Barcode": barcode,
+            "ProductType": 0,
+            "EndOfLine": False,
+            "StockLevel": 0,
+            "VatRateID": vat.vat_rates.get_id(vat_rate),
+        }
+        if description is not None:
+            data["Description"] = description
+        product = cls(data, product_range=product_range)
+        product.load_from_cc_data(
+            data,
+            load_on_access=[
+                name
+                for name, field in vars(cls).items()
+                if isinstance(field, CCDataField) and field.key not in data
+            ],
+        )
+        return product
+
+    def invalidate(self, *fields):
+        """
+        Discard cached values so that they are loaded again when next read.
+
+        Args:
+            fields: The names of CCDataFields, such as "_price", or "options"
+                for the product's Product Options.
+        """
+        names = set(fields)
+        if "options" in names:
+            names.remove("options")
+            if self._options is not None:
+                self._options.invalidate()
+        for name in names:
+            self._field_values.pop(name, None)
+        self._load_on_access = self._load_on_access | names
+
+    def refresh(self, fields=None):
+        """
+        Reload parts of the product from Cloud Commerce.
+
+        Parts which are not reloaded keep their cached values.
+
+        Kwargs:
+            fields: The names of the parts to reload, from REFRESH_PARTS:
+                data: The product's fields.
+                stock: The stock level, and the cached pending stock level.
+                options: The product's Product Options.
+                bays: The product's Warehouse Bays.
+                If None the data and stock are reloaded. Bays are reloaded if
+                they have been loaded. Options are reloaded if they have
+                been loaded and the data changed.
+
+        Returns:
+            bool: True if the product's data changed.
+
+        Raises:
+            ValueError: If a part is not in REFRESH_PARTS.
+        """
+        if fields is None:
+            parts = {"data", "stock"}
+            if self._bays is not None:
+                parts.add("bays")
+        else:
+            parts = set(fields)
+            unknown = parts.difference(self.REFRESH_PARTS)
+            if unknown:
+                raise ValueError(
+                    "Can not refresh {}.".format(", ".join(sorted(unknown)))
+                )
+        changed = False
+        if parts & {"data", "stock"}:
+            with metrics.timed("reload"):
+                data = self.client.get_product(self.id).json
+            if "data" in parts:
+                changed = self._data_changed(data)
+                self.load_from_cc_data(data)
+            else:
+                self._stock_level = data["StockLevel"]
+        if "stock" in parts:
+            cache.pending_stock.for_client(self.client).invalidate(self.id)
+        if fields is None and changed and self._options_loaded():
+            parts.add("options")
+        calls = []
+        if "options" in parts:
+            calls.append(self._refetch_options)
+        if "bays" in parts:
+            calls.append(self._refetch_bays)
+        batch.run_concurrently(*calls)
+        return changed
+
+    def _data_changed(self, data, from_range=False):
+        """
+        Return True if data has a different value for any field with a known value.
+
+        Kwargs:
+            from_range: True if data is taken from Product Range data, in
+                which case fields not reliably included in it are ignored.
+        """
+        for name, field in self.data_fields().items():
+            if field.key not in data or (from_range and not field.in_range_data):
+                continue
+            if name in self._field_values:
+                value = data[field.key]
+                if field.convert is not None:
+                    value = field.convert(value)
+                if self._field_values[name] != value:
+                    return True
+            elif field.key in self.raw and name not in self._load_on_access:
+                if field.in_range_data or not self._from_range:
+                    if self.raw[field.key] != data[field.key]:
+                        return True
+        return False
+
+    def _options_loaded(self):
+        return self._options is not None and self._options.is_loaded
+
+    def _refetch_options(self):
+        self.options.invalidate()
+        self.options.options
+
+    def _refetch_bays(self):
+        self._bays = None
+        self.bays
+
+    @contextlib.contextmanager
+    def _invalidate_on_error(self, *fields):
+        """
+        Invalidate fields if a write raises.
+
+        A failed request may still have been applied, so the cached values
+        can not be trusted either way.
+        """
+        try:
+            yield
+        except Exception:
+            self.invalidate(*fields)
+            raise
+
+    def set_scope(self, **values):
+        """
+        Set any of the product's scope values with one request.
+
+        Cloud Commerce updates every scope value at once, so values not given
+        are sent unchanged. If any of them is not in the data the product was
+        loaded from, the product is reloaded once.
+
+        Kwargs:
+            weight: The weight of the product in grams.
+            length: The length of the product in millimetres, as
+                cloud_commerce_length.
+            width: The width of the product in millimetres, as
+                cloud_commerce_width.
+            height: The height of the product in millimetres, as
+                cloud_commerce_height.
+            large_letter_compatible: True if the product fits a large letter.
+            external_product_id: The external ID of the product.
+
+        Raises:
+            ValueError if a keyword is not a scope value or a value is not
+            valid.
+        """
+        descriptors = self.scope_descriptors()
+        for name, value in values.items():
+            self.validate_scope(name, value)
+        if self._from_range and any(
+            name not in values and descriptor.instance_attr not in self._field_values
+            for name, descriptor in descriptors.items()
+        ):
+            self._reload()
+        scope = {
+            name: getattr(self, descriptor.instance_attr)
+            for name, descriptor in descriptors.items()
+        }
+        scope.update(values)
+        with metrics.timed("scope_write"), self._invalidate_on_error(
+            *(descriptors[name].instance_attr for name in values)
+        ):
+            self.client.set_product_scope(
+                product_id=self.id,
+                weight=scope["weight"],
+                height=scope["height"],
+                length=scope["length"],
+                width=scope["width"],
+                large_letter_compatible=scope["large_letter_compatible"],
+                external_id=scope["external_product_id"],
+            )
+        for name, value in values.items():
+            setattr(self, descriptors[name].instance_attr, value)
 
     @property
     def bays(self):
         """Return a list of IDs for Bays in which this product is located."""
         if self._bays is None:
-            self._bays = [b.id for b in CCAPI.get_bays_for_product(self.id)]
+            self._bays = [b.id for b in self.client.get_bays_for_product(self.id)]
         return self._bays
 
     @bays.setter
@@ -212,9 +622,9 @@ class Variation(BaseProduct):
         bays_to_remove = [b for b in old_bays if b not in new_bays]
         bays_to_add = [b for b in new_bays if b not in old_bays]
         for bay in bays_to_remove:
-            CCAPI.remove_warehouse_bay_from_product(self.id, bay)
+            self.client.remove_warehouse_bay_from_product(self.id, bay)
         for bay in bays_to_add:
-            CCAPI.add_warehouse_bay_to_product(self.id, bay)
+            self.client.add_warehouse_bay_to_product(self.id, bay)
         self._bays = None
 
     @property
@@ -229,7 +639,7 @@ class Variation(BaseProduct):
         if self._hs_code is None:
             self._reload()
         hs_code = f"{int(hs_code):<010d}"
-        CCAPI.set_hs_code(product_IDs=[self.id], HS_code=hs_code)
+        self.client.set_hs_code(product_IDs=[self.id], HS_code=hs_code)
 
     @property
     def country_of_origin(self):
@@ -240,7 +650,8 @@ class Variation(BaseProduct):
 
     @country_of_origin.setter
     def country_of_origin(self, country_id):
-        CCAPI.set_country_of_origin(product_id=self.id, country_id=country_id)
+        with self._invalidate_on_error("_country_of_origin_id"):
+            self.client.set_country_of_origin(product_id=self.id, country_id=country_id)
         self._country_of_origin_id = country_id
 
     @property
@@ -251,13 +662,13 @@ class Variation(BaseProduct):
     @barcode.setter
     def barcode(self, barcode):
         """Set the barcode for the product."""
-        CCAPI.set_product_barcode(product_id=self.id, barcode=barcode)
+        self.client.set_product_barcode(product_id=self.id, barcode=barcode)
 
     @property
     def description(self):
         """Return the description of the product."""
         if self._description is None:
-            self._description = CCAPI.get_product(self.id).description
+            self._description = self.client.get_product(self.id).description
         return self._description
 
     @description.setter
@@ -265,7 +676,10 @@ class Variation(BaseProduct):
         """Set the description of the product."""
         if value is None or value == "":
             value = self.name
-        CCAPI.set_product_description(product_ids=[self.id], description=value)
+        with self._invalidate_on_error("_description"):
+            self.client.set_product_description(
+                product_ids=[self.id], description=value
+            )
         self._description = value
 
     @property
@@ -276,7 +690,10 @@ class Variation(BaseProduct):
     @handling_time.setter
     def handling_time(self, handling_time):
         """Set the handling time for the product."""
-        CCAPI.set_product_handling_time(product_id=self.id, handling_time=handling_time)
+        with self._invalidate_on_error("_handling_time"):
+            self.client.set_product_handling_time(
+                product_id=self.id, handling_time=handling_time
+            )
         self._handling_time = handling_time
 
     @property
@@ -287,7 +704,8 @@ class Variation(BaseProduct):
     @name.setter
     def name(self, name):
         """Set the product's name."""
-        CCAPI.set_product_name(name=name, product_ids=[self.id])
+        with self._invalidate_on_error("_name", "full_name"):
+            self.client.set_product_name(name=name, product_ids=[self.id])
         self._name = name
         self.full_name = None
 
@@ -295,7 +713,7 @@ class Variation(BaseProduct):
     def options(self):
         """Return the Product Options of the product."""
         if self._options is None:
-            self._options = productoptions.VariationOptions(self, self.product_range)
+            self._options = productoptions.VariationOptions(self, self._product_range)
         return self._options
 
     @property
@@ -308,7 +726,8 @@ class Variation(BaseProduct):
     @price.setter
     def price(self, price):
         """Set the base price for the product."""
-        CCAPI.set_product_base_price(product_id=self.id, price=price)
+        with self._invalidate_on_error("_price"):
+            self.client.set_product_base_price(product_id=self.id, price=price)
         self._price = price
 
     @property
@@ -317,7 +736,7 @@ class Variation(BaseProduct):
         if self._product_range is None:
             from .functions import get_range
 
-            self._product_range = get_range(self.range_id)
+            self._product_range = get_range(self.range_id, client=self.client)
         return self._product_range
 
     @property
@@ -328,16 +747,27 @@ class Variation(BaseProduct):
     @stock_level.setter
     def stock_level(self, new_stock_level):
         """Update the stock level of the product."""
-        CCAPI.update_product_stock_level(
-            product_id=self.id,
-            new_stock_level=new_stock_level,
-            old_stock_level=self._stock_level,
-        )
+        with self._invalidate_on_error("_stock_level"):
+            self.client.update_product_stock_level(
+                product_id=self.id,
+                new_stock_level=new_stock_level,
+                old_stock_level=self._stock_level,
+            )
         self._stock_level = new_stock_level
 
-    def get_pending_stock(self):
-        """Return the pending stock level of the product."""
-        return CCAPI.get_pending_stock(self.id)
+    def get_pending_stock(self, use_cache=False):
+        """
+        Return the pending stock level of the product.
+
+        Kwargs:
+            use_cache: If True a pending stock level loaded in the last
+                30 seconds may be returned.
+        """
+        if not use_cache:
+            return self.client.get_pending_stock(self.id)
+        return cache.pending_stock.for_client(self.client).get_or_set(
+            self.id, lambda: self.client.get_pending_stock(self.id)
+        )
 
     @property
     def supplier(self):
@@ -369,32 +799,34 @@ class Variation(BaseProduct):
         named factory_name.
 
         Set Product Option Supplier to factory name.
+
+        Args:
+            factory_name: The name of a Factory, or a ccapi Factory.
         """
-        if not isinstance(factory_name, Factory):
-            factories = CCAPI.get_factories()
-            if factory_name in factories.names:
-                factory = factories.names[factory_name]
-            else:
-                raise exceptions.FactoryDoesNotExist(factory_name)
+        factory = get_factory(factory_name, client=self.client)
         self._update_product_factory_link(factory.id)
         self.options["Supplier"] = factory.name
 
     def _reload(self):
-        self.load_from_cc_data(CCAPI.get_product(self.id).json)
+        with metrics.timed("reload"):
+            self.load_from_cc_data(self.client.get_product(self.id).json)
 
     def _get_factory_links(self):
-        return CCAPI.get_product_factory_links(self.id)
+        return get_factory_links(self.id, client=self.client)
 
     def _update_product_factory_link(
         self, factory_id, dropship=False, supplier_sku="", price=0
     ):
-        factory_links = self._get_factory_links()
+        factory_links = self.client.get_product_factory_links(self.id)
         for link in factory_links:
             link.delete()
-        return CCAPI.update_product_factory_link(
-            product_id=self.id,
-            factory_id=factory_id,
-            dropship=dropship,
-            supplier_sku=supplier_sku or self.supplier_sku,
-            price=price,
-        )
+        try:
+            return self.client.update_product_factory_link(
+                product_id=self.id,
+                factory_id=factory_id,
+                dropship=dropship,
+                supplier_sku=supplier_sku or self.supplier_sku,
+                price=price,
+            )
+        finally:
+            cache.factory_links.for_client(self.client).invalidate(self.id)
@@ -0,0 +1,75 @@
+"""
+Process wide table of VAT rates and their Cloud Commerce IDs.
+
+Lookups in either direction are answered from dicts once a rate has been
+resolved, so ccapi.VatRates is consulted at most once for each ID or rate.
+
+    >>> vat_rates.get_rate(5)
+    20
+    >>> vat_rates.get_id(20)
+    5
+"""
+
+import threading
+
+
+class VatRateTable:
+    """Bidirectional mapping between VAT rate IDs and VAT rates."""
+
+    def __init__(self):
+        """Create an empty table."""
+        self._rates = {}
+        self._ids = {}
+        self._lock = threading.Lock()
+
+    def get_rate(self, vat_rate_id):
+        """Return the VAT rate with the ID vat_rate_id."""
+        vat_rate_id = int(vat_rate_id)
+        try:
+            return self._rates[vat_rate_id]
+        except KeyError:
+            pass
+        from ccapi import VatRates
+
+        rate = VatRates.get_vat_rate_by_id(vat_rate_id)
+        self._add(vat_rate_id, rate)
+        return rate
+
+    def get_id(self, rate):
+        """
+        Return the ID of a VAT rate.
+
+        Raises:
+            KeyError if rate is not a valid VAT rate.
+        """
+        try:
+            return self._ids[rate]
+        except (KeyError, TypeError):
+            pass
+        from ccapi import VatRates
+
+        vat_rate_id = VatRates.get_vat_rate_id_by_rate(rate)
+        self._add(vat_rate_id, rate)
+        return vat_rate_id
+
+    def is_valid(self, rate):
+        """Return True if rate is a valid VAT rate."""
+        try:
+            self.get_id(rate)
+        except KeyError:
+            return False
+        return True
+
+    def clear(self):
+        """Remove every resolved rate from the table."""
+        with self._lock:
+            self._rates.clear()
+            self._ids.clear()
+
+    def _add(self, vat_rate_id, rate):
+        with self._lock:
+            self._rates[int(vat_rate_id)] = rate
+            self._ids[rate] = vat_rate_id
+
+
+vat_rates = VatRateTable()
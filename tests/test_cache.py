@@ -0,0 +1,91 @@
+import gc
+from unittest.mock import Mock, patch
+
+import pytest
+
+from cc_products.cache import Cache, ClientCaches
+
+
+@pytest.fixture
+def cache():
+    return Cache()
+
+
+def test_get_returns_default_for_missing_key(cache):
+    assert cache.get("key", "default") == "default"
+
+
+def test_set_and_get(cache):
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+    assert "key" in cache
+
+
+def test_get_or_set_only_calls_function_once(cache):
+    function = Mock(return_value="value")
+    assert cache.get_or_set("key", function) == "value"
+    assert cache.get_or_set("key", function) == "value"
+    function.assert_called_once_with()
+
+
+def test_invalidate_key(cache):
+    cache.set("key", "value")
+    cache.set("other", "value")
+    cache.invalidate("key")
+    assert "key" not in cache
+    assert "other" in cache
+
+
+def test_invalidate_all(cache):
+    cache.set("key", "value")
+    cache.set("other", "value")
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+def test_values_expire_after_ttl():
+    cache = Cache(ttl=30)
+    with patch("cc_products.cache.time.monotonic", return_value=100):
+        cache.set("key", "value")
+    with patch("cc_products.cache.time.monotonic", return_value=129):
+        assert cache.get("key") == "value"
+    with patch("cc_products.cache.time.monotonic", return_value=131):
+        assert cache.get("key") is None
+
+
+def test_set_removes_expired_values():
+    cache = Cache(ttl=30)
+    with patch("cc_products.cache.time.monotonic", return_value=100):
+        cache.set("key", "value")
+    with patch("cc_products.cache.time.monotonic", return_value=131):
+        cache.set("other", "value")
+    assert len(cache) == 1
+
+
+def test_client_caches_are_separate():
+    caches = ClientCaches()
+    client, other_client = Mock(), Mock()
+    caches.for_client(client).set("key", "value")
+    assert caches.for_client(client).get("key") == "value"
+    assert caches.for_client(other_client).get("key") is None
+
+
+def test_client_caches_invalidate_every_client():
+    caches = ClientCaches()
+    client, other_client = Mock(), Mock()
+    caches.for_client(client).set("key", "value")
+    caches.for_client(other_client).set("key", "value")
+    caches.invalidate("key")
+    assert "key" not in caches.for_client(client)
+    assert "key" not in caches.for_client(other_client)
+
+
+def test_client_caches_stats_outlive_clients():
+    caches = ClientCaches()
+    client = Mock()
+    caches.for_client(client).set("key", "value")
+    caches.for_client(client).get("key")
+    caches.for_client(client).get("missing")
+    del client
+    gc.collect()
+    assert caches.stats() == (1, 1)
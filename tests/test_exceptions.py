@@ -1,3 +1,5 @@
+from unittest.mock import Mock
+
 import pytest
 
 from cc_products import exceptions
@@ -39,3 +41,22 @@ def test_MixedDepartmentsError():
     with pytest.raises(exceptions.DepartmentError) as execinfo:
         raise exceptions.MixedDepartmentsError(product_range)
     assert str(execinfo.value) == "test product has mixed departments."
+
+
+def test_OptionValueNotRecognised_exception():
+    with pytest.raises(ValueError) as execinfo:
+        raise exceptions.OptionValueNotRecognised("test value")
+    assert str(execinfo.value) == 'Product Option value "test value" not recognised.'
+
+
+def test_ValidationError_exception():
+    invalid_changes = [
+        Mock(product="ABC", attribute="retail_price", message="Bad price."),
+        Mock(product="DEF", attribute="gender", message="Bad gender."),
+    ]
+    with pytest.raises(ValueError) as execinfo:
+        raise exceptions.ValidationError(invalid_changes)
+    assert execinfo.value.invalid_changes == invalid_changes
+    assert str(execinfo.value) == (
+        "2 invalid changes: ABC.retail_price: Bad price.; DEF.gender: Bad gender."
+    )
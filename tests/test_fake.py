@@ -0,0 +1,345 @@
+from unittest.mock import Mock
+
+import pytest
+
+from cc_products import (
+    create_range,
+    create_range_from_template,
+    exceptions,
+    get_product,
+    get_range,
+    prefetch_factory_links,
+    reassign_supplier,
+)
+from cc_products.fake import FakeCCAPI, FakeCCAPIError
+
+
+@pytest.fixture
+def client():
+    client = FakeCCAPI()
+    for name in ("Colour", "Size", "Discontinued"):
+        client.add_option(name)
+    return client
+
+
+@pytest.fixture
+def product_range(client):
+    product_range = create_range("Test Range", client=client)
+    for barcode in ("1234", "5678"):
+        product_range.add_product(
+            barcode=barcode, description="Test Description", vat_rate=20
+        )
+    return get_range(product_range.id, client=client)
+
+
+def test_create_range(product_range):
+    assert product_range.name == "Test Range"
+    assert [p.barcode for p in product_range] == ["1234", "5678"]
+
+
+def test_products_use_range_client(client, product_range):
+    for product in product_range:
+        assert product.client is client
+
+
+def test_get_product(client, product_range):
+    product = get_product(product_range.products[0].id, client=client)
+    assert product.barcode == "1234"
+    assert product.client is client
+
+
+def test_set_variation_option(client, product_range):
+    product = product_range.products[0]
+    product.options["Colour"] = "Red"
+    reloaded = get_product(product.id, client=client)
+    assert reloaded.options["Colour"] == "Red"
+    assert product_range.options["Colour"].selected is True
+
+
+def test_end_of_line(client, product_range):
+    product_range.end_of_line = True
+    reloaded = get_range(product_range.id, client=client)
+    assert reloaded.end_of_line is True
+    assert all(product.discontinued for product in reloaded)
+
+
+def test_rename_range(client, product_range):
+    product_range.name = "New Name"
+    reloaded = get_range(product_range.id, client=client)
+    assert reloaded.name == "New Name"
+    assert all(product.name == "New Name" for product in reloaded)
+
+
+def test_stock_level(client, product_range):
+    product = product_range.products[0]
+    product.stock_level = 5
+    assert get_product(product.id, client=client).stock_level == 5
+
+
+def test_stock_level_conflict(client, product_range):
+    product = product_range.products[0]
+    product._stock_level = 3
+    with pytest.raises(FakeCCAPIError):
+        product.stock_level = 5
+
+
+@pytest.fixture
+def template():
+    return {
+        "name": "Template Range",
+        "options": {"Discontinued": "Not Discontinued"},
+        "variable": ["Colour", "Size"],
+        "products": [
+            {
+                "barcode": str(barcode),
+                "description": "Template Description",
+                "vat_rate": 20,
+                "options": {"Colour": colour, "Size": size},
+            }
+            for barcode, (colour, size) in enumerate(
+                [("Red", "S"), ("Red", "M"), ("Blue", "S"), ("Blue", "M")]
+            )
+        ],
+    }
+
+
+def test_create_range_from_template(client, template):
+    product_range = create_range_from_template(template, client=client)
+    reloaded = get_range(product_range.id, client=client)
+    assert reloaded.name == "Template Range"
+    assert [p.id for p in reloaded] == [p.id for p in product_range]
+    assert [(p.colour, p.size, p.discontinued) for p in reloaded] == [
+        ("Red", "S", False),
+        ("Red", "M", False),
+        ("Blue", "S", False),
+        ("Blue", "M", False),
+    ]
+    assert [o.name for o in reloaded.variable_options] == ["Colour", "Size"]
+
+
+def test_create_range_from_template_does_not_reload_products(client, template):
+    client.get_product = Mock(side_effect=AssertionError)
+    product_range = create_range_from_template(template, client=client)
+    assert [p.barcode for p in product_range] == ["0", "1", "2", "3"]
+
+
+def test_new_products_load_fields_not_used_to_create_them(client, template):
+    product_range = create_range_from_template(template, client=client)
+    product = product_range.products[0]
+    client.get_product = Mock(wraps=client.get_product)
+    assert product.vat_rate == 20
+    assert product.barcode == "0"
+    client.get_product.assert_not_called()
+    assert product.sku == "SKU-{}".format(product.id)
+    assert product.handling_time == 1
+    assert product.default_image_url == ""
+    client.get_product.assert_called_once_with(product.id)
+
+
+def test_create_range_from_template_reports_progress(client, template):
+    progress = Mock()
+    create_range_from_template(template, client=client, progress=progress)
+    total = progress.call_args.args[1]
+    assert progress.call_count == total
+    assert progress.call_args.args[0] == total
+
+
+def test_clone(client, template):
+    product_range = create_range_from_template(template, client=client)
+    clone = product_range.clone("Cloned Range", barcodes=["10", "11", "12", "13"])
+    reloaded = get_range(clone.id, client=client)
+    assert reloaded.name == "Cloned Range"
+    assert [(p.barcode, p.colour, p.size) for p in reloaded] == [
+        ("10", "Red", "S"),
+        ("11", "Red", "M"),
+        ("12", "Blue", "S"),
+        ("13", "Blue", "M"),
+    ]
+    assert [o.name for o in reloaded.variable_options] == ["Colour", "Size"]
+
+
+@pytest.fixture
+def factories(client):
+    client.add_option("Supplier")
+    return client.add_factory("Old Factory"), client.add_factory("New Factory")
+
+
+def test_set_supplier(client, product_range, factories):
+    product = product_range.products[0]
+    product.supplier = "Old Factory"
+    assert product.supplier.factory_name == "Old Factory"
+    product.supplier = "New Factory"
+    assert product.supplier.factory_name == "New Factory"
+    assert get_product(product.id, client=client).options["Supplier"] == "New Factory"
+
+
+def test_supplier_reads_are_cached(client, product_range, factories):
+    product = product_range.products[0]
+    client.get_product_factory_links = Mock(wraps=client.get_product_factory_links)
+    product.supplier
+    product.supplier
+    client.get_product_factory_links.assert_called_once_with(product.id)
+
+
+def test_reassign_supplier(client, product_range, factories):
+    product_ids = [product.id for product in product_range]
+    for product_id in product_ids:
+        client.update_product_factory_link(
+            product_id=product_id, factory_id=factories[0].id, supplier_sku="SUP1"
+        )
+    client.set_product_option_value = Mock(wraps=client.set_product_option_value)
+    links = reassign_supplier(product_ids, "New Factory", client=client)
+    assert list(links) == product_ids
+    client.set_product_option_value.assert_called_once()
+    for product_id in product_ids:
+        product = get_product(product_id, client=client)
+        assert product.supplier.factory_name == "New Factory"
+        assert product.supplier.supplier_sku == "SUP1"
+        assert product.options["Supplier"] == "New Factory"
+    reloaded = get_range(product_range.id, client=client)
+    assert "Supplier" in reloaded.options.selected_names
+
+
+def test_reassign_supplier_accepts_a_generator(client, product_range, factories):
+    product_ids = [product.id for product in product_range]
+    links = reassign_supplier(
+        (product_id for product_id in product_ids), "New Factory", client=client
+    )
+    assert list(links) == product_ids
+
+
+def test_reassign_supplier_keeps_links_if_relinking_fails(
+    client, product_range, factories
+):
+    product_id = product_range.products[0].id
+    client.update_product_factory_link(
+        product_id=product_id, factory_id=factories[0].id, supplier_sku="SUP1"
+    )
+    client.update_product_factory_link = Mock(side_effect=FakeCCAPIError)
+    with pytest.raises(FakeCCAPIError):
+        reassign_supplier([product_id], "New Factory", client=client)
+    assert client.get_product_factory_links(product_id)[0].supplier_sku == "SUP1"
+
+
+def test_reassign_supplier_without_supplier_option(client, product_range):
+    client.add_factory("New Factory")
+    with pytest.raises(exceptions.ProductOptionDoesNotExist):
+        reassign_supplier(product_range.products, "New Factory", client=client)
+
+
+def test_reassign_supplier_updates_loaded_products(client, product_range, factories):
+    for product in product_range:
+        product.options
+    reassign_supplier(product_range.products, "New Factory", client=client)
+    assert [p.options["Supplier"] for p in product_range] == ["New Factory"] * 2
+    assert product_range.options["Supplier"].selected
+
+
+def test_prefetch_factory_links(client, product_range, factories):
+    product_ids = [product.id for product in product_range]
+    prefetch_factory_links(product_ids, client=client)
+    client.get_product_factory_links = Mock(side_effect=AssertionError)
+    assert [product.supplier for product in product_range] == [None, None]
+
+
+def test_vat_rates_loads_each_product_once(client, product_range):
+    client.get_product = Mock(wraps=client.get_product)
+    assert product_range.vat_rates() == {p.sku: 20 for p in product_range}
+    assert product_range.vat_rates() == {p.sku: 20 for p in product_range}
+    assert client.get_product.call_count == len(product_range.products)
+
+
+def test_set_scopes(client, product_range):
+    products = product_range.products
+    client.get_product = Mock(wraps=client.get_product)
+    client.set_product_scope = Mock(wraps=client.set_product_scope)
+    product_range.set_scopes(
+        {
+            products[0].id: {"weight": 100, "length": 20},
+            products[1].id: {"large_letter_compatible": True},
+        }
+    )
+    assert client.get_product.call_count == 2
+    assert client.set_product_scope.call_count == 2
+    reloaded = get_product(products[0].id, client=client)
+    assert (reloaded.weight, reloaded.cloud_commerce_length) == (100, 20)
+    assert get_product(products[1].id, client=client).large_letter_compatible
+
+
+def test_set_scopes_validates_every_value_first(client, product_range):
+    products = product_range.products
+    client.set_product_scope = Mock()
+    with pytest.raises(exceptions.ValidationError) as error:
+        product_range.set_scopes(
+            {products[0].id: {"weight": -1}, products[1].id: {"height": "tall"}}
+        )
+    assert len(error.value.invalid_changes) == 2
+    client.set_product_scope.assert_not_called()
+
+
+def test_range_refresh_merges_changed_products(client, product_range):
+    first, second = product_range.products
+    first.options["Colour"] = "Red"
+    second.options["Colour"] = "Blue"
+    client.products[first.id]["StockLevel"] = 7
+    client.product_options[first.id] = {}
+    client.product_options[second.id] = {}
+    client.get_options_for_product = Mock(wraps=client.get_options_for_product)
+    result = product_range.refresh()
+    assert result.changed == [first]
+    assert product_range.products == [first, second]
+    assert first.stock_level == 7
+    client.get_options_for_product.assert_called_once_with(first.id)
+    assert first.options["Colour"] is None
+    assert second.options["Colour"] == "Blue"
+
+
+def test_range_refresh_adds_and_removes_products(client, product_range):
+    first, second = product_range.products
+    new_id = client.create_product(
+        range_id=product_range.id, name="Test Range", barcode="9999"
+    )
+    client.ranges[product_range.id]["ProductIDs"].remove(second.id)
+    result = product_range.refresh(parts=["products"])
+    assert [p.id for p in result.added] == [new_id]
+    assert result.removed == [second]
+    assert [p.barcode for p in product_range] == ["1234", "9999"]
+    assert product_range.products[0] is first
+
+
+def test_range_refresh_header_only(client, product_range):
+    products = product_range.products
+    client.ranges[product_range.id]["Name"] = "New Name"
+    client.products[products[0].id]["StockLevel"] = 7
+    product_range.refresh(parts=["header"])
+    assert product_range.name == "New Name"
+    assert product_range.products is products
+    assert products[0].stock_level == 0
+
+
+def test_variation_refresh_reloads_requested_fields(client, product_range):
+    product = product_range.products[0]
+    product.bays
+    client.products[product.id]["StockLevel"] = 3
+    client.bays[product.id] = ["10"]
+    client.get_bays_for_product = Mock(wraps=client.get_bays_for_product)
+    assert product.refresh(fields=["stock"]) is False
+    assert product.stock_level == 3
+    client.get_bays_for_product.assert_not_called()
+    product.refresh(fields=["bays"])
+    assert product.bays == ["10"]
+
+
+def test_variation_refresh_detects_changes(client, product_range):
+    product = product_range.products[0]
+    assert product.refresh() is False
+    client.products[product.id]["Name"] = "New Name"
+    assert product.refresh() is True
+    assert product.name == "New Name"
+
+
+def test_refresh_rejects_unknown_parts(product_range):
+    with pytest.raises(ValueError):
+        product_range.refresh(parts=["prices"])
+    with pytest.raises(ValueError):
+        product_range.products[0].refresh(fields=["prices"])
@@ -0,0 +1,174 @@
+import json
+from unittest.mock import Mock
+
+import pytest
+
+from cc_products import get_range
+from cc_products.fake import FakeCCAPI
+from cc_products.journal import Journal, JournalingClient, pending_entries, resume
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "job.journal")
+
+
+@pytest.fixture
+def client():
+    client = FakeCCAPI()
+    client.add_option("Colour")
+    return client
+
+
+@pytest.fixture
+def product_range(client):
+    range_id = client.create_range("Test Range")
+    for barcode in ("1", "2", "3"):
+        client.create_product(range_id=range_id, name="Test Range", barcode=barcode)
+    return get_range(range_id, client=client)
+
+
+def test_writes_are_journaled_and_completed(client, product_range, path):
+    journaling_client = JournalingClient(client, path)
+    product_range.products[0].client = journaling_client
+    product_range.products[0].handling_time = 3
+    journaling_client.journal.close()
+    with open(path) as journal_file:
+        lines = [json.loads(line) for line in journal_file]
+    assert lines[0]["endpoint"] == "set_product_handling_time"
+    assert lines[1] == {"complete": lines[0]["id"]}
+    assert pending_entries(path) == []
+
+
+def test_reads_are_not_journaled(client, product_range, path):
+    journaling_client = JournalingClient(client, path)
+    get_range(product_range.id, client=journaling_client)
+    journaling_client.journal.close()
+    assert open(path).read() == ""
+
+
+def test_failed_writes_are_left_pending(path):
+    mock_client = Mock()
+    mock_client.set_product_base_price.side_effect = Exception("Throttled")
+    journaling_client = JournalingClient(mock_client, path)
+    with pytest.raises(Exception):
+        journaling_client.set_product_base_price(product_id="1", price=5)
+    journaling_client.journal.close()
+    assert [e["kwargs"] for e in pending_entries(path)] == [
+        {"product_id": "1", "price": 5}
+    ]
+
+
+def test_incomplete_last_line_is_ignored(path):
+    with Journal(path) as journal:
+        journal.record("set_product_base_price", kwargs={"product_id": "1"})
+    with open(path, "a") as journal_file:
+        journal_file.write('{"complete": "')
+    assert len(pending_entries(path)) == 1
+
+
+def test_resume_skips_completed_writes(client, product_range, path):
+    product_ids = [p.id for p in product_range]
+    with Journal(path) as journal:
+        done = journal.record(
+            "set_product_base_price", kwargs={"product_id": product_ids[0], "price": 1}
+        )
+        journal.complete(done)
+        journal.record(
+            "set_product_base_price", kwargs={"product_id": product_ids[1], "price": 2}
+        )
+    client.set_product_base_price = Mock(wraps=client.set_product_base_price)
+    report = resume(path, client=client)
+    client.set_product_base_price.assert_called_once_with(
+        product_id=product_ids[1], price=2
+    )
+    assert report.requests == 1
+    assert pending_entries(path) == []
+    assert resume(path, client=client).requests == 0
+
+
+def test_resume_batches_writes_to_many_products(client, product_range, path):
+    product_ids = [p.id for p in product_range]
+    with Journal(path) as journal:
+        for product_id in product_ids:
+            journal.record(
+                "set_product_name", kwargs={"product_ids": [product_id], "name": "New"}
+            )
+    client.set_product_name = Mock(wraps=client.set_product_name)
+    report = resume(path, client=client)
+    client.set_product_name.assert_called_once_with(product_ids=product_ids, name="New")
+    assert len(report.replayed) == 3
+    assert [client.get_product(p).json["Name"] for p in product_ids] == ["New"] * 3
+
+
+def test_resume_skips_overwritten_writes(path):
+    mock_client = Mock()
+    with Journal(path) as journal:
+        first = journal.record(
+            "set_product_option_value",
+            kwargs={"product_ids": ["1", "2"], "option_id": 1, "option_value_id": 10},
+        )
+        second = journal.record(
+            "set_product_option_value",
+            kwargs={"product_ids": ["1", "2"], "option_id": 1, "option_value_id": 11},
+        )
+    report = resume(path, client=mock_client)
+    mock_client.set_product_option_value.assert_called_once_with(
+        product_ids=["1", "2"], option_id=1, option_value_id=11
+    )
+    assert report.superseded == [first]
+    assert report.replayed == [second]
+    assert pending_entries(path) == []
+
+
+def test_resume_sends_writes_to_one_product_in_order(path):
+    prices = []
+    mock_client = Mock()
+    mock_client.set_product_base_price.side_effect = lambda **kwargs: prices.append(
+        kwargs["price"]
+    )
+    with Journal(path) as journal:
+        for price in range(5):
+            journal.record(
+                "set_product_base_price", kwargs={"product_id": "1", "price": price}
+            )
+    resume(path, client=mock_client)
+    assert prices == [0, 1, 2, 3, 4]
+
+
+def test_resume_sends_writes_to_one_range_in_order(path):
+    calls = []
+    mock_client = Mock()
+    for endpoint in (
+        "add_option_to_product",
+        "set_range_option_drop_down",
+        "remove_option_from_product",
+    ):
+        getattr(mock_client, endpoint).side_effect = (
+            lambda endpoint=endpoint, **kwargs: calls.append(endpoint)
+        )
+    endpoints = [
+        "add_option_to_product",
+        "set_range_option_drop_down",
+        "remove_option_from_product",
+        "add_option_to_product",
+        "set_range_option_drop_down",
+    ]
+    with Journal(path) as journal:
+        for option_id, endpoint in enumerate(endpoints):
+            journal.record(endpoint, kwargs={"range_id": "1", "option_id": option_id})
+    resume(path, client=mock_client)
+    assert calls == endpoints
+
+
+def test_resume_reports_failures(path):
+    error = Exception("Throttled")
+    mock_client = Mock()
+    mock_client.set_product_base_price.side_effect = error
+    with Journal(path) as journal:
+        entry_id = journal.record(
+            "set_product_base_price", kwargs={"product_id": "1", "price": 1}
+        )
+    report = resume(path, client=mock_client)
+    assert report.failed == {entry_id: error}
+    assert [e["id"] for e in pending_entries(path)] == [entry_id]
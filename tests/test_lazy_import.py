@@ -0,0 +1,33 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import cc_products
+from cc_products import functions
+
+
+def test_import_does_not_load_modules_or_ccapi():
+    statement = (
+        "import sys, cc_products; "
+        "print(sorted(m for m in sys.modules if m.startswith(('cc_products', 'ccapi'))))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", statement],
+        cwd=os.path.dirname(os.path.dirname(cc_products.__file__)),
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    assert output.strip() == "['cc_products']"
+
+
+def test_names_are_loaded_on_first_use():
+    assert cc_products.get_range is functions.get_range
+    assert "get_range" in dir(cc_products)
+
+
+def test_unknown_names_raise_attribute_error():
+    with pytest.raises(AttributeError):
+        cc_products.not_a_function
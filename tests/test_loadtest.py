@@ -0,0 +1,76 @@
+from unittest.mock import Mock
+
+import pytest
+
+from cc_products import loadtest
+from cc_products.loadtest import (
+    FaultInjectingClient,
+    InjectedError,
+    LoadTestReport,
+    ThrottledError,
+)
+
+
+def test_fault_injecting_client_passes_requests_through():
+    client = FaultInjectingClient(Mock(**{"get_range.return_value": "range"}))
+    assert client.get_range("1") == "range"
+    assert client.requests["get_range"] == 1
+
+
+def test_fault_injecting_client_throttles():
+    client = FaultInjectingClient(Mock(), throttle_rate=1)
+    with pytest.raises(ThrottledError):
+        client.get_range("1")
+    client.client.get_range.assert_not_called()
+
+
+def test_fault_injecting_client_raises_errors():
+    client = FaultInjectingClient(Mock(), error_rate=1)
+    with pytest.raises(InjectedError):
+        client.get_range("1")
+
+
+def test_report_percentiles_and_error_rate():
+    report = LoadTestReport()
+    for seconds in range(1, 101):
+        report.record("load_range", seconds / 1000)
+    report.record("load_range", 1, error=ThrottledError())
+    report.elapsed = 2
+    assert report.percentile(50) == 0.051
+    assert report.percentile(99, "load_range") == 0.1
+    assert report.error_rate() == pytest.approx(1 / 101)
+    assert report.throughput("load_range") == 50.5
+    assert "load_range" in report.summary()
+
+
+def test_run_completes_operations():
+    report = loadtest.run(
+        workers=4, duration=None, operations=40, ranges=3, error_rate=0.05, seed=1
+    )
+    assert report.count() == 40
+    assert set(report.latencies) <= set(loadtest.WORKLOADS)
+    assert report.requests["get_range"] > 0
+
+
+def test_workloads_use_stock_bay_and_factory_link_endpoints():
+    # One worker, as concurrent writes to one product can conflict.
+    report = loadtest.run(
+        workers=1,
+        duration=None,
+        operations=20,
+        ranges=2,
+        mix={"write_stock": 1, "read_bays": 1, "write_bays": 1, "read_supplier": 1},
+        seed=1,
+    )
+    assert report.error_count() == 0
+    for endpoint in (
+        "update_product_stock_level",
+        "get_bays_for_product",
+        "get_product_factory_links",
+    ):
+        assert report.requests[endpoint] > 0
+
+
+def test_run_requires_a_limit():
+    with pytest.raises(ValueError):
+        loadtest.run(duration=None, operations=None)
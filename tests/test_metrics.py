@@ -0,0 +1,93 @@
+import urllib.request
+
+import pytest
+
+from cc_products import cache, get_range, metrics
+from cc_products.fake import FakeCCAPI, FakeCCAPIError
+from cc_products.metrics import Counter, Histogram, MetricsClient
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    metrics.clear()
+    yield
+    metrics.clear()
+
+
+@pytest.fixture
+def client():
+    return MetricsClient(FakeCCAPI())
+
+
+@pytest.fixture
+def range_id(client):
+    range_id = client.create_range("Test Range")
+    client.create_product(range_id=range_id, name="Test Range", barcode="1")
+    return range_id
+
+
+def test_counter_render():
+    counter = Counter("test_total", "Test counter.", labels=("name",))
+    counter.inc("a")
+    counter.inc("a", amount=2)
+    assert counter.get("a") == 3
+    assert counter.render() == (
+        "# HELP test_total Test counter.\n"
+        "# TYPE test_total counter\n"
+        'test_total{name="a"} 3'
+    )
+
+
+def test_histogram_render_is_cumulative():
+    histogram = Histogram("test_seconds", "Test histogram.", buckets=(1, 2))
+    for value in (0.5, 1, 1.5, 3):
+        histogram.observe(value)
+    assert histogram.count() == 4
+    assert histogram.render().split("\n")[2:] == [
+        'test_seconds_bucket{le="1"} 2',
+        'test_seconds_bucket{le="2"} 3',
+        'test_seconds_bucket{le="+Inf"} 4',
+        "test_seconds_sum 6.0",
+        "test_seconds_count 4",
+    ]
+
+
+def test_metrics_client_times_requests(client, range_id):
+    client.get_range(range_id)
+    assert metrics.api_requests.count("get_range") == 1
+
+
+def test_metrics_client_counts_errors(client):
+    with pytest.raises(FakeCCAPIError):
+        client.get_range("missing")
+    assert metrics.api_errors.get("get_range") == 1
+    assert metrics.api_requests.count("get_range") == 1
+
+
+def test_operations_are_timed(client, range_id):
+    product = get_range(range_id, client=client).products[0]
+    product._reload()
+    product.weight = 100
+    assert metrics.operations.count("range_load") == 1
+    assert metrics.operations.count("reload") == 1
+    assert metrics.operations.count("scope_write") == 1
+
+
+def test_render_includes_cache_hit_ratio(client, range_id):
+    cache.sales_channels.for_client(client).get("missing")
+    output = metrics.render()
+    assert 'cc_products_cache_misses_total{cache="sales_channels"}' in output
+    assert 'cc_products_cache_hit_ratio{cache="sales_channels"}' in output
+
+
+def test_http_server_serves_metrics(client, range_id):
+    client.get_range(range_id)
+    server = metrics.start_http_server(port=0)
+    try:
+        url = "http://127.0.0.1:{}/metrics".format(server.server_address[1])
+        with urllib.request.urlopen(url) as response:
+            body = response.read().decode()
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert 'cc_products_api_request_seconds_count{endpoint="get_range"} 1' in body
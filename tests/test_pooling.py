@@ -0,0 +1,89 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import Mock
+
+import pytest
+import requests
+
+from cc_products import client, enable_pooling, get_product, pooling, set_default_client
+
+
+def test_configure_session_mounts_pooling_adapter():
+    session = requests.Session()
+    adapter = pooling.configure_session(session, pool_size=4)
+    assert session.get_adapter("https://example.com") is adapter
+    assert session.get_adapter("http://example.com") is adapter
+    assert adapter._pool_maxsize == 4
+
+
+def test_configure_session_sets_compression_headers():
+    session = requests.Session()
+    pooling.configure_session(session)
+    assert session.headers["Accept-Encoding"] == "gzip, deflate"
+    pooling.configure_session(session, compression=False)
+    assert session.headers["Accept-Encoding"] == "identity"
+
+
+def test_metrics_before_requests():
+    adapter = pooling.PoolingAdapter()
+    assert adapter.metrics() == {
+        "requests": 0,
+        "in_flight": 0,
+        "max_in_flight": 0,
+        "pools": {},
+    }
+
+
+def test_create_session():
+    session = pooling.create_session(pool_size=2)
+    assert isinstance(session.get_adapter("https://"), pooling.PoolingAdapter)
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = json.dumps({"ID": self.path.strip("/"), "Name": "Test"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class SessionClient:
+    def __init__(self, url):
+        self.url = url
+        self.session = requests.Session()
+
+    def get_product(self, product_id):
+        response = self.session.get(self.url + product_id)
+        return Mock(json=response.json())
+
+
+@pytest.fixture
+def session_client():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield SessionClient("http://127.0.0.1:{}/".format(server.server_address[1]))
+    server.shutdown()
+    server.server_close()
+    set_default_client(None)
+
+
+def test_default_client_requests_use_pool(session_client):
+    set_default_client(session_client, pool_size=2)
+    for _ in range(3):
+        assert get_product("123").id == "123"
+    metrics = client.get_pooling_adapter().metrics()
+    assert metrics["requests"] == 3
+    assert [pool["connections"] for pool in metrics["pools"].values()] == [1]
+
+
+def test_enable_pooling_requires_a_session():
+    with pytest.raises(ValueError):
+        enable_pooling(Mock(session=None))
+    assert client.get_pooling_adapter(Mock()) is None
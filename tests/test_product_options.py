@@ -0,0 +1,164 @@
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from cc_products import cache
+from cc_products.productoptions import (
+    RangeOptions,
+    ShopOption,
+    VariationOption,
+    VariationOptions,
+)
+
+
+@pytest.fixture
+def mock_client():
+    return Mock()
+
+
+def option(option_id, name):
+    option = Mock(id=option_id)
+    option.name = name
+    return option
+
+
+@pytest.fixture
+def option_data():
+    return Mock(
+        shop_options=[
+            option(1, "Colour (Master)"),
+            option(2, "Size (Master)"),
+            option(3, "Design"),
+        ],
+        options=[
+            Mock(id=1, is_web_shop_select=True),
+            Mock(id=3, is_web_shop_select=False),
+        ],
+    )
+
+
+@pytest.fixture
+def range_options(mock_client, option_data):
+    mock_client.get_product_range_options.return_value = option_data
+    return RangeOptions(Mock(id="93094893", client=mock_client))
+
+
+def test_range_options_are_loaded_lazily(mock_client, range_options):
+    mock_client.get_product_range_options.assert_not_called()
+    range_options.options
+    mock_client.get_product_range_options.assert_called_once_with("93094893")
+
+
+def test_range_option_names_are_cleaned(range_options):
+    assert list(range_options.names) == ["Colour", "Size", "Design"]
+
+
+def test_range_option_flags(range_options):
+    assert [o.name for o in range_options.selected_options] == ["Colour", "Design"]
+    assert [o.name for o in range_options.variable_options] == ["Colour"]
+
+
+def test_shop_options_are_shared_between_ranges(mock_client, option_data):
+    mock_client.get_product_range_options.return_value = option_data
+    RangeOptions(Mock(id="1", client=mock_client)).options
+    option_data.shop_options = []
+    assert list(RangeOptions(Mock(id="2", client=mock_client)).names) == [
+        "Colour",
+        "Size",
+        "Design",
+    ]
+    shop_options = cache.shop_options.for_client(mock_client)
+    assert shop_options.get("shop_options")[0] == ShopOption(1, "Colour")
+
+
+def test_shop_options_are_not_shared_between_clients(mock_client, option_data):
+    mock_client.get_product_range_options.return_value = option_data
+    RangeOptions(Mock(id="1", client=mock_client)).options
+    other_client = Mock()
+    other_client.get_product_range_options.return_value = Mock(
+        shop_options=[option(4, "Material")], options=[]
+    )
+    assert list(RangeOptions(Mock(id="1", client=other_client)).names) == ["Material"]
+
+
+@pytest.fixture
+def variation_options(mock_client):
+    variation_options = VariationOptions(Mock(id="4938498", client=mock_client), None)
+    variation_options._options = [
+        VariationOption(1, "Colour", "Red"),
+        VariationOption(3, "Design", "Stripes"),
+    ]
+    return variation_options
+
+
+@pytest.fixture
+def product_range(range_options, variation_options):
+    product_range = range_options.product_range
+    product_range.__iter__ = Mock(
+        side_effect=lambda: iter([Mock(_options=variation_options)])
+    )
+    return product_range
+
+
+def test_update_only_changes_options_whose_state_changes(
+    mock_client, range_options, product_range
+):
+    range_options.update(selected=["Colour", "Size"], variable=["Colour", "Size"])
+    mock_client.add_option_to_product.assert_called_once_with(
+        range_id="93094893", option_id=2
+    )
+    mock_client.remove_option_from_product.assert_called_once_with(
+        range_id="93094893", option_id=3
+    )
+    mock_client.set_range_option_drop_down.assert_called_once_with(
+        range_id="93094893", option_id=2, drop_down=True
+    )
+    assert range_options.selected_names == {"Colour", "Size"}
+    assert [o.name for o in range_options.variable_options] == ["Colour", "Size"]
+
+
+def test_update_selects_variable_options(mock_client, range_options, product_range):
+    range_options.update(variable=["Size"])
+    mock_client.add_option_to_product.assert_called_once_with(
+        range_id="93094893", option_id=2
+    )
+    mock_client.remove_option_from_product.assert_not_called()
+    assert [o.name for o in range_options.variable_options] == ["Size"]
+
+
+def test_update_raises_for_unknown_option(mock_client, range_options):
+    with pytest.raises(KeyError):
+        range_options.update(selected=["Not An Option"])
+    mock_client.add_option_to_product.assert_not_called()
+
+
+def test_update_patches_cached_variation_options(
+    range_options, product_range, variation_options
+):
+    range_options.update(selected=["Colour", "Size"])
+    assert dict(variation_options) == {"Colour": "Red", "Size": None}
+
+
+def test_update_patches_cached_variation_options_after_api_calls(
+    mock_client, range_options, product_range, variation_options
+):
+    calls = []
+    mock_client.add_option_to_product.side_effect = lambda **kwargs: calls.append("add")
+    mock_client.remove_option_from_product.side_effect = lambda **kwargs: calls.append(
+        "remove"
+    )
+    patch = variation_options._add_cached_option
+    variation_options._add_cached_option = lambda *args: (
+        calls.append(("patch", threading.current_thread())),
+        patch(*args),
+    )
+    range_options.update(selected=["Colour", "Size"])
+    assert sorted(calls[:2]) == ["add", "remove"]
+    assert calls[2:] == [("patch", threading.current_thread())]
+
+
+def test_setting_variation_option_updates_cached_value(mock_client, variation_options):
+    variation_options["Colour"] = "Blue"
+    assert variation_options._options is not None
+    assert variation_options["Colour"] == "Blue"
@@ -1,8 +1,8 @@
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 import pytest
 
-from cc_products import exceptions
+from cc_products import cache, exceptions
 from cc_products.productrange import ProductRange
 
 
@@ -46,8 +46,8 @@ def cc_data(range_id, name, range_sku, thumbnail, products):
 
 
 @pytest.fixture
-def product_range(cc_data):
-    return ProductRange(cc_data)
+def product_range(cc_data, mock_client):
+    return ProductRange(cc_data, client=mock_client)
 
 
 def test_sets_raw(cc_data, product_range):
@@ -161,3 +161,111 @@ def test_get_description_returns__description_when_not_none(product_range):
     product_range.products = [Mock(description="Test Product Description")]
     product_range._description = range_description
     assert product_range.description == range_description
+
+
+@pytest.fixture
+def mock_client():
+    return Mock()
+
+
+@pytest.fixture
+def discontinued_option():
+    return Mock(id="4984", selected=True)
+
+
+@pytest.fixture
+def range_with_products(product_range, discontinued_option):
+    product_range.products = [Mock(id=str(i)) for i in range(3)]
+    product_range._options = {"Discontinued": discontinued_option}
+    return product_range
+
+
+@pytest.mark.parametrize(
+    "value,option_value", [(True, "Discontinued"), (False, "Not Discontinued")]
+)
+def test_end_of_line_setter_sets_discontinued_for_all_products_at_once(
+    mock_client, range_with_products, discontinued_option, value, option_value
+):
+    range_with_products.end_of_line = value
+    mock_client.get_option_value_id.assert_called_once_with(
+        discontinued_option.id, option_value, create=True
+    )
+    mock_client.set_product_option_value.assert_called_once_with(
+        product_ids=["0", "1", "2"],
+        option_id=discontinued_option.id,
+        option_value_id=mock_client.get_option_value_id.return_value,
+    )
+
+
+def test_end_of_line_setter_updates_range_settings(mock_client, range_with_products):
+    range_with_products.end_of_line = True
+    mock_client.update_range_settings.assert_called_once()
+    kwargs = mock_client.update_range_settings.call_args.kwargs
+    assert kwargs["current_end_of_line"] is False
+    assert kwargs["new_end_of_line"] is True
+    assert range_with_products.end_of_line is True
+
+
+def test_end_of_line_setter_selects_discontinued_option(
+    mock_client, range_with_products, discontinued_option
+):
+    discontinued_option.selected = False
+    range_with_products.end_of_line = True
+    assert discontinued_option.selected is True
+
+
+@pytest.fixture
+def sales_channels():
+    return [Mock(id="1"), Mock(id="2")]
+
+
+def test_name_setter_updates_products_and_range(
+    mock_client, range_with_products, sales_channels
+):
+    mock_client.get_sales_channels_for_range.return_value = sales_channels
+    range_with_products.name = "New Name"
+    mock_client.set_product_name.assert_called_once_with(
+        product_ids=["0", "1", "2"], name="New Name"
+    )
+    kwargs = mock_client.update_range_settings.call_args.kwargs
+    assert kwargs["new_name"] == "New Name"
+    assert kwargs["channels"] == ["1", "2"]
+    assert range_with_products.name == "New Name"
+
+
+def test_name_setter_caches_sales_channels(
+    mock_client, range_with_products, sales_channels
+):
+    mock_client.get_sales_channels_for_range.return_value = sales_channels
+    range_with_products.name = "New Name"
+    range_with_products.name = "Another Name"
+    mock_client.get_sales_channels_for_range.assert_called_once_with(
+        range_with_products.id
+    )
+
+
+def test_invalidate_sales_channels(mock_client, range_with_products, sales_channels):
+    mock_client.get_sales_channels_for_range.return_value = sales_channels
+    range_with_products.name = "New Name"
+    range_with_products.invalidate_sales_channels()
+    range_with_products.name = "Another Name"
+    assert mock_client.get_sales_channels_for_range.call_count == 2
+
+
+def test_stock_snapshot(product_range):
+    product_range.products = [
+        Mock(sku="ABC", stock_level=5, get_pending_stock=Mock(return_value=2)),
+        Mock(sku="DEF", stock_level=0, get_pending_stock=Mock(return_value=0)),
+    ]
+    assert product_range.stock_snapshot() == {"ABC": (5, 2), "DEF": (0, 0)}
+    product_range.products[0].get_pending_stock.assert_called_once_with(use_cache=True)
+
+
+def test_sales_channels_expire(mock_client, range_with_products, sales_channels):
+    mock_client.get_sales_channels_for_range.return_value = sales_channels
+    with patch("cc_products.cache.time.monotonic", return_value=100):
+        range_with_products.name = "New Name"
+    later = 100 + cache.SALES_CHANNELS_TTL + 1
+    with patch("cc_products.cache.time.monotonic", return_value=later):
+        range_with_products.name = "Another Name"
+    assert mock_client.get_sales_channels_for_range.call_count == 2
@@ -0,0 +1,136 @@
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from cc_products import Catalogue, get_range
+from cc_products.fake import FakeCCAPI
+
+
+@pytest.fixture
+def client():
+    client = FakeCCAPI()
+    for name in ("Department", "Retail Price", "Discontinued"):
+        client.add_option(name)
+    return client
+
+
+def create_range(client, name, products):
+    range_id = client.create_range(name)
+    for barcode, _, _ in products:
+        client.create_product(range_id=range_id, name=name, barcode=barcode)
+    for product, (_, department, price) in zip(
+        get_range(range_id, client=client), products
+    ):
+        product.department = department
+        product.retail_price = price
+    return range_id
+
+
+@pytest.fixture
+def range_ids(client):
+    return [
+        create_range(client, "Dresses", [("1", "Womens", 15), ("2", "Womens", 25)]),
+        create_range(client, "Shirts", [("3", "Mens", 10), ("4", "Womens", 5)]),
+    ]
+
+
+def barcodes(products):
+    return sorted(product.barcode for product in products)
+
+
+def test_filter_by_options(client, range_ids):
+    catalogue = Catalogue(range_ids, client=client)
+    products = catalogue.filter(department="Womens", retail_price__lt=20)
+    assert barcodes(products) == ["1", "4"]
+
+
+def test_filter_by_attribute(client, range_ids):
+    catalogue = Catalogue(range_ids, client=client)
+    assert barcodes(catalogue.filter(barcode__in=("2", "3"))) == ["2", "3"]
+
+
+def test_filters_can_be_chained(client, range_ids):
+    catalogue = Catalogue(range_ids, client=client).filter(department="Womens")
+    assert barcodes(catalogue.filter(retail_price__gte=15)) == ["1", "2"]
+
+
+def test_isnull_and_contains(client, range_ids):
+    catalogue = Catalogue(range_ids, client=client)
+    assert barcodes(catalogue.filter(discontinued=False)) == ["1", "2", "3", "4"]
+    assert barcodes(catalogue.filter(department__icontains="wom")) == ["1", "2", "4"]
+    assert barcodes(catalogue.filter(supplier_sku__isnull=True)) == [
+        "1",
+        "2",
+        "3",
+        "4",
+    ]
+
+
+def test_options_are_only_fetched_for_products_matching_attributes(client, range_ids):
+    client.get_options_for_product = Mock(wraps=client.get_options_for_product)
+    products = list(
+        Catalogue(range_ids, client=client).filter(barcode="3", department="Mens")
+    )
+    assert barcodes(products) == ["3"]
+    client.get_options_for_product.assert_called_once_with(products[0].id)
+
+
+def test_options_are_not_fetched_without_option_lookups(client, range_ids):
+    client.get_options_for_product = Mock(wraps=client.get_options_for_product)
+    list(Catalogue(range_ids, client=client).filter(barcode="1"))
+    client.get_options_for_product.assert_not_called()
+
+
+def test_fields_not_in_range_data_are_reloaded_once(client, range_ids):
+    for weight, product in enumerate(get_range(range_ids[0], client=client)):
+        product.weight = weight * 100
+    # Reloads only get past the barrier two at a time, so they must be
+    # concurrent.
+    barrier = threading.Barrier(2, timeout=5)
+    get_product = client.get_product
+
+    def concurrent_get_product(product_id):
+        barrier.wait()
+        return get_product(product_id)
+
+    client.get_product = Mock(side_effect=concurrent_get_product)
+    products = list(Catalogue(range_ids, client=client).filter(weight__gte=50))
+    assert barcodes(products) == ["2"]
+    assert client.get_product.call_count == 4
+
+
+def test_undecodable_option_values_do_not_match(client, range_ids):
+    product = get_range(range_ids[0], client=client).products[0]
+    option_id = product.options.names["Retail Price"].id
+    client.set_product_option_value(
+        product_ids=[product.id],
+        option_id=option_id,
+        option_value_id=client.get_option_value_id(option_id, "Free", create=True),
+    )
+    products = Catalogue(range_ids, client=client).filter(retail_price__lt=100)
+    assert barcodes(products) == ["2", "3", "4"]
+
+
+def test_catalogue_accepts_a_generator(client, range_ids):
+    catalogue = Catalogue((range_id for range_id in range_ids), client=client)
+    assert barcodes(catalogue) == ["1", "2", "3", "4"]
+    assert barcodes(catalogue.filter(barcode="1")) == ["1"]
+
+
+def test_ranges_are_loaded_lazily(client, range_ids):
+    client.get_range = Mock(wraps=client.get_range)
+    catalogue = Catalogue(range_ids, client=client, chunk_size=1)
+    assert catalogue.filter(department="Womens").first().barcode == "1"
+    client.get_range.assert_called_once_with(range_ids[0])
+
+
+def test_product_range_filter(client, range_ids):
+    product_range = get_range(range_ids[1], client=client)
+    assert barcodes(product_range.filter(retail_price__gt=5)) == ["3"]
+
+
+@pytest.mark.parametrize("lookup", ["colour__between", "not_an_attribute"])
+def test_invalid_lookups(client, range_ids, lookup):
+    with pytest.raises(ValueError):
+        Catalogue(range_ids, client=client).filter(**{lookup: 1})
@@ -0,0 +1,93 @@
+from unittest.mock import patch
+
+import pytest
+
+from cc_products import get_range, refresh
+from cc_products.fake import FakeCCAPI
+
+
+@pytest.fixture
+def client():
+    client = FakeCCAPI()
+    client.add_option("Colour")
+    return client
+
+
+@pytest.fixture
+def range_ids(client):
+    return [client.create_range("Range {}".format(i)) for i in range(3)]
+
+
+@pytest.fixture
+def refresher(client):
+    refresher = refresh.start_refresher(top_n=2, interval=60, client=client)
+    yield refresher
+    refresh.stop_refresher()
+
+
+def test_get_range_records_access(refresher, client, range_ids):
+    get_range(range_ids[0], client=client)
+    get_range(range_ids[0], client=client)
+    assert refresher.access_counts[range_ids[0]] == 2
+
+
+def test_hot_ranges_are_kept_warm(refresher, client, range_ids):
+    first = get_range(range_ids[0], client=client)
+    assert refresher.is_warm(range_ids[0])
+    assert get_range(range_ids[0], client=client) is first
+
+
+def test_refresh_keeps_only_top_ranges(refresher, client, range_ids):
+    for count, range_id in zip((3, 2, 1), range_ids):
+        for _ in range(count):
+            get_range(range_id, client=client)
+    refresher.refresh()
+    assert [refresher.is_warm(r) for r in range_ids] == [True, True, False]
+
+
+def test_stale_ranges_are_returned_and_reloaded(refresher, client, range_ids):
+    first = get_range(range_ids[0], client=client)
+    client.ranges[range_ids[0]]["Name"] = "New Name"
+    later = refresh.time.monotonic() + 120
+    with patch("cc_products.refresh.time.monotonic", return_value=later):
+        assert get_range(range_ids[0], client=client) is first
+        for thread in refresh.threading.enumerate():
+            if thread.name.startswith("cc_products range refresh "):
+                thread.join()
+    assert get_range(range_ids[0], client=client).name == "New Name"
+
+
+def test_other_clients_are_not_affected(refresher, range_ids):
+    other_client = FakeCCAPI()
+    range_id = other_client.create_range("Other Range")
+    assert get_range(range_id, client=other_client).name == "Other Range"
+    assert refresher.access_counts[range_id] == 0
+
+
+def test_refresh_halves_access_counts(refresher, client, range_ids):
+    for count, range_id in zip((4, 1), range_ids):
+        for _ in range(count):
+            get_range(range_id, client=client)
+    refresher.refresh()
+    assert refresher.access_counts == {range_ids[0]: 2}
+
+
+def test_cold_ranges_are_not_kept_when_hot_set_is_full(refresher, client, range_ids):
+    for range_id in range_ids:
+        get_range(range_id, client=client)
+    assert [refresher.is_warm(r) for r in range_ids] == [True, True, False]
+    assert refresher.hot_range_ids() == set(range_ids[:2])
+
+
+def test_refresh_errors_are_logged(refresher, client, range_ids, caplog):
+    get_range(range_ids[0], client=client)
+    with patch.object(client, "get_range", side_effect=Exception("Unavailable")):
+        refresher.refresh()
+    assert "Error refreshing Product Range" in caplog.text
+    assert refresher.is_warm(range_ids[0])
+
+
+def test_stop_refresher_clears_running_refresher(client):
+    refresh.start_refresher(client=client)
+    refresh.stop_refresher()
+    assert refresh.get_refresher() is None
@@ -0,0 +1,158 @@
+from unittest.mock import Mock
+
+import pytest
+
+from cc_products import exceptions, get_range
+from cc_products.fake import FakeCCAPI, FakeCCAPIError
+from cc_products.resilience import (
+    PERMANENT,
+    THROTTLED,
+    TRANSIENT,
+    CircuitBreaker,
+    ResilientClient,
+    RetryPolicy,
+)
+
+
+def http_error(status_code, headers=None):
+    error = OSError("HTTP {}".format(status_code))
+    error.response = Mock(status_code=status_code, headers=headers or {})
+    return error
+
+
+@pytest.fixture
+def policy():
+    return RetryPolicy(backoff=0)
+
+
+@pytest.mark.parametrize(
+    "error,kind",
+    [
+        (ConnectionError(), TRANSIENT),
+        (http_error(503), TRANSIENT),
+        (http_error(429), THROTTLED),
+        (http_error(404), PERMANENT),
+        (ValueError(), PERMANENT),
+    ],
+)
+def test_classify(policy, error, kind):
+    assert policy.classify(error) == kind
+
+
+def test_retry_after_header_is_used(policy):
+    assert policy.delay(1, http_error(429, {"Retry-After": "3"})) == 3
+
+
+def test_transient_errors_are_retried(policy):
+    mock_client = Mock()
+    mock_client.get_range.side_effect = [ConnectionError(), "range"]
+    client = ResilientClient(mock_client, retry_policy=policy)
+    assert client.get_range("1") == "range"
+    assert client.retries["get_range"] == 1
+
+
+def test_permanent_errors_are_not_retried(policy):
+    mock_client = Mock()
+    mock_client.get_range.side_effect = FakeCCAPIError()
+    client = ResilientClient(mock_client, retry_policy=policy)
+    with pytest.raises(FakeCCAPIError):
+        client.get_range("1")
+    assert mock_client.get_range.call_count == 1
+
+
+def test_retries_are_limited(policy):
+    mock_client = Mock()
+    mock_client.get_range.side_effect = ConnectionError()
+    client = ResilientClient(
+        mock_client,
+        retry_policy=policy,
+        circuit_breaker=CircuitBreaker(failure_threshold=10),
+    )
+    with pytest.raises(ConnectionError):
+        client.get_range("1")
+    assert mock_client.get_range.call_count == policy.max_attempts
+
+
+def test_non_idempotent_endpoints_are_only_retried_when_throttled(policy):
+    mock_client = Mock()
+    mock_client.create_product.side_effect = [http_error(429), ConnectionError()]
+    client = ResilientClient(mock_client, retry_policy=policy)
+    with pytest.raises(ConnectionError):
+        client.create_product(range_id="1", name="Name", barcode="1")
+    assert mock_client.create_product.call_count == 2
+
+
+def test_circuit_opens_after_repeated_failures():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    breaker.before_request(block=False)
+    breaker.record_failure()
+    assert breaker.state == breaker.OPEN
+    with pytest.raises(exceptions.CircuitOpenError):
+        breaker.before_request(block=False)
+
+
+def test_circuit_allows_one_trial_after_reset_timeout():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    breaker.before_request(block=False)
+    assert breaker.state == breaker.HALF_OPEN
+    with pytest.raises(exceptions.CircuitOpenError):
+        breaker.before_request(block=False)
+    breaker.record_success()
+    assert breaker.state == breaker.CLOSED
+
+
+def test_interrupted_trial_allows_another_trial():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    mock_client = Mock()
+    mock_client.get_range.side_effect = KeyboardInterrupt
+    resilient_client = ResilientClient(
+        mock_client, circuit_breaker=breaker, block=False
+    )
+    with pytest.raises(KeyboardInterrupt):
+        resilient_client.get_range("1")
+    breaker.before_request(block=False)
+    assert breaker.state == breaker.HALF_OPEN
+
+
+@pytest.fixture
+def client():
+    client = FakeCCAPI()
+    client.add_option("Colour")
+    return client
+
+
+@pytest.fixture
+def product(client):
+    range_id = client.create_range("Test Range")
+    client.create_product(range_id=range_id, name="Test Range", barcode="1")
+    return get_range(range_id, client=client).products[0]
+
+
+def test_failed_write_invalidates_cached_value(client, product):
+    product.price = 5
+    client.set_product_base_price = Mock(side_effect=ConnectionError())
+    with pytest.raises(ConnectionError):
+        product.price = 10
+    client.products[product.id]["BasePrice"] = 10
+    assert product.price == 10
+
+
+def test_failed_stock_write_invalidates_stock_level(client, product):
+    client.update_product_stock_level = Mock(side_effect=ConnectionError())
+    with pytest.raises(ConnectionError):
+        product.stock_level = 10
+    client.products[product.id]["StockLevel"] = 10
+    assert product.stock_level == 10
+
+
+def test_failed_option_write_invalidates_options(client, product):
+    product.options["Colour"] = "Red"
+    client.set_product_option_value = Mock(side_effect=ConnectionError())
+    with pytest.raises(ConnectionError):
+        product.options["Colour"] = "Blue"
+    client.get_options_for_product = Mock(wraps=client.get_options_for_product)
+    assert product.options["Colour"] == "Red"
+    client.get_options_for_product.assert_called_once_with(product.id)
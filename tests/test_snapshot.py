@@ -0,0 +1,86 @@
+import pytest
+
+from cc_products import Snapshot, get_range, write_snapshot
+from cc_products.fake import FakeCCAPI
+
+
+@pytest.fixture
+def client():
+    client = FakeCCAPI()
+    for name in ("Department", "Retail Price", "Discontinued"):
+        client.add_option(name)
+    return client
+
+
+@pytest.fixture
+def product_range(client):
+    range_id = client.create_range("Test Range")
+    for barcode in ("1234", "5678"):
+        client.create_product(range_id=range_id, name="Test Range", barcode=barcode)
+    product_range = get_range(range_id, client=client)
+    product_range.products[0].department = "Womens"
+    product_range.products[0].retail_price = 12.5
+    return product_range
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "catalogue.snapshot")
+
+
+@pytest.fixture
+def snapshot(product_range, path):
+    write_snapshot(path, [product_range], details=True)
+    with Snapshot(path) as snapshot:
+        yield snapshot
+
+
+def test_range_attributes(snapshot, product_range):
+    snapshot_range = snapshot.get_range(product_range.id)
+    assert snapshot_range.name == "Test Range"
+    assert snapshot_range.sku == product_range.sku
+    assert snapshot_range.end_of_line is False
+    assert [p.barcode for p in snapshot_range] == ["1234", "5678"]
+
+
+def test_product_attributes_match_variation(snapshot, product_range):
+    for product in product_range:
+        view = snapshot.get_product(product.id)
+        for name in ("sku", "name", "barcode", "stock_level", "price", "weight"):
+            assert getattr(view, name) == getattr(product, name)
+        assert view.product_range.id == product_range.id
+
+
+def test_options_are_decoded(snapshot):
+    first, second = snapshot.products
+    assert first.department == "Womens"
+    assert first.retail_price == 12.5
+    assert first.discontinued is False
+    assert second.department is None
+
+
+def test_views_are_read_only(snapshot):
+    with pytest.raises(AttributeError):
+        snapshot.products[0].sku = "New SKU"
+
+
+def test_detail_columns_are_optional(product_range, path):
+    write_snapshot(path, [product_range], options=False)
+    with Snapshot(path) as snapshot:
+        assert snapshot.products[0].sku == product_range.products[0].sku
+        with pytest.raises(AttributeError):
+            snapshot.products[0].price
+        with pytest.raises(AttributeError):
+            snapshot.products[0].department
+
+
+def test_missing_ids_raise_key_error(snapshot):
+    with pytest.raises(KeyError):
+        snapshot.get_range("missing")
+
+
+def test_invalid_file(path):
+    with open(path, "wb") as snapshot_file:
+        snapshot_file.write(b"not a snapshot")
+    with pytest.raises(ValueError):
+        Snapshot(path)
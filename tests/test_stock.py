@@ -0,0 +1,96 @@
+from unittest.mock import Mock
+
+import pytest
+
+from cc_products.stock import reconcile_stock
+
+
+@pytest.fixture
+def stock_levels():
+    return {}
+
+
+@pytest.fixture
+def mock_client(stock_levels):
+    mock_client = Mock()
+    mock_client.get_product.side_effect = lambda product_id: Mock(
+        json={"StockLevel": stock_levels[product_id]}
+    )
+    return mock_client
+
+
+@pytest.fixture
+def product_range():
+    return Mock(products=[Mock(id="1", stock_level=5), Mock(id="2", stock_level=3)])
+
+
+def test_reconcile_stock_reads_levels_from_ranges(mock_client, product_range):
+    report = reconcile_stock(
+        {"1": 5, "2": 4}, product_ranges=[product_range], client=mock_client
+    )
+    mock_client.get_product.assert_not_called()
+    mock_client.update_product_stock_level.assert_called_once_with(
+        product_id="2", new_stock_level=4, old_stock_level=3
+    )
+    assert report.unchanged == ["1"]
+    assert report.updated == {"2": 4}
+    assert product_range.products[1]._stock_level == 4
+
+
+def test_reconcile_stock_loads_products_not_in_ranges(mock_client, stock_levels):
+    stock_levels["7"] = 2
+    report = reconcile_stock({"7": 6}, client=mock_client)
+    mock_client.update_product_stock_level.assert_called_once_with(
+        product_id="7", new_stock_level=6, old_stock_level=2
+    )
+    assert report.updated == {"7": 6}
+
+
+def test_reconcile_stock_retries_conflicts(mock_client, stock_levels, product_range):
+    stock_levels["2"] = 8
+
+    def update_product_stock_level(product_id, new_stock_level, old_stock_level):
+        if old_stock_level != stock_levels[product_id]:
+            raise Exception("Stock level changed")
+
+    mock_client.update_product_stock_level.side_effect = update_product_stock_level
+    report = reconcile_stock(
+        {"2": 4}, product_ranges=[product_range], client=mock_client
+    )
+    assert mock_client.update_product_stock_level.call_count == 2
+    assert report.conflicts == ["2"]
+    assert report.updated == {"2": 4}
+
+
+def test_reconcile_stock_reports_failures(mock_client, stock_levels, product_range):
+    stock_levels["2"] = 3
+    error = Exception("Update failed")
+    mock_client.update_product_stock_level.side_effect = error
+    report = reconcile_stock(
+        {"2": 4}, product_ranges=[product_range], client=mock_client
+    )
+    assert mock_client.update_product_stock_level.call_count == 1
+    assert report.failed == {"2": error}
+    assert report.updated == {}
+
+
+def test_reconcile_stock_reports_failed_reloads(mock_client, product_range):
+    error = Exception("Reload failed")
+    mock_client.update_product_stock_level.side_effect = Exception("Update failed")
+    mock_client.get_product.side_effect = error
+    report = reconcile_stock(
+        {"1": 6, "2": 4}, product_ranges=[product_range], client=mock_client
+    )
+    assert report.failed == {"1": error, "2": error}
+    assert report.updated == {}
+
+
+def test_reconcile_stock_reports_failed_loads(mock_client, stock_levels):
+    stock_levels["7"] = 2
+    report = reconcile_stock({"7": 6, "8": 1}, client=mock_client)
+    mock_client.update_product_stock_level.assert_called_once_with(
+        product_id="7", new_stock_level=6, old_stock_level=2
+    )
+    assert list(report.failed) == ["8"]
+    assert report.updated == {"7": 6}
+    assert report.unchanged == []
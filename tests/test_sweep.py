@@ -0,0 +1,86 @@
+from cc_products import sweep
+from cc_products.fake import FakeCCAPI
+
+RANGE_COUNT = 12
+
+
+def make_client():
+    client = FakeCCAPI()
+    for i in range(RANGE_COUNT):
+        range_id = client.create_range("Range {}".format(i))
+        for barcode in range(i % 3):
+            client.create_product(range_id, "Range {}".format(i), str(barcode))
+    return client
+
+
+def unpicklable(product_range):
+    return lambda: None
+
+
+def count_products(product_range):
+    if product_range.name == "Range 5":
+        raise ValueError("Test Error")
+    return len(product_range.products)
+
+
+def test_sweep_returns_a_result_for_each_range():
+    range_ids = list(make_client().ranges)
+    results = list(
+        sweep.sweep(
+            range_ids,
+            count_products,
+            processes=2,
+            chunk_size=3,
+            client_factory=make_client,
+        )
+    )
+    assert sorted(r.range_id for r in results) == sorted(range_ids)
+    values = {r.range_id: r.value for r in results if r.error is None}
+    assert len(values) == RANGE_COUNT - 1
+
+
+def test_sweep_reports_errors():
+    client = make_client()
+    results = list(
+        sweep.sweep(
+            list(client.ranges), count_products, processes=2, client_factory=make_client
+        )
+    )
+    errors = [r for r in results if r.error is not None]
+    assert len(errors) == 1
+    assert "Test Error" in errors[0].error
+
+
+def test_chunks():
+    assert list(sweep._chunks(range(7), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_sweep_reports_unpicklable_results():
+    range_ids = list(make_client().ranges)[:2]
+    results = list(
+        sweep.sweep(range_ids, unpicklable, processes=1, client_factory=make_client)
+    )
+    assert len(results) == 2
+    assert all(r.error is not None for r in results)
+
+
+def test_sweep_limits_pending_chunks():
+    range_ids = list(make_client().ranges)
+    consumed = []
+
+    def iter_range_ids():
+        for range_id in range_ids:
+            consumed.append(range_id)
+            yield range_id
+
+    results = sweep.sweep(
+        iter_range_ids(),
+        count_products,
+        processes=1,
+        chunk_size=1,
+        max_pending=2,
+        client_factory=make_client,
+    )
+    next(results)
+    assert len(consumed) <= 3
+    results.close()
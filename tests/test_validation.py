@@ -0,0 +1,101 @@
+import datetime
+from unittest.mock import Mock
+
+import pytest
+
+from cc_products import exceptions
+from cc_products.validation import (
+    apply_changes,
+    check_value,
+    find_invalid_changes,
+    validate_changes,
+)
+
+
+@pytest.mark.parametrize(
+    "attribute,value",
+    [
+        ("retail_price", 12.5),
+        ("retail_price", "12.50"),
+        ("length", 100),
+        ("gender", "womens"),
+        ("package_type", "Packet"),
+        ("discontinued", False),
+        ("date_created", datetime.date(2022, 3, 4)),
+        ("amazon_bullets", ["One", "Two"]),
+        ("department", "Clothing"),
+        ("weight", 250),
+        ("large_letter_compatible", True),
+        ("price", 5.5),
+        ("stock_level", 12),
+        ("bays", [1, "2"]),
+        ("hs_code", "6110200000"),
+        ("name", "Test Product"),
+    ],
+)
+def test_valid_values(attribute, value):
+    check_value(attribute, value)
+
+
+@pytest.mark.parametrize(
+    "attribute,value",
+    [
+        ("retail_price", -1),
+        ("retail_price", "twelve"),
+        ("retail_price", True),
+        ("length", -5),
+        ("gender", "cats"),
+        ("package_type", "Crate"),
+        ("discontinued", "yes"),
+        ("date_created", "2022-03-04"),
+        ("amazon_bullets", "One|Two"),
+        ("amazon_bullets", ["One|Two"]),
+        ("department", None),
+        ("weight", -1),
+        ("weight", 2.5),
+        ("large_letter_compatible", 1),
+        ("price", "free"),
+        ("stock_level", -3),
+        ("bays", ["A"]),
+        ("hs_code", "ABC"),
+        ("name", None),
+        ("id", "1234"),
+        ("not_an_attribute", "value"),
+    ],
+)
+def test_invalid_values(attribute, value):
+    with pytest.raises(ValueError):
+        check_value(attribute, value)
+
+
+def test_find_invalid_changes_reports_every_invalid_change():
+    changes = {
+        "ABC": {"retail_price": -1, "gender": "womens"},
+        "DEF": {"gender": "cats"},
+    }
+    invalid = find_invalid_changes(changes)
+    assert [(i.product, i.attribute) for i in invalid] == [
+        ("ABC", "retail_price"),
+        ("DEF", "gender"),
+    ]
+
+
+def test_validate_changes_raises_validation_error():
+    with pytest.raises(exceptions.ValidationError) as execinfo:
+        validate_changes({"ABC": {"retail_price": -1}})
+    assert len(execinfo.value.invalid_changes) == 1
+
+
+def test_apply_changes_does_not_set_anything_if_a_change_is_invalid():
+    product = Mock()
+    other = Mock()
+    with pytest.raises(exceptions.ValidationError):
+        apply_changes({product: {"price": 5}, other: {"price": -5}})
+    assert product.price != 5
+
+
+def test_apply_changes_sets_values():
+    product = Mock()
+    apply_changes({product: {"price": 5, "stock_level": 3}})
+    assert product.price == 5
+    assert product.stock_level == 3
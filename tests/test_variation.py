@@ -0,0 +1,220 @@
+import datetime
+from unittest.mock import Mock, patch
+
+import pytest
+
+from cc_products.variation import Variation
+
+
+@pytest.fixture
+def cc_data():
+    return {
+        "ID": "4938498",
+        "FullName": "Test Product - Red",
+        "ManufacturerSKU": "ABC-DEF-GHI",
+        "RangeID": "93094893",
+        "ProductType": 0,
+        "defaultImageUrl": "image.jpg",
+        "ExternalProductId": "EXT123",
+        "Name": "Test Product",
+        "Description": "Test Description",
+        "Barcode": "1234567891234",
+        "EndOfLine": False,
+        "StockLevel": 5,
+        "LengthMM": 100,
+        "WidthMM": 50,
+        "HeightMM": 20,
+        "LargeLetterCompatible": True,
+        "WeightGM": 250,
+        "DeliveryLeadTimeDays": 1,
+        "BasePrice": 5.5,
+        "VatRateID": 5,
+        "HSCode": "6110200000",
+        "CountryOfOriginId": 3,
+    }
+
+
+@pytest.fixture
+def mock_client():
+    return Mock()
+
+
+@pytest.fixture
+def variation(cc_data, mock_client):
+    return Variation(cc_data, client=mock_client)
+
+
+def test_sets_raw(cc_data, variation):
+    assert variation.raw is cc_data
+
+
+def test_reads_fields_from_data(cc_data, variation):
+    assert variation.id == cc_data["ID"]
+    assert variation.sku == cc_data["ManufacturerSKU"]
+    assert variation.is_multipack is False
+    assert variation.stock_level == cc_data["StockLevel"]
+    assert variation._weight == cc_data["WeightGM"]
+    assert variation._price == cc_data["BasePrice"]
+
+
+def test_setting_a_field_does_not_modify_data(cc_data, variation):
+    variation._stock_level = 12
+    assert variation.stock_level == 12
+    assert cc_data["StockLevel"] == 5
+
+
+def test_load_from_cc_data_clears_set_fields(cc_data, variation):
+    variation._stock_level = 12
+    variation.load_from_cc_data(dict(cc_data, StockLevel=8))
+    assert variation.stock_level == 8
+
+
+def test_create_from_range_does_not_modify_data(cc_data):
+    original = dict(cc_data)
+    Variation.create_from_range(cc_data, product_range=Mock())
+    assert cc_data == original
+
+
+def test_create_from_range_ignores_fields_missing_from_range_data(cc_data):
+    variation = Variation.create_from_range(cc_data, product_range=Mock())
+    assert variation._price is None
+    assert variation._vat_rate_id is None
+    assert variation._weight is None
+    assert variation._length is None
+    assert variation._width is None
+    assert variation._height is None
+    assert variation._large_letter_compatible is None
+    assert variation._external_product_id is None
+    assert variation.stock_level == cc_data["StockLevel"]
+
+
+def test_get_pending_stock_is_not_cached_by_default(mock_client, variation):
+    mock_client.get_pending_stock.return_value = 3
+    assert variation.get_pending_stock() == 3
+    assert variation.get_pending_stock() == 3
+    assert mock_client.get_pending_stock.call_count == 2
+
+
+def test_get_pending_stock_can_use_cache(mock_client, variation):
+    mock_client.get_pending_stock.return_value = 3
+    assert variation.get_pending_stock(use_cache=True) == 3
+    assert variation.get_pending_stock(use_cache=True) == 3
+    mock_client.get_pending_stock.assert_called_once_with(variation.id)
+
+
+def cc_option(option_id, name, value):
+    return Mock(id=option_id, option_name=name, value=Mock(value=value))
+
+
+@pytest.fixture
+def options(mock_client):
+    mock_client.get_options_for_product.return_value = [
+        cc_option(1, "Retail Price", "5.50"),
+        cc_option(2, "Date Created", "2022-03-04"),
+        cc_option(3, "Amazon Bullets", "One|Two"),
+        cc_option(4, "Discontinued", "Discontinued"),
+        cc_option(5, "Gender", "mens"),
+        cc_option(6, "Package Type", "Packet"),
+    ]
+
+
+def test_option_descriptors_are_decoded(options, variation):
+    assert variation.retail_price == 5.5
+    assert variation.date_created == datetime.date(2022, 3, 4)
+    assert variation.amazon_bullets == ["One", "Two"]
+    assert variation.discontinued is True
+    assert variation.purchase_price is None
+    assert variation.amazon_search_terms == []
+
+
+def test_option_values_are_decoded_once(options, variation):
+    variation.retail_price
+    with patch.object(Variation.retail_price, "decode") as mock_decode:
+        assert variation.retail_price == 5.5
+    mock_decode.assert_not_called()
+
+
+def test_setting_an_option_updates_decoded_value(mock_client, options, variation):
+    variation.retail_price
+    variation.retail_price = 6.25
+    assert variation.retail_price == 6.25
+
+
+def test_decoded_lists_are_copied(options, variation):
+    variation.amazon_bullets.append("Three")
+    assert variation.amazon_bullets == ["One", "Two"]
+
+
+def test_invalid_option_value_is_rejected_before_any_request(mock_client, variation):
+    with pytest.raises(ValueError):
+        variation.gender = "cats"
+    mock_client.get_options_for_product.assert_not_called()
+    mock_client.set_product_option_value.assert_not_called()
+
+
+def test_set_gender(mock_client, options, variation):
+    variation.gender = " womens "
+    mock_client.get_option_value_id.assert_called_once_with(5, "womens", create=True)
+
+
+def test_set_package_type_validates_once(mock_client, options, variation):
+    with patch.object(
+        Variation.package_type, "validate", wraps=Variation.package_type.validate
+    ) as mock_validate:
+        variation.package_type = " Large Letter "
+    mock_validate.assert_called_once_with(Variation, " Large Letter ")
+    mock_client.get_option_value_id.assert_called_once_with(
+        6, "Large Letter", create=True
+    )
+    assert variation._large_letter_compatible is True
+
+
+def test_invalid_vat_rate_is_rejected_before_any_request(mock_client, variation):
+    with pytest.raises(ValueError):
+        variation.vat_rate = 17
+    mock_client.set_product_vat_rate.assert_not_called()
+
+
+@pytest.fixture
+def range_variation(cc_data, mock_client):
+    mock_client.get_product.return_value = Mock(json=cc_data)
+    return Variation.create_from_range(
+        cc_data, product_range=Mock(id="93094893", client=mock_client)
+    )
+
+
+def test_set_scope_reloads_once_and_writes_once(mock_client, range_variation):
+    range_variation.set_scope(weight=300, height=25)
+    mock_client.get_product.assert_called_once_with(range_variation.id)
+    mock_client.set_product_scope.assert_called_once_with(
+        product_id=range_variation.id,
+        weight=300,
+        height=25,
+        length=100,
+        width=50,
+        large_letter_compatible=True,
+        external_id="EXT123",
+    )
+    assert range_variation.weight == 300
+    assert range_variation.cloud_commerce_height == 25
+
+
+def test_set_scope_does_not_reload_loaded_products(mock_client, variation):
+    variation.set_scope(weight=300)
+    mock_client.get_product.assert_not_called()
+    mock_client.set_product_scope.assert_called_once()
+
+
+def test_scope_descriptor_keeps_new_value_after_reload(mock_client, range_variation):
+    range_variation.weight = 300
+    assert mock_client.set_product_scope.call_args.kwargs["weight"] == 300
+    assert range_variation.weight == 300
+
+
+def test_set_scope_validates_before_any_request(mock_client, range_variation):
+    with pytest.raises(ValueError):
+        range_variation.set_scope(weight=300, height=-1)
+    with pytest.raises(ValueError):
+        range_variation.set_scope(colour="Red")
+    mock_client.get_product.assert_not_called()
+    mock_client.set_product_scope.assert_not_called()
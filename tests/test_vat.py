@@ -0,0 +1,47 @@
+from unittest.mock import patch
+
+import pytest
+
+from cc_products.vat import VatRateTable
+
+
+@pytest.fixture
+def mock_vat_rates():
+    with patch("ccapi.VatRates") as mock_vat_rates:
+        mock_vat_rates.get_vat_rate_by_id.side_effect = {5: 20, 2: 5}.__getitem__
+        mock_vat_rates.get_vat_rate_id_by_rate.side_effect = {20: 5, 5: 2}.__getitem__
+        yield mock_vat_rates
+
+
+@pytest.fixture
+def table():
+    return VatRateTable()
+
+
+def test_get_rate_is_looked_up_once(mock_vat_rates, table):
+    assert table.get_rate("5") == 20
+    assert table.get_rate(5) == 20
+    mock_vat_rates.get_vat_rate_by_id.assert_called_once_with(5)
+
+
+def test_lookups_fill_both_directions(mock_vat_rates, table):
+    table.get_rate(2)
+    assert table.get_id(5) == 2
+    mock_vat_rates.get_vat_rate_id_by_rate.assert_not_called()
+    table.get_id(20)
+    assert table.get_rate(5) == 20
+    mock_vat_rates.get_vat_rate_by_id.assert_called_once_with(2)
+
+
+def test_invalid_rates(mock_vat_rates, table):
+    assert table.is_valid(20)
+    assert not table.is_valid(17)
+    with pytest.raises(KeyError):
+        table.get_id(17)
+
+
+def test_clear(mock_vat_rates, table):
+    table.get_rate(5)
+    table.clear()
+    table.get_rate(5)
+    assert mock_vat_rates.get_vat_rate_by_id.call_count == 2